@@ -1,26 +1,64 @@
-from google import genai
+import os
+from typing import Iterator, Optional
+from LLM.instrumentation import CallTimer, instrument_stream
+from LLM.providers import get_provider, resolve_provider
+from LLM.response_cache import ResponseCache, get_default_cache, make_cache_key
 
+# Point gemini calls at another endpoint (e.g. a local fake server in tests)
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
 
-def get_response(prompt: str, model: str = "gemini-2.0-flash", API_KEY=None) -> str:
+
+def get_response(prompt: str, model: str = "gemini-2.0-flash", API_KEY=None,
+                 config: Optional[dict] = None, use_cache: bool = True,
+                 cache: Optional[ResponseCache] = None, response_schema: Optional[dict] = None) -> str:
     """
     Generate a response from given model
+
+    Every call is timed and recorded to the LLM metrics store (see LLM.instrumentation).
     
     Args:
         prompt: prompt for model
-        model: which model to use
+        model: which model to use, "local:..." / "openai:..." select a provider explicitly
         API_KEY: optional api key for model specific api
+        config: optional generation config, part of the cache key
+        use_cache: set False to bypass the response cache
+        cache: cache to use instead of the default on-disk cache
+        response_schema: JSON schema to request structured (JSON) output with
         
     Returns:
         Response from LLM
     """
 
-    if 'gemini' in model:
-        return generate_gemini_response(prompt, API_KEY)
-    else:
+    provider, model_name = resolve_provider(model)
+    if provider is not None and response_schema is not None:
+        config = {**(config or {}), **provider.structured_config(response_schema)}
+
+    timer = CallTimer(model, prompt)
+    if use_cache:
+        cache = cache or get_default_cache()
+        key = make_cache_key(prompt, model, config)
+        cached = cache.get(key)
+        if cached is not None:
+            timer.finish(cached, cache_hit=True)
+            return cached
+
+    if provider is None:
         print("Unsupported model")
+        return None
+    try:
+        response = provider.generate(prompt, model_name, API_KEY, config)
+    except Exception as e:
+        timer.finish(None, error=e)
+        raise
+    timer.finish(response)
+
+    if use_cache and response:
+        cache.put(key, response, model)
+    return response
 
 
-def generate_gemini_response(prompt: str, API_KEY: str, model: str = "gemini-2.0-flash") -> str:
+def generate_gemini_response(prompt: str, API_KEY: str, model: str = "gemini-2.0-flash",
+                             config: Optional[dict] = None, base_url: Optional[str] = None) -> str:
     """
     Generate a response from gemini
     
@@ -28,17 +66,106 @@ def generate_gemini_response(prompt: str, API_KEY: str, model: str = "gemini-2.0
         prompt: prompt for gemini
         API_KEY: google ai api key
         model: which version of gemini to use
+        config: optional generation config
+        base_url: optional endpoint override, defaults to GEMINI_BASE_URL
         
     Returns:
         Response from gemini
     """
 
-    client = genai.Client(api_key=API_KEY)
+    # Clients are shared per api key so their HTTP connections are reused
+    return get_provider("gemini").generate(prompt, model, API_KEY, config,
+                                           base_url=base_url or GEMINI_BASE_URL)
+
+
+def get_response_stream(prompt: str, model: str = "gemini-2.0-flash", API_KEY=None,
+                        config: Optional[dict] = None, use_cache: bool = True,
+                        cache: Optional[ResponseCache] = None,
+                        response_schema: Optional[dict] = None) -> Iterator[str]:
+    """
+    Generate a response from given model, yielding text pieces as they arrive
+
+    A cached response is yielded in one piece. A streamed response is
+    stored in the cache once it has been received completely. Time to the
+    first piece and the whole call are recorded to the LLM metrics store.
+
+    Args:
+        prompt: prompt for model
+        model: which model to use, "local:..." / "openai:..." select a provider explicitly
+        API_KEY: optional api key for model specific api
+        config: optional generation config, part of the cache key
+        use_cache: set False to bypass the response cache
+        cache: cache to use instead of the default on-disk cache
+        response_schema: JSON schema to request structured (JSON) output with
+
+    Returns:
+        Iterator over response text pieces
+    """
+
+    provider, model_name = resolve_provider(model)
+    if provider is not None and response_schema is not None:
+        config = {**(config or {}), **provider.structured_config(response_schema)}
+
+    timer = CallTimer(model, prompt, stream=True)
+    if use_cache:
+        cache = cache or get_default_cache()
+        key = make_cache_key(prompt, model, config)
+        cached = cache.get(key)
+        if cached is not None:
+            timer.first_piece()
+            timer.finish(cached, cache_hit=True)
+            yield cached
+            return
+
+    if provider is None:
+        print("Unsupported model")
+        return
+    stream = instrument_stream(timer, provider.stream(prompt, model_name, API_KEY, config))
 
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-    )
+    received = []
+    for piece in stream:
+        received.append(piece)
+        yield piece
 
-    return response.text
+    if use_cache:
+        cache.put(key, "".join(received), model)
 
+
+def generate_gemini_response_stream(prompt: str, API_KEY: str, model: str = "gemini-2.0-flash",
+                                    config: Optional[dict] = None,
+                                    base_url: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream a response from gemini
+
+    Args:
+        prompt: prompt for gemini
+        API_KEY: google ai api key
+        model: which version of gemini to use
+        config: optional generation config
+        base_url: optional endpoint override, defaults to GEMINI_BASE_URL
+
+    Returns:
+        Iterator over response text pieces
+    """
+
+    yield from get_provider("gemini").stream(prompt, model, API_KEY, config,
+                                             base_url=base_url or GEMINI_BASE_URL)
+
+
+def iter_lines(pieces: Iterator[str]) -> Iterator[str]:
+    """
+    Re-split streamed text pieces into complete lines
+
+    Args:
+        pieces: text pieces in arrival order
+
+    Returns:
+        Iterator over lines (without the newline), the last partial line included
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        *lines, buffer = buffer.split("\n")
+        yield from lines
+    if buffer:
+        yield buffer
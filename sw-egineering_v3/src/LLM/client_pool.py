@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+DEFAULT_IDLE_SECONDS = 300
+
+
+def _make_gemini_client(api_key: str, base_url: Optional[str] = None, timeout_ms: Optional[int] = None):
+    from google import genai
+    from google.genai import types
+
+    http_options = None
+    if base_url or timeout_ms:
+        http_options = types.HttpOptions(base_url=base_url, timeout=timeout_ms)
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+class _PoolEntry:
+    __slots__ = ("client", "last_used", "uses")
+
+    def __init__(self, client, now: float):
+        self.client = client
+        self.last_used = now
+        self.uses = 0
+
+
+class ClientPool:
+    """
+    Registry of LLM clients shared across calls and threads
+
+    A client (and the HTTP connection pool inside it) is created once per
+    (provider, api_key, options) and reused afterwards, so connection setup
+    and the TLS handshake are not paid on every request. Clients unused for
+    longer than idle_seconds are closed.
+
+    Input:
+        idle_seconds: close clients idle for longer than this
+        clock: time source, replaceable in tests
+    """
+    def __init__(self, idle_seconds: float = DEFAULT_IDLE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+        self._factories: Dict[str, Callable[..., Any]] = {"gemini": _make_gemini_client}
+        self._entries: Dict[Tuple[Hashable, ...], _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    def register_factory(self, provider: str, factory: Callable[..., Any]):
+        """
+        Register how clients for a provider are built
+
+        Args:
+            provider: provider name
+            factory: called as factory(api_key, **options), returns a client
+        """
+        with self._lock:
+            self._factories[provider] = factory
+
+    def get(self, provider: str, api_key: Optional[str], **options) -> Any:
+        """
+        Returns a shared client, creating it on first use
+
+        Args:
+            provider: provider name, e.g. "gemini"
+            api_key: api key for the provider
+            options: extra factory options (base_url, timeout_ms, ...)
+
+        Returns:
+            client for the provider
+        """
+        key = (provider, api_key) + tuple(sorted(options.items()))
+        now = self.clock()
+        with self._lock:
+            self._close_idle_locked(now, keep=key)
+            entry = self._entries.get(key)
+            if entry is None:
+                factory = self._factories.get(provider)
+                if factory is None:
+                    raise ValueError(f"Unknown LLM provider: {provider}")
+                entry = self._entries[key] = _PoolEntry(factory(api_key, **options), now)
+                self.created += 1
+            else:
+                self.reused += 1
+            entry.last_used = now
+            entry.uses += 1
+            return entry.client
+
+    def close_idle(self) -> int:
+        """
+        Close clients that were idle for longer than idle_seconds
+
+        Returns:
+            number of clients closed
+        """
+        with self._lock:
+            return self._close_idle_locked(self.clock())
+
+    def _close_idle_locked(self, now: float, keep=None) -> int:
+        idle = [k for k, e in self._entries.items()
+                if k != keep and now - e.last_used > self.idle_seconds]
+        for k in idle:
+            self._close_client(self._entries.pop(k).client)
+        return len(idle)
+
+    def close_all(self):
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for entry in entries.values():
+            self._close_client(entry.client)
+
+    def _close_client(self, client):
+        close = getattr(client, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+        self.closed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns client creation / reuse counters
+        """
+        with self._lock:
+            return {
+                "open_clients": len(self._entries),
+                "created": self.created,
+                "reused": self.reused,
+                "closed": self.closed,
+            }
+
+
+# Pool shared by every LLM call in the process
+client_pool = ClientPool()
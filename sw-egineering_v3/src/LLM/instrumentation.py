@@ -0,0 +1,299 @@
+import argparse
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from LLM.tokens import estimate_tokens
+
+
+DEFAULT_METRICS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llm_metrics.db')
+
+# Which quiz / user the LLM calls of the current context are made for
+_quiz: contextvars.ContextVar = contextvars.ContextVar("llm_quiz", default=None)
+_user_id: contextvars.ContextVar = contextvars.ContextVar("llm_user_id", default=None)
+# Attempt number of the current call, set by LLM.resilience.CallPolicy
+_attempt: contextvars.ContextVar = contextvars.ContextVar("llm_attempt", default=0)
+
+
+class LLMCallRecord(NamedTuple):
+    started_at: float
+    model: str
+    stream: bool
+    cache_hit: bool
+    latency: float
+    ttft: Optional[float]
+    prompt_chars: int
+    prompt_tokens: int
+    response_chars: int
+    response_tokens: int
+    attempt: int
+    error: Optional[str]
+    quiz: Optional[str]
+    user_id: Optional[int]
+
+
+@contextmanager
+def llm_context(quiz: Optional[str] = None, user_id: Optional[int] = None):
+    """
+    Tag the LLM calls made inside the block with a quiz and a user
+    """
+    tokens = [_quiz.set(quiz) if quiz is not None else None,
+              _user_id.set(user_id) if user_id is not None else None]
+    try:
+        yield
+    finally:
+        if tokens[1] is not None:
+            _user_id.reset(tokens[1])
+        if tokens[0] is not None:
+            _quiz.reset(tokens[0])
+
+
+def current_quiz() -> Optional[str]:
+    return _quiz.get()
+
+
+@contextmanager
+def attempt_context(attempt: int):
+    token = _attempt.set(attempt)
+    try:
+        yield
+    finally:
+        _attempt.reset(token)
+
+
+def bind_context(function: Callable) -> Callable:
+    """
+    Wrap function so it runs with the caller's llm_context in another thread
+
+    Threads do not inherit context variables. Every call runs in its own
+    copy of the captured context, so the wrapper can be used by several
+    pool workers at once.
+    """
+    captured = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return captured.copy().run(function, *args, **kwargs)
+    return run
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # Nearest-rank percentile of sorted values
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+class MetricsStore:
+    """
+    Local SQLite store of LLM call records
+
+    Input:
+        path: SQLite file path (":memory:" for a process-local store)
+    """
+    GROUPS = ("model", "quiz", "user_id")
+
+    def __init__(self, path: str = DEFAULT_METRICS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                call_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                model TEXT NOT NULL,
+                stream INTEGER NOT NULL,
+                cache_hit INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                ttft REAL,
+                prompt_chars INTEGER NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                response_chars INTEGER NOT NULL,
+                response_tokens INTEGER NOT NULL,
+                attempt INTEGER NOT NULL,
+                error TEXT,
+                quiz TEXT,
+                user_id INTEGER
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_model ON llm_calls(model, started_at)")
+        self._conn.commit()
+
+    def record(self, rec: LLMCallRecord):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO llm_calls ({', '.join(LLMCallRecord._fields)}) "
+                f"VALUES ({', '.join('?' * len(LLMCallRecord._fields))})",
+                tuple(rec)
+            )
+            self._conn.commit()
+
+    def records(self) -> List[LLMCallRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(LLMCallRecord._fields)} FROM llm_calls ORDER BY call_id"
+            ).fetchall()
+        return [LLMCallRecord(*row) for row in rows]
+
+    def summary(self, group_by: str = "model", since: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Per-group call statistics
+
+        Args:
+            group_by: "model", "quiz" or "user_id"
+            since: only calls started after this unix time
+
+        Returns:
+            group -> calls, errors, cache hit rate, retries, token totals
+            and p50/p95/p99 of latency and time to first token (seconds)
+        """
+        if group_by not in self.GROUPS:
+            raise ValueError(f"group_by must be one of {self.GROUPS}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {group_by}, latency, ttft, cache_hit, attempt, error, prompt_tokens, response_tokens "
+                f"FROM llm_calls WHERE started_at >= ?",
+                (since or 0,)
+            ).fetchall()
+
+        groups: Dict[str, List] = {}
+        for row in rows:
+            groups.setdefault(str(row[0]), []).append(row)
+        report = {}
+        for group, calls in groups.items():
+            # Latency percentiles describe provider calls, cache hits would hide them
+            remote = [c for c in calls if not c[3]]
+            latencies = sorted(c[1] for c in remote)
+            ttfts = sorted(c[2] for c in remote if c[2] is not None)
+            report[group] = {
+                "calls": len(calls),
+                "errors": sum(1 for c in calls if c[5]),
+                "cache_hit_rate": round(sum(c[3] for c in calls) / len(calls), 4),
+                "retries": sum(1 for c in calls if c[4] > 0),
+                "prompt_tokens": sum(c[6] for c in calls if not c[3]),
+                "response_tokens": sum(c[7] for c in calls if not c[3]),
+                **{f"latency_p{q}": round(_percentile(latencies, q), 4) for q in (50, 95, 99)},
+                **{f"ttft_p{q}": round(_percentile(ttfts, q), 4) for q in (50, 95, 99)},
+            }
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_calls")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[MetricsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_metrics_store() -> Optional[MetricsStore]:
+    """
+    Store LLM calls are recorded to, None when LLM_METRICS=0
+    """
+    global _store
+    with _store_lock:
+        if _store is None and os.environ.get("LLM_METRICS", "1") != "0":
+            _store = MetricsStore()
+        return _store
+
+
+def set_metrics_store(store: Optional[MetricsStore]):
+    global _store
+    with _store_lock:
+        _store = store
+
+
+class CallTimer:
+    """
+    Measures one LLM call and records it when finished
+    """
+    def __init__(self, model: str, prompt: str, stream: bool = False):
+        self.model = model
+        self.prompt = prompt
+        self.stream = stream
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.ttft = None
+
+    def first_piece(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+
+    def finish(self, response: Optional[str], cache_hit: bool = False, error: Optional[BaseException] = None):
+        latency = time.perf_counter() - self._start
+        store = get_metrics_store()
+        if store is None:
+            return
+        response = response or ""
+        try:
+            store.record(LLMCallRecord(
+                started_at=self.started_at,
+                model=self.model,
+                stream=self.stream,
+                cache_hit=cache_hit,
+                latency=latency,
+                ttft=self.ttft if self.stream else latency,
+                prompt_chars=len(self.prompt),
+                prompt_tokens=estimate_tokens(self.prompt),
+                response_chars=len(response),
+                response_tokens=estimate_tokens(response),
+                attempt=_attempt.get(),
+                error=f"{type(error).__name__}: {error}" if error else None,
+                quiz=_quiz.get(),
+                user_id=_user_id.get(),
+            ))
+        except Exception as e:
+            # Metrics must never break quiz generation
+            print(f"LLM metrics not recorded: {e}")
+
+
+def instrument_stream(timer: CallTimer, pieces: Iterator[str]) -> Iterator[str]:
+    """
+    Pass pieces through, recording time to first piece and the whole call
+    """
+    received, error = [], None
+    try:
+        for piece in pieces:
+            timer.first_piece()
+            received.append(piece)
+            yield piece
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        timer.finish("".join(received), error=error if not isinstance(error, GeneratorExit) else None)
+
+
+def format_report(report: Dict[str, Dict]) -> str:
+    columns = ["calls", "errors", "cache_hit_rate", "retries", "prompt_tokens", "response_tokens",
+               "latency_p50", "latency_p95", "latency_p99", "ttft_p50", "ttft_p95", "ttft_p99"]
+    lines = ["\t".join(["group"] + columns)]
+    for group, stats in sorted(report.items()):
+        lines.append("\t".join([group] + [str(stats[c]) for c in columns]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize recorded LLM calls")
+    parser.add_argument("--db", default=DEFAULT_METRICS_PATH, help="metrics database path")
+    parser.add_argument("--group-by", default="model", choices=MetricsStore.GROUPS)
+    parser.add_argument("--hours", type=float, default=None, help="only calls of the last N hours")
+    args = parser.parse_args(argv)
+
+    store = MetricsStore(args.db)
+    since = time.time() - args.hours * 3600 if args.hours else None
+    print(format_report(store.summary(args.group_by, since)))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
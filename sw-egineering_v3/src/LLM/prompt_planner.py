@@ -0,0 +1,80 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from LLM.tokens import estimate_tokens
+
+
+class PlannedPrompt(NamedTuple):
+    items: List[str]
+    prompt: str
+    tokens: int
+
+
+class PromptPlan(NamedTuple):
+    prompts: List[PlannedPrompt]
+    cached: List[str]
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(p.tokens for p in self.prompts)
+
+
+class PromptPlanner:
+    """
+    Packs items into as few prompts as fit a token budget
+
+    Every prompt is prefix + one formatted line per item. The budget covers
+    the prompt and the output reserved for its items, so a packed request
+    also fits the model context. Items the caller already has an answer
+    for are left out.
+
+    Input:
+        prefix: instructions put in front of every prompt
+        token_budget: estimated tokens per request (prompt + reserved output)
+        item_format: how one item is written into the prompt
+        output_tokens_per_item: output tokens reserved per item
+        max_items: optional cap on items per prompt
+    """
+    def __init__(self, prefix: str, token_budget: int, item_format: str = "{item};\n",
+                 output_tokens_per_item: int = 0, max_items: Optional[int] = None):
+        self.prefix = prefix
+        self.token_budget = token_budget
+        self.item_format = item_format
+        self.output_tokens_per_item = output_tokens_per_item
+        self.max_items = max_items
+        self.prefix_tokens = estimate_tokens(prefix)
+
+    def build(self, items: Sequence[str]) -> str:
+        return (self.prefix + "".join(self.item_format.format(item=item) for item in items)).strip()
+
+    def plan(self, items: Sequence[str], is_cached: Optional[Callable[[str], bool]] = None) -> PromptPlan:
+        """
+        Splits items into prompts, in order and without duplicates
+
+        Args:
+            items: items to ask about
+            is_cached: returns True for items that need no request
+
+        Returns:
+            PromptPlan with the prompts and the items skipped as cached
+        """
+        cached, pending = [], []
+        for item in dict.fromkeys(items):
+            (cached if is_cached and is_cached(item) else pending).append(item)
+
+        prompts, current, used = [], [], self.prefix_tokens
+        for item in pending:
+            cost = estimate_tokens(self.item_format.format(item=item)) + self.output_tokens_per_item
+            full = self.max_items is not None and len(current) >= self.max_items
+            if current and (used + cost > self.token_budget or full):
+                prompts.append(self._planned(current))
+                current, used = [], self.prefix_tokens
+            # An item larger than the budget still gets a prompt of its own
+            current.append(item)
+            used += cost
+        if current:
+            prompts.append(self._planned(current))
+        return PromptPlan(prompts, cached)
+
+    def _planned(self, items: List[str]) -> PlannedPrompt:
+        prompt = self.build(items)
+        return PlannedPrompt(items, prompt, estimate_tokens(prompt))
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from LLM.client_pool import client_pool
+
+
+class BaseProvider(ABC):
+    """
+    Backend that turns a prompt into model output
+
+    generate() returns the whole response, stream() yields it in pieces.
+    Providers without a streaming API can rely on the default stream(),
+    which yields the whole response at once.
+    """
+    name = "base"
+
+    @abstractmethod
+    def generate(self, prompt: str, model: str, api_key: Optional[str] = None,
+                 config: Optional[dict] = None) -> str:
+        pass
+
+    def stream(self, prompt: str, model: str, api_key: Optional[str] = None,
+               config: Optional[dict] = None) -> Iterator[str]:
+        yield self.generate(prompt, model, api_key, config)
+
+    def structured_config(self, schema: dict) -> dict:
+        """
+        Generation config asking for JSON output that follows schema
+        """
+        return {}
+
+
+class GeminiProvider(BaseProvider):
+    """
+    Google gemini through the google-genai SDK
+
+    Input:
+        base_url: optional endpoint override (e.g. a local fake server)
+    """
+    name = "gemini"
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url
+
+    def structured_config(self, schema):
+        return {"response_mime_type": "application/json", "response_json_schema": schema}
+
+    def generate(self, prompt, model, api_key=None, config=None, base_url=None):
+        client = client_pool.get("gemini", api_key, base_url=base_url or self.base_url)
+        response = client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=config,
+        )
+        return response.text
+
+    def stream(self, prompt, model, api_key=None, config=None, base_url=None):
+        client = client_pool.get("gemini", api_key, base_url=base_url or self.base_url)
+        for chunk in client.models.generate_content_stream(
+            model=model,
+            contents=prompt,
+            config=config,
+        ):
+            if chunk.text:
+                yield chunk.text
+
+
+def _make_http_client(api_key: Optional[str], base_url: str, timeout: float = 60.0):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    return httpx.Client(base_url=base_url, headers=headers, timeout=timeout)
+
+
+client_pool.register_factory("openai", _make_http_client)
+
+
+class OpenAICompatibleProvider(BaseProvider):
+    """
+    Any server speaking the OpenAI chat completions API
+    (llama.cpp server, vLLM, Ollama, LM Studio, ...)
+
+    Input:
+        base_url: API root, e.g. "http://localhost:8000/v1"
+    """
+    name = "openai"
+
+    def __init__(self, base_url: str = "http://localhost:8000/v1"):
+        self.base_url = base_url.rstrip("/")
+
+    def structured_config(self, schema):
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": "items", "schema": schema}}}
+
+    def _body(self, prompt, model, config, stream):
+        body = {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+        body.update(config or {})
+        return body
+
+    def generate(self, prompt, model, api_key=None, config=None):
+        client = client_pool.get("openai", api_key, base_url=self.base_url)
+        response = client.post("/chat/completions", json=self._body(prompt, model, config, False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, prompt, model, api_key=None, config=None):
+        client = client_pool.get("openai", api_key, base_url=self.base_url)
+        with client.stream("POST", "/chat/completions", json=self._body(prompt, model, config, True)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+
+
+_CLOZE_TEMPLATES = [
+    "The manager asked everyone to check the ______ before the meeting.",
+    "Our team discussed the ______ during the weekly report.",
+    "Please read the note about the ______ carefully.",
+    "She mentioned the ______ in her email to the client.",
+]
+
+
+def _cloze_template(word: str) -> str:
+    return _CLOZE_TEMPLATES[zlib.crc32(word.encode("utf-8")) % len(_CLOZE_TEMPLATES)]
+
+
+def _prompt_words(prompt: str) -> List[str]:
+    return [w.strip() for w in prompt.split("[words]:", 1)[1].split(";") if w.strip()]
+
+
+def template_responder(prompt: str) -> str:
+    """
+    Deterministic stand-in answers for the prompts this project sends
+
+    Cloze prompts ("[words]:word1;word2;...") get one "Q:...;A:word" line
+    per word, any other prompt is echoed back.
+    """
+    if "[words]:" not in prompt:
+        return prompt
+    return "\n".join(f"Q:{_cloze_template(word)};A:{word}" for word in _prompt_words(prompt))
+
+
+def template_json_responder(prompt: str) -> str:
+    """
+    JSON version of template_responder, one object per line of the array
+    """
+    if "[words]:" not in prompt:
+        return json.dumps([])
+    items = [json.dumps({"word": word, "question": _cloze_template(word), "answer": word}, ensure_ascii=False)
+             for word in _prompt_words(prompt)]
+    return "[\n" + ",\n".join(items) + "\n]"
+
+
+class LocalProvider(BaseProvider):
+    """
+    Offline provider for tests and benchmarks
+
+    Answers come from fixtures (exact prompt -> response) or from a
+    responder function, and always the same for the same prompt. latency
+    simulates model time, so our own overhead can be measured separately.
+
+    Input:
+        fixtures: exact prompt -> response
+        responder: fallback prompt -> response function
+        latency: seconds until the whole response is available
+        first_token_latency: seconds until the first streamed piece
+        json_responder: responder used when JSON output is requested
+    """
+    name = "local"
+
+    def __init__(self, fixtures: Optional[Dict[str, str]] = None,
+                 responder: Callable[[str], str] = template_responder,
+                 latency: float = 0.0, first_token_latency: Optional[float] = None,
+                 json_responder: Callable[[str], str] = template_json_responder):
+        self.fixtures = dict(fixtures or {})
+        self.responder = responder
+        self.json_responder = json_responder
+        self.latency = latency
+        self.first_token_latency = latency if first_token_latency is None else first_token_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def structured_config(self, schema):
+        return {"response_format": "json"}
+
+    def _respond(self, prompt, config=None):
+        with self._lock:
+            self.calls += 1
+        if prompt in self.fixtures:
+            return self.fixtures[prompt]
+        if config and config.get("response_format") == "json":
+            return self.json_responder(prompt)
+        return self.responder(prompt)
+
+    def generate(self, prompt, model, api_key=None, config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt, config)
+
+    def stream(self, prompt, model, api_key=None, config=None):
+        pieces = self._respond(prompt, config).splitlines(keepends=True) or [""]
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        rest = max(self.latency - self.first_token_latency, 0.0)
+        for i, piece in enumerate(pieces):
+            if i and rest:
+                time.sleep(rest / (len(pieces) - 1))
+            yield piece
+
+
+_providers: Dict[str, BaseProvider] = {}
+_providers_lock = threading.Lock()
+# Provider for models without an explicit "provider:" prefix (LLM_PROVIDER overrides)
+_default_provider: Optional[str] = os.environ.get("LLM_PROVIDER")
+
+
+def register_provider(provider: BaseProvider, name: Optional[str] = None):
+    """
+    Register (or replace) a provider under its name
+    """
+    with _providers_lock:
+        _providers[name or provider.name] = provider
+
+
+def get_provider(name: str) -> Optional[BaseProvider]:
+    with _providers_lock:
+        return _providers.get(name)
+
+
+def set_default_provider(name: Optional[str]):
+    """
+    Route models without a provider prefix to this provider (None restores name-based routing)
+    """
+    global _default_provider
+    _default_provider = name
+
+
+def resolve_provider(model: str) -> Tuple[Optional[BaseProvider], str]:
+    """
+    Pick the provider for a model name
+
+    "local:anything" and "openai:llama3" select a provider explicitly.
+    Otherwise the default provider is used if one is set, and gemini
+    models go to gemini.
+
+    Returns:
+        (provider or None if unsupported, model name to pass to the provider)
+    """
+    if ":" in model:
+        prefix, name = model.split(":", 1)
+        provider = get_provider(prefix)
+        if provider is not None:
+            return provider, name
+    if _default_provider:
+        return get_provider(_default_provider), model
+    if model == "local":
+        return get_provider("local"), model
+    if "gemini" in model:
+        return get_provider("gemini"), model
+    return None, model
+
+
+register_provider(GeminiProvider(os.environ.get("GEMINI_BASE_URL")))
+register_provider(LocalProvider(latency=float(os.environ.get("LOCAL_LLM_LATENCY", "0"))))
+register_provider(OpenAICompatibleProvider(os.environ.get("LLM_BASE_URL", "http://localhost:8000/v1")))
@@ -0,0 +1,241 @@
+import contextvars
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from LLM.instrumentation import attempt_context
+
+
+class CallTimeout(TimeoutError):
+    """
+    The call did not finish within its timeout
+    """
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    The circuit breaker is open, the call was not attempted
+    """
+    pass
+
+
+def call_with_timeout(operation: Callable, timeout: Optional[float], *args, **kwargs):
+    """
+    Run operation and give up waiting after timeout seconds
+
+    The SDK calls cannot be cancelled, so the operation keeps running in a
+    daemon thread and its late result is dropped. The thread sees the
+    caller's context variables (llm_context tags).
+
+    Raises:
+        CallTimeout: operation did not finish in time
+    """
+    if timeout is None:
+        return operation(*args, **kwargs)
+
+    outcome = {}
+    done = threading.Event()
+
+    def target():
+        try:
+            outcome["result"] = operation(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), daemon=True).start()
+    if not done.wait(timeout):
+        raise CallTimeout(f"call did not finish within {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def iter_with_timeout(operation: Callable, timeout: Optional[float], *args, **kwargs) -> Iterator:
+    """
+    Iterate operation(*args, **kwargs) and give up once the whole iteration
+    has taken timeout seconds
+
+    For streamed responses: the deadline covers the first piece and every
+    later one, so a stream that stalls halfway is bounded as well. The
+    iteration runs in a daemon thread like call_with_timeout and stops
+    pulling pieces once the caller gave up.
+
+    Raises:
+        CallTimeout: the iteration did not finish in time
+    """
+    if timeout is None:
+        yield from operation(*args, **kwargs)
+        return
+
+    items = queue.Queue()
+    abandoned = threading.Event()
+
+    def target():
+        try:
+            for item in operation(*args, **kwargs):
+                if abandoned.is_set():
+                    return
+                items.put(("item", item))
+        except BaseException as e:
+            items.put(("error", e))
+        else:
+            items.put(("end", None))
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), daemon=True).start()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                kind, value = items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise CallTimeout(f"stream did not finish within {timeout}s") from None
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        abandoned.set()
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after repeated failures
+
+    closed: calls go through. After failure_threshold consecutive failures
+    the breaker opens and calls fail fast for reset_seconds. Then it is
+    half open: one trial call is let through, success closes the breaker,
+    failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be attempted now
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+            self._trial_running = False
+
+    def reset(self):
+        self.record_success()
+
+
+class CallPolicy:
+    """
+    Timeout, bounded retries with jittered backoff and a circuit breaker
+    around one kind of remote call
+
+    The worst case time of call() is bounded by
+    max_attempts * timeout + the backoff delays in between.
+
+    Input:
+        timeout: seconds per attempt, None waits forever
+        max_attempts: attempts including the first one
+        base_delay: backoff before the first retry, doubled every retry
+        max_delay: upper bound for one backoff delay
+        breaker: optional circuit breaker shared by callers of the same provider
+    """
+    def __init__(self, timeout: Optional[float] = 20.0, max_attempts: int = 2,
+                 base_delay: float = 0.5, max_delay: float = 4.0,
+                 breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter, so callers that failed together do not retry together
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, operation: Callable, *args, **kwargs):
+        """
+        Call operation(*args, **kwargs) under this policy
+
+        Raises:
+            CircuitOpenError: the breaker is open
+            Exception: the last error once every attempt failed
+        """
+        for attempt in range(self.max_attempts):
+            if self.breaker and not self.breaker.allow():
+                raise CircuitOpenError("LLM provider circuit is open")
+            try:
+                with attempt_context(attempt):
+                    result = call_with_timeout(operation, self.timeout, *args, **kwargs)
+            except Exception:
+                if self.breaker:
+                    self.breaker.record_failure()
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                self.sleep(self.delay(attempt))
+                continue
+            if self.breaker:
+                self.breaker.record_success()
+            return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Shared circuit breaker for a provider or model name
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker()
+        return _breakers[name]
@@ -0,0 +1,126 @@
+import json
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class JsonItemParser:
+    """
+    Incremental parser for a JSON array of objects
+
+    feed() takes text pieces as they stream in and returns every object
+    that has been completed so far, so items can be validated and used
+    before the response ends. Text around the array (markdown fences,
+    chatter, a wrapper object) is ignored, and a malformed item does not
+    affect the others.
+    """
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._start = None
+        self._item_depth = None
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Returns:
+            raw JSON text of the objects completed by this piece
+        """
+        completed = []
+        offset = len(self._buffer)
+        self._buffer += text
+        for i in range(offset, len(self._buffer)):
+            ch = self._buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = bool(self._stack)
+            elif ch in "[{":
+                # An item is an object directly inside an array, outside any other item
+                if ch == "{" and self._start is None and self._stack and self._stack[-1] == "[":
+                    self._start = i
+                    self._item_depth = len(self._stack)
+                self._stack.append(ch)
+            elif ch in "]}" and self._stack:
+                self._stack.pop()
+                if self._start is not None and len(self._stack) == self._item_depth:
+                    if ch == "}":
+                        completed.append(self._buffer[self._start:i + 1])
+                    self._start = self._item_depth = None
+        if self._start is None:
+            # Nothing open, the consumed text is not needed any more
+            self._buffer = ""
+        else:
+            self._buffer = self._buffer[self._start:]
+            self._start = 0
+        return completed
+
+
+def iter_json_items(pieces: Iterable[str]) -> Iterator[Tuple[Optional[dict], str]]:
+    """
+    Yield (item, raw) for every object of a streamed JSON array
+
+    item is None when the object text is not valid JSON.
+    """
+    parser = JsonItemParser()
+    for piece in pieces:
+        for raw in parser.feed(piece):
+            try:
+                item = json.loads(raw)
+            except ValueError:
+                item = None
+            yield (item if isinstance(item, dict) else None), raw
+
+
+def array_schema(properties: Dict[str, str]) -> dict:
+    """
+    JSON schema of an array of objects, properties maps name -> JSON type
+    """
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {name: {"type": kind} for name, kind in properties.items()},
+            "required": list(properties),
+        },
+    }
+
+
+class ParseStats:
+    """
+    Parsed and rejected output items per model
+    """
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, ok: int = 0, failed: int = 0):
+        with self._lock:
+            counts = self._counts.setdefault(model, {"ok": 0, "failed": 0})
+            counts["ok"] += ok
+            counts["failed"] += failed
+
+    def failure_rate(self, model: str) -> float:
+        with self._lock:
+            counts = self._counts.get(model, {"ok": 0, "failed": 0})
+            total = counts["ok"] + counts["failed"]
+            return counts["failed"] / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                model: {**counts, "failure_rate": counts["failed"] / max(1, counts["ok"] + counts["failed"])}
+                for model, counts in self._counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+parse_stats = ParseStats()
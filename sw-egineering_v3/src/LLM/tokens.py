@@ -0,0 +1,18 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Fast approximate token count
+
+    Roughly 4 ASCII characters per token, and one token per non-ASCII
+    character (Hangul syllables usually take one or more tokens each).
+    Good enough for budgeting prompts without loading a real tokenizer.
+
+    Args:
+        text: text to measure
+
+    Returns:
+        estimated number of tokens
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
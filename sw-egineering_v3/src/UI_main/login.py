@@ -62,6 +62,9 @@ def sign_login(root):
             user_number = user_db.login_user(id.get(), password.get()) #유저의 고유 key 획득
             if (user_number != None): 
                 messagebox.showinfo("성공", "로그인 성공!")
+                #LLM 이 필요 없는 문제 은행을 백그라운드에서 미리 생성
+                from quiz_generation.question_bank import warm_up
+                warm_up()
                 main_menu(root, user_number)  # root를 main_menu 함수에 전달
             else:
                 messagebox.showerror("오류", "ID 또는 비밀번호가 잘못되었습니다.")
@@ -1,8 +1,17 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
+import os
+import sys
 from login import sign_login
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #나보다 위 디렉토리에 있음
+from database.migrations import MigrationError
+from database.category_db import category_db
+from database.game_db import game_db
+from database.quiz_db import quiz_db
+from database.user_db import user_db
+
 # 현재 테마 상태 변수
 current_theme = "flatly"  # 기본 테마 (라이트 모드)
 
@@ -17,6 +26,13 @@ style = ttk.Style()
 style.configure("Placeholder.TEntry", foreground="gray")
 style.configure("Normal.TEntry", foreground="black")
 
+# 모듈 싱글톤은 import 시 마이그레이션하지 않으므로 시작할 때 DB 파일마다 한 번 적용
+for db in {db.db_path: db for db in (category_db, quiz_db, user_db, game_db)}.values():
+    try:
+        db.migrate()
+    except MigrationError as e:
+        print(f"Error migrating database schema: {e}")
+
 sign_login(root)
 
 # 메인 루프 실행
@@ -0,0 +1,95 @@
+import tkinter as tk
+from tkinter import messagebox
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+def quiz_adaptive(root1, user_id):
+    from quiz_result import quiz_result
+    from quiz_menu import quiz_menu
+
+    #채점기, 맞춤 단어 선택 연결 (뜻 여러 개, 대소문자/띄어쓰기, 한글 답의 작은 오타 허용)
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #나보다 위 디렉토리에 있음
+    from database.quiz_db import quiz_db
+    from quiz_generation.adaptive import adaptive_words
+    from quiz_generation.factory import create_quiz
+    from quiz_generation.grading import is_correct
+
+    #사용자가 자주 틀리는 단어 7개 + 복습 단어 3개 (단어 맞추기와 같은 방식: 영어 -> 뜻)
+    words = adaptive_words(user_id, k=10)
+    if not words:
+        messagebox.showinfo("", "퀴즈에 사용할 단어가 없습니다. 단어를 먼저 추가해 주세요.")
+        quiz_menu(root1, user_id)
+        return
+    pairs = list(create_quiz("short_answer_ek", words))
+
+    word_list = [[word["english"], word["meaning"], 0, "맞춤"] for word in words]
+    word_list_anwser = [0 for i in range(len(word_list))]  #정답 여부 저장
+    hint = [pair[2] for pair in pairs] #번호 별 힌트 (뜻의 초성)
+
+    def enter(entered_text):
+        nonlocal current_index
+
+        correct = is_correct(entered_text, pairs[current_index][1])
+        if correct:
+            word_list_anwser[current_index] = 1
+        else:
+            word_list_anwser[current_index] = 0
+            #틀린 횟수 증가
+            word_list[current_index][2] += 1
+        #결과 저장 (다음 맞춤 퀴즈의 단어 선택에 반영)
+        quiz_db.record_quiz_result(user_id, words[current_index]["word_id"], correct)
+
+        next_word()
+
+    def next_word():
+        nonlocal current_index
+        current_index += 1
+
+        #만약 모든 워드 리스트를 다 탐색했다면
+        if (current_index >= len(word_list_anwser)):
+            messagebox.showinfo("", "모든 단어를 완료했습니다!")
+            quiz_result(root1, word_list, word_list_anwser)
+        else:
+            word_label.config(text= word_list[current_index][0], font=("Arial", 25))
+            count_word.config(text=f"남은 단어 갯수: {len(word_list) - current_index}", font=("나눔 고딕", 16))
+            answer.delete(0, tk.END)
+            hint_label.grid_forget()  # 다음 단어로 넘어갈 때 힌트 숨기기
+
+    def show_hint():
+        nonlocal current_index
+        hint_label.config(text=hint[current_index])
+        hint_label.grid(row=0, column=1)  # 버튼 오른쪽에 표시
+
+
+    current_index = 0 #현재 문제 번호
+
+    #프레임 초기화와 크기 조정
+    root1.geometry("500x400")
+    for widget in root1.winfo_children():
+        widget.destroy()
+
+    tk.Label(root1, text="정답을 입력하세요", font=("나눔 고딕", 16)).pack(pady=20)
+    word_label = tk.Label(root1, text= word_list[current_index][0], font=("Arial", 25))
+    word_label.pack(pady=20)
+
+    answer = tk.Entry(root1)
+    answer.place(relx=0.5, rely=0.5, anchor="center", width=200, height=25)
+
+    submit_button = tk.Button(root1, text="입력", command=lambda: enter(answer.get()))
+    submit_button.place(relx=0.8, rely=0.5, anchor="e", width=40)
+
+    #엔터키로도 입력 가능
+    answer.bind("<Return>", lambda event: enter(answer.get()))
+
+    #힌트 버튼 프레임
+    hint_frame = tk.Frame(root1)
+    hint_frame.place(relx=0.15, rely=0.7)  # 입력 아래 왼쪽 (조절 가능)
+
+    hint_button = tk.Button(hint_frame, text="힌트", command=show_hint, width=5, height=2)
+    hint_button.grid(row=0, column=0, padx=(0, 10))  # 왼쪽
+    hint_label = tk.Label(hint_frame, text=hint[current_index], font=("나눔 고딕", 14), foreground="gray")
+
+    count_word = tk.Label(root1, text=f"남은 단어 갯수: {len(word_list) - current_index}", font=("나눔 고딕", 16))
+    count_word.pack(side="bottom", pady=10)
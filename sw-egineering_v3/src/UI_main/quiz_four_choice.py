@@ -4,9 +4,15 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import random
 
-def quiz_four_choice(root1):
+def quiz_four_choice(root1, seed=None):
     from quiz_result import quiz_result
 
+    #오답 보기 추출기 연결
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #나보다 위 디렉토리에 있음
+    from quiz_generation.distractors import make_sampler
+
     word_list = [
         ["cold", "추운", 0, "카테고리1"],
         ["home", "집", 0, "전체"],
@@ -16,6 +22,8 @@ def quiz_four_choice(root1):
         ["happy", "행복한", 0, "전체"]
     ]
     word_list_anwser = [0 for _ in range(len(word_list))]
+    rng = random.Random(seed)  #seed 가 같으면 같은 보기와 순서가 다시 나옴
+    distractors = make_sampler([word[0] for word in word_list], rng=rng)  #단어가 4개 미만이면 전체 단어장에서 보기를 뽑음
 
     def enter():  #정답 여부 저장
         nonlocal current_index
@@ -42,14 +50,13 @@ def quiz_four_choice(root1):
             var.set(None)  #이전 선택 초기화
 
             # 체크박스 옵션 갱신
-            options = [word_list[current_index][0]]  #보기 안에 정답이 존재해야 하므로 정답먼저 리스트에 추가
-            while len(options) < 4:  #보기 개수를 4개로 조절
-                other = random.choice(word_list)[0]
-                if other not in options:  #중복된 단어가 보기로 들어가지 않게 조절함
-                    options.append(other)
-            random.shuffle(options) # 보기 순서를 랜덤으로 섞음
+            options = distractors.options(word_list[current_index][0], 3)  #정답 + 중복 없는 오답 3개
+            rng.shuffle(options) # 보기 순서를 랜덤으로 섞음
             for i in range(4):
-                checkboxes[i].config(text=options[i], variable=var, value=options[i])
+                if i >= len(options):  #단어장 전체가 4개 미만이면 남는 보기는 비워둠
+                    checkboxes[i].config(text="", variable=var, value="", state="disabled")
+                    continue
+                checkboxes[i].config(text=options[i], variable=var, value=options[i], state="normal")
 
                 # text=options[i] 	Radiobutton의 **라벨(보기로 표시될 텍스트)**을 options[i]로 설정
                 # variable=var	    사용자가 선택한 값을 저장할 변수 (StringVar() 타입)
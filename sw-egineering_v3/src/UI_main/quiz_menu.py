@@ -10,6 +10,7 @@ def quiz_menu(root, user_number):
     from quiz_word import quiz_word1
     from quiz_sentence import quiz_sentence
     from quiz_rain import AcidRainGame
+    from quiz_adaptive import quiz_adaptive
     from menu import main_menu
     from ranking import ranking
 
@@ -51,7 +52,7 @@ def quiz_menu(root, user_number):
 
     # 모드 선택 (OptionMenu)
     mode_var = tk.StringVar(value="Select Mode")
-    modes = ["해석 맞추기", "해석 맞추기", "단어 맞추기", "사지선다형 단어 맞추기", "문장 채우기 게임", "산성비 게임"]
+    modes = ["해석 맞추기", "해석 맞추기", "단어 맞추기", "사지선다형 단어 맞추기", "문장 채우기 게임", "산성비 게임", "맞춤 복습 (약한 단어)"]
 
     #이미지 불러오기
     image1 = Image.open("C:\\github\\sw-egineering\\src\\UI_main\\z.exampleForGame1.jpg")  # 불러올 이미지 경로 (임의로 자기 경로에 맞게 설정해야 함)
@@ -69,7 +70,7 @@ def quiz_menu(root, user_number):
     photo2 = ImageTk.PhotoImage(image2)
     photo3 = ImageTk.PhotoImage(image3)
     photo4 = ImageTk.PhotoImage(image4)
-    mode_explain = [photo1, photo1_5, photo2, photo3, photo4]
+    mode_explain = [photo1, photo1_5, photo2, photo3, photo4, photo1_5]  # 맞춤 복습은 단어 맞추기와 같은 화면
 
     # 모드 변경 시 그 모드에 대한 예시를 이미지로 출력
     def handle_mode_change(selected_mode):
@@ -104,21 +105,20 @@ def quiz_menu(root, user_number):
     )
     label_display1.pack(pady=20, fill="both", expand=True)
 
-    # 모드에 따라 다른 함수 실행
-    def mode_1_function():
-        quiz_interpret(root, user_number)
-
-    def mode_1_5_function():
-        quiz_word1(root, user_number)
-
-    def mode_2_function():
-        quiz_four_choice(root, user_number)
-
-    def mode_3_function():
-        quiz_sentence(root, user_number)
-
-    def mode_4_function():
-        game = AcidRainGame(root, user_number)
+    # 모드 이름 -> 퀴즈 화면 (새 모드는 여기에 한 줄 추가)
+    mode_screens = {
+        "해석 맞추기": quiz_interpret,
+        "단어 맞추기": quiz_word1,
+        "사지선다형 단어 맞추기": quiz_four_choice,
+        "문장 채우기 게임": quiz_sentence,
+        "산성비 게임": lambda root: AcidRainGame(root, category_id=selected_category_id(), user_id=user_number),
+        "맞춤 복습 (약한 단어)": lambda root: quiz_adaptive(root, user_number),
+    }
+
+    # "전체" 는 모든 단어, "Category N" 은 카테고리 N
+    def selected_category_id():
+        selected_category = option_var.get()
+        return None if selected_category == "전체" else int(selected_category.split()[-1])
 
     # Start 버튼 클릭 시 실행될 함수
     def start_button_clicked():
@@ -127,18 +127,11 @@ def quiz_menu(root, user_number):
         
         print(f"Start 버튼 클릭됨! 선택된 카테고리: {selected_category}, 모드: {selected_mode}")
 
-        if selected_mode == "해석 맞추기":
-            mode_1_function()
-        elif selected_mode == "단어 맞추기":
-            mode_1_5_function()
-        elif selected_mode == "사지선다형 단어 맞추기":
-            mode_2_function()
-        elif selected_mode == "문장 채우기 게임":
-            mode_3_function()
-        elif selected_mode == "산성비 게임":
-            mode_4_function()
-        else:
+        screen = mode_screens.get(selected_mode)
+        if screen is None:
             print("오류 발생")
+            return
+        screen(root)  #퀴즈 화면들은 root 만 받음 (카테고리가 필요한 화면은 위에서 넘겨 줌)
 
     # 시작 버튼 (맨 아래 배치)
     start_button = ttk.Button(root, text="시작", bootstyle="success", command=start_button_clicked)
@@ -1,13 +1,20 @@
 import tkinter as tk
 import random
+import os
+import sys
 from PIL import Image, ImageTk
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #나보다 위 디렉토리에 있음
+from quiz_generation.grading import grade
+from quiz_generation.rain_feed import RainWordFeed, rain_level
+
 class AcidRainGame:
-    def __init__(self, root):
+    def __init__(self, root, seed=None, category_id=None, user_id=None):
         for widget in root.winfo_children():  # 기존 UI 제거
             widget.destroy()
 
         self.root = root
+        self.rng = random.Random(seed)  #seed 가 같으면 같은 단어가 같은 위치에 떨어짐
         #self.root.title("산성비 게임")
         self.canvas_width = 400
         self.canvas_height = 600
@@ -45,7 +52,7 @@ class AcidRainGame:
         self.entry.bind("<Return>", self.check_word)
         self.entry.focus()
 
-        # 단어 관련
+        # 단어 관련 (DB 에 단어가 없을 때만 쓰는 기본 단어)
         self.arr = [
             ["apple", "사과"],
             ["banana", "바나나"],
@@ -57,12 +64,17 @@ class AcidRainGame:
             ["smog", "스모그"]
         ]
         self.active_words = []
+        self.level = rain_level(self.score)
+        # 단어는 백그라운드 스레드가 카테고리에서 미리 읽어 둠 (after 콜백 안에서 DB 를 기다리지 않음)
+        self.feed = RainWordFeed(category_id, user_id, fallback=[{"english": eng, "meaning": kor} for eng, kor in self.arr],
+                                 rng=random.Random(self.rng.random()))
         self.spawn_word()
 
         self.update()
 
     #메인 메뉴로 나감
     def go_to_menu(self):
+        self.feed.close()
         from menu import main_menu
         main_menu(self.root)
     
@@ -74,16 +86,21 @@ class AcidRainGame:
         if self.lives <= 0:
             return  # 이미 죽었으면 더 이상 단어 생성하지 않음
 
-        eng, kor = random.choice(self.arr)
-        x = random.randint(50, 350)
+        pair = self.feed.next_word()
+        if pair is None:
+            self.root.after(100, self.spawn_word)  # 아직 준비된 단어가 없으면 잠시 후 다시 시도
+            return
+
+        eng, kor, _ = pair
+        x = self.rng.randint(50, 350)
         word_id = self.canvas.create_text(x, 0, text=kor, font=("Arial", 16), fill="black")
         self.active_words.append((word_id, x, 0, eng))  # 영어 단어가 정답으로 저장됨
-        self.root.after(2000, self.spawn_word)
+        self.root.after(self.level.spawn_ms, self.spawn_word)  # 점수가 오를수록 자주 떨어짐
 
     def update(self):
         new_active_words = []
         for word_id, x, y, word in self.active_words:
-            y += 5
+            y += self.level.fall_step  # 점수가 오를수록 빨리 떨어짐
             self.canvas.coords(word_id, x, y)
             if y >= self.wave_y - 15:
                 self.lose_life()
@@ -102,15 +119,22 @@ class AcidRainGame:
         typed_eng = self.entry.get().strip()  # 사용자가 입력한 한글 단어 가져오기 (앞뒤 공백 제거)
         self.entry.delete(0, tk.END)  # 입력창 비우기
 
-        # 현재 화면에 떠 있는 단어들과 비교
+        # 현재 화면에 떠 있는 단어들과 비교 (대소문자/띄어쓰기 무시, 영어 단어는 오타 불허), 맞춘 단어 하나만 처리
+        best = None
         for i, (word_id, x, y, correct_eng) in enumerate(self.active_words):
-            # 사용자가 입력한 영어 단어와 화면에 있는 정답 영어 단어 비교 (대소문자 무시)
-            if typed_eng.lower() == correct_eng.lower():
-                self.canvas.delete(word_id)  # 화면에서 해당 단어 삭제
-                self.score += 1  # 점수 1점 추가
-                self.canvas.itemconfig(self.score_text, text=f"점수: {self.score}")  # 점수 텍스트 업데이트
-                del self.active_words[i]  # 단어 리스트에서 제거
-                break  # 하나 맞추면 루프 종료
+            result = grade(typed_eng, correct_eng)
+            if result.correct and (best is None or result.distance < best[1]):
+                best = (i, result.distance)
+                if result.exact:
+                    break
+        if best is not None:
+            word_id = self.active_words[best[0]][0]
+            self.canvas.delete(word_id)  # 화면에서 해당 단어 삭제
+            self.score += 1  # 점수 1점 추가
+            self.canvas.itemconfig(self.score_text, text=f"점수: {self.score}")  # 점수 텍스트 업데이트
+            del self.active_words[best[0]]  # 단어 리스트에서 제거
+            self.level = rain_level(self.score)  # 난이도 갱신
+            self.feed.set_rarity(self.level.rarity)  # 자주 틀리는 단어 비중을 늘림
 
     def lose_life(self):
         if self.lives > 0:
@@ -120,6 +144,7 @@ class AcidRainGame:
     def game_over(self):
         if hasattr(self, 'after_id'):
             self.root.after_cancel(self.after_id)
+        self.feed.close()
 
         self.canvas.create_text(200, 250, text="Game Over", font=("Arial", 30), fill="red")
         self.canvas.create_text(200, 300, text=f"최종 점수: {self.score}", font=("Arial", 20), fill="black")
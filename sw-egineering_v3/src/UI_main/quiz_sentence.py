@@ -6,6 +6,12 @@ from ttkbootstrap.constants import *
 def quiz_sentence(root1):
     from quiz_result import quiz_result
 
+    #채점기 연결 (뜻 여러 개, 대소문자/띄어쓰기, 한글 답의 작은 오타 허용)
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #나보다 위 디렉토리에 있음
+    from quiz_generation.grading import is_correct
+
     #이런 배열을 데베에서 받았다고 가정
     word_list = [
         ["Today is too cold", "cold", 0, "카테고리1"],
@@ -39,7 +45,7 @@ def quiz_sentence(root1):
         # if entered_text == None:
         #     entered_text = ""
 
-        if (entered_text == word_list[current_index][1]):
+        if is_correct(entered_text, word_list[current_index][1]):
             word_list_anwser[current_index] = 1
         else:
             word_list_anwser[current_index] = 0
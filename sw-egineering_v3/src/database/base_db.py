@@ -1,31 +1,169 @@
 import sqlite3
 import os
+import threading
+import time
+import itertools
+from contextlib import contextmanager
 from typing import Optional, Dict, Any, List, Tuple
 from abc import ABC, abstractmethod
+from .migrations import migrate, MigrationError
+from .retry_policy import RetryPolicy, DEFAULT_RETRY_POLICY, is_lock_error
+from .db_metrics import db_metrics
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'toeic_vocabulary.db')
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+
+_WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+
+# 쓰기 문장인지 확인 (재시도 대상)
+def _is_write_query(query: str) -> bool:
+    return query.lstrip().upper().startswith(_WRITE_KEYWORDS)
+
+
+_memory_db_ids = itertools.count(1)
 
 class BaseDatabase(ABC):
-    def __init__(self, db_path: str = 'toeic_vocabulary.db'):
+    """
+    SQLite DB 공통 기능
+
+    모듈 레벨 싱글톤(quiz_db, user_db 등)을 여러 스레드에서 함께 쓸 수 있도록
+    conn / cursor 는 스레드마다 따로 열리는 연결을 돌려준다.
+    (sqlite3 연결은 만든 스레드에서만 쓸 수 있기 때문)
+    """
+    def __init__(self, db_path: str = 'toeic_vocabulary.db', auto_migrate: bool = True,
+                 busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+                 retry_policy: Optional[RetryPolicy] = None):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
-        # self.initialize_tables()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self._local = threading.local()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._connections_lock = threading.Lock()
+        # 외래 키 검사 설정 (None 이면 SQLite 기본값), 연결은 스레드마다 따로라 새 연결마다 적용
+        self._foreign_keys: Optional[bool] = None
+        self._connect_args = {'database': db_path}
+        self._keepalive = None
+        if db_path == ':memory:':
+            # 스레드별 연결이 같은 메모리 DB를 보도록 공유 캐시 URI 사용
+            self._connect_args = {
+                'database': f"file:toeic_memdb_{next(_memory_db_ids)}?mode=memory&cache=shared",
+                'uri': True,
+            }
+            self._keepalive = self.conn  # 마지막 연결이 닫히면 메모리 DB가 사라지므로 유지
+        # 실제로 연결되는 DB 식별자 (':memory:' 는 인스턴스마다 다른 DB), 캐시 키와 결과 알림에 사용
+        self.db_key = self._connect_args['database'] if db_path == ':memory:' else os.path.abspath(db_path)
+        # 시작 시 스키마 버전 검사 (최신이면 PRAGMA 한 번만 읽음)
+        if auto_migrate:
+            try:
+                self.migrate()
+            except MigrationError as e:
+                print(f"Error migrating database schema: {e}")
+
+    # 새 연결 생성 (스레드마다 한 번)
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(timeout=self.busy_timeout_ms / 1000, check_same_thread=False,
+                               **self._connect_args)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self._foreign_keys is not None:
+            conn.execute(f"PRAGMA foreign_keys = {'ON' if self._foreign_keys else 'OFF'}")
+        with self._connections_lock:
+            # 종료된 스레드가 남긴 연결 정리
+            alive = []
+            for thread, old in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, old))
+                elif old is not self._keepalive:
+                    old.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+        return conn
 
+    # 현재 스레드의 연결
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # 현재 스레드의 커서 (lastrowid, rowcount 도 스레드별로 유지됨)
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    # write_transaction 중첩 깊이 (스레드별)
+    @property
+    def _transaction_depth(self) -> int:
+        return getattr(self._local, 'transaction_depth', 0)
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, value: int):
+        self._local.transaction_depth = value
+
+    # 대기 중인 스키마 마이그레이션 적용, 적용 후 스키마 버전 반환
+    def migrate(self) -> int:
+        return migrate(self.conn)
+
+    # 객체 전체 설정: 현재 스레드 연결에 바로 적용하고, 이후 다른 스레드가 여는 연결에도 적용
     def disable_foreign_keys(self):
+        self._foreign_keys = False
         self.execute("PRAGMA foreign_keys = OFF")
         self.commit()
 
     def enable_foreign_keys(self):
+        self._foreign_keys = True
         self.execute("PRAGMA foreign_keys = ON")
         self.commit()
 
+    # write_transaction 안에서 실패한 문장이 있었는지 (스레드별)
+    @property
+    def _transaction_failed(self) -> bool:
+        return getattr(self._local, 'transaction_failed', False)
+
+    @_transaction_failed.setter
+    def _transaction_failed(self, value: bool):
+        self._local.transaction_failed = value
+
     def execute(self, query: str, params: Tuple = ()) -> bool:
+        """쿼리 실행, 실패하면 False
+
+        write_transaction 블록 안에서는 실패를 False 로 돌려주지 않고 예외를 다시 발생시킵니다.
+        (앞서 성공한 문장만 커밋되지 않도록 블록 전체를 롤백하기 위함)
+        """
         try:
-            self.cursor.execute(query, params)
+            if _is_write_query(query) and not self._transaction_depth:
+                # 다른 연결이 쓰기 잠금을 잡고 있으면 백오프 후 재시도
+                self.retry_policy.run(lambda: self.cursor.execute(query, params))
+            else:
+                self.cursor.execute(query, params)
             return True
         except Exception as e:
+            if self._transaction_depth:
+                self._transaction_failed = True
+                raise
+            if is_lock_error(e):
+                print(f"Database is locked, write dropped after retries: {e}")
+            return False
+
+    # 같은 쿼리를 여러 행에 대해 한 번에 실행 (write_transaction 안에서의 실패는 execute 와 같이 예외)
+    def executemany(self, query: str, rows: List[Tuple]) -> bool:
+        try:
+            if not self._transaction_depth:
+                self.retry_policy.run(lambda: self.cursor.executemany(query, rows))
+            else:
+                self.cursor.executemany(query, rows)
+            return True
+        except Exception as e:
+            if self._transaction_depth:
+                self._transaction_failed = True
+                raise
+            if is_lock_error(e):
+                print(f"Database is locked, write dropped after retries: {e}")
             return False
 
     def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Dict]:
@@ -44,18 +182,72 @@ class BaseDatabase(ABC):
         except Exception as e:
             return []
 
+    # write_transaction 블록 안에서는 블록이 끝날 때 한 번에 커밋
     def commit(self):
-        self.conn.commit()
+        if self._transaction_depth:
+            return
+        self.retry_policy.run(self.conn.commit)
 
     def rollback(self):
         self.conn.rollback()
 
+    @contextmanager
+    def write_transaction(self):
+        """BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡고 블록 전체를 하나의 트랜잭션으로 실행합니다.
+
+        잠금 획득은 재시도 정책을 따르며, 블록에서 예외가 나면 롤백 후 다시 발생시킵니다.
+        블록 안에서 실패한 문장의 예외를 호출한 쪽이 잡아 버렸더라도 블록 전체를 롤백하고
+        sqlite3.DatabaseError 를 발생시킵니다.
+        중첩해서 사용하면 가장 바깥 블록에서만 커밋됩니다.
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        if self.conn.in_transaction:
+            self.conn.commit()
+        started = time.perf_counter()
+        self.retry_policy.run(lambda: self.conn.execute("BEGIN IMMEDIATE"))
+        db_metrics.observe('begin_immediate_seconds', time.perf_counter() - started)
+        self._transaction_depth = 1
+        self._transaction_failed = False
+        started = time.perf_counter()
+        try:
+            yield self
+            self._transaction_depth = 0
+            if self._transaction_failed:
+                raise sqlite3.DatabaseError("write transaction rolled back after a failed statement")
+            self.retry_policy.run(self.conn.commit)
+        except BaseException:
+            self._transaction_depth = 0
+            self._transaction_failed = False
+            self.conn.rollback()
+            db_metrics.increment('write_transaction_rollbacks')
+            raise
+        finally:
+            db_metrics.observe('write_transaction_seconds', time.perf_counter() - started)
+
+    # 모든 스레드의 연결 닫기
     def close(self):
-        self.conn.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self._keepalive = None
+
+    # 현재 열려 있는 스레드별 연결 수
+    def connection_count(self) -> int:
+        with self._connections_lock:
+            return len(self._connections)
 
     @abstractmethod
     def initialize_tables(self):
-        """각 DB 클래스에서 구현해야 하는 테이블 초기화 메서드"""
+        """각 DB 클래스에서 구현해야 하는 테이블 초기화 메서드 (스키마 변경은 migrations.py 에 추가)"""
         raise NotImplementedError("하위 클래스에서 이 메서드를 구현해야 합니다.")
 
     def __enter__(self):
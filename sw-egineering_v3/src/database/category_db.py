@@ -1,9 +1,10 @@
 from typing import List, Dict, Optional
 from .base_db import BaseDatabase, DB_PATH
+from .word_db import _notify_word_change
 
 class CategoryDB(BaseDatabase):
-    def __init__(self, db_path: str = DB_PATH): # 기본 DB 경로 사용
-        super().__init__(db_path)
+    def __init__(self, db_path: str = DB_PATH, **kwargs): # 기본 DB 경로 사용
+        super().__init__(db_path, **kwargs)
 
     # 카테고리 및 카테고리-단어 관계 테이블 생성 및 초기화
     def initialize_tables(self):
@@ -62,6 +63,7 @@ class CategoryDB(BaseDatabase):
                 (category_id, word_id)
             )
             self.commit()
+            _notify_word_change('category', word_id)
             return True
         except Exception as e:
             return False
@@ -74,6 +76,7 @@ class CategoryDB(BaseDatabase):
                 (category_id, word_id)
             )
             self.commit()
+            _notify_word_change('category', word_id)
             return True
         except Exception as e:
             return False
@@ -100,15 +103,20 @@ class CategoryDB(BaseDatabase):
                 print("Error: Category not found or permission denied.")
                 return False
 
-            self.execute(
-                "DELETE FROM WordCategory WHERE category_id = ?",
-                (category_id,)
-            )
-            self.execute(
-                "DELETE FROM Category WHERE category_id = ? AND user_id = ?", # user_id 조건 추가
-                (category_id, user_id)
-            )
-            self.commit()
+            word_ids = [row['word_id'] for row in self.fetch_all(
+                "SELECT word_id FROM WordCategory WHERE category_id = ?", (category_id,)
+            )]
+            with self.write_transaction():
+                self.execute(
+                    "DELETE FROM WordCategory WHERE category_id = ?",
+                    (category_id,)
+                )
+                self.execute(
+                    "DELETE FROM Category WHERE category_id = ? AND user_id = ?", # user_id 조건 추가
+                    (category_id, user_id)
+                )
+            for word_id in word_ids:
+                _notify_word_change('category', word_id)
             return True
         except Exception as e:
             self.rollback()
@@ -233,4 +241,5 @@ class CategoryDB(BaseDatabase):
             (category_id,)
         )
 
-category_db = CategoryDB() # DB_PATH 사용하도록 변경 
\ No newline at end of file
+# import 만으로 실제 DB 를 바꾸지 않도록 마이그레이션은 앱 시작 시 한 번 (UI_main/main.py)
+category_db = CategoryDB(auto_migrate=False) # DB_PATH 사용하도록 변경
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+DB 잠금 관련 지표 (카운터 / 히스토그램)
+
+- 여러 DB 인스턴스와 스레드가 같은 모듈 레벨 db_metrics 에 기록한다.
+- snapshot() 으로 현재 값을 dict 로 조회할 수 있다.
+"""
+import bisect
+import threading
+from typing import Dict, List, Sequence
+
+# 대기 시간 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (마지막 버킷은 +Inf)"""
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    # 버킷 경계로 근사한 백분위수
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'max': round(self.max, 6),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['inf'], self.counts)),
+        }
+
+
+class DBMetrics:
+    """스레드 안전한 카운터와 히스토그램 모음"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(value)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def histogram(self, name: str) -> Dict:
+        with self._lock:
+            hist = self._histograms.get(name)
+            return hist.to_dict() if hist else Histogram().to_dict()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'histograms': {k: v.to_dict() for k, v in self._histograms.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# 모든 DB 인스턴스가 공유하는 지표 저장소
+db_metrics = DBMetrics()
@@ -3,8 +3,12 @@ from .base_db import BaseDatabase
 
 class GameDB(BaseDatabase):
     # GameDB 인스턴스 초기화
-    def __init__(self, db_path: str = 'toeic_vocabulary.db'):
-        super().__init__(db_path)
+    def __init__(self, db_path: str = 'toeic_vocabulary.db', **kwargs):
+        super().__init__(db_path, **kwargs)
+
+    # GameScore 테이블은 migrations.py 에서 관리
+    def initialize_tables(self):
+        self.migrate()
 
     # 게임 점수 저장 (핵심 기능)
     def save_score(self, user_id: int, game_type: str, score: int) -> bool:
@@ -109,27 +113,18 @@ class GameDB(BaseDatabase):
             return False
 
 class GameScoreDB(BaseDatabase):
-    # GameScore 테이블 생성 및 초기화
+    # GameScore 테이블 생성 및 초기화 (기존 점수는 유지, 스키마는 migrations.py 에서 관리)
     def initialize_tables(self):
-        self.execute("DROP TABLE IF EXISTS GameScore")
-        self.execute("""
-        CREATE TABLE IF NOT EXISTS GameScore (
-            score_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            quiz_id INTEGER,
-            user_id INTEGER,
-            score INTEGER NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (quiz_id) REFERENCES quiz(quiz_id),
-            FOREIGN KEY (user_id) REFERENCES User(user_id)
-        )
-        """)
-        self.commit()
+        self.migrate()
 
-    # 퀴즈별 점수 저장
+    # 퀴즈별 점수 저장 (game_type 은 퀴즈 유형으로 함께 채워 GameDB 랭킹과 공유)
     def save_score(self, quiz_id, user_id, score):
         self.execute(
-            "INSERT INTO GameScore (quiz_id, user_id, score) VALUES (?, ?, ?)",
-            (quiz_id, user_id, score)
+            """
+            INSERT INTO GameScore (quiz_id, user_id, score, game_type)
+            VALUES (?, ?, ?, (SELECT quiz_type FROM quiz WHERE quiz_id = ?))
+            """,
+            (quiz_id, user_id, score, quiz_id)
         )
         self.commit()
         return self.cursor.lastrowid
@@ -149,4 +144,5 @@ class GameScoreDB(BaseDatabase):
         )
 
 # GameDB 인스턴스 생성
-game_db = GameDB() 
\ No newline at end of file
+# import 만으로 실제 DB 를 바꾸지 않도록 마이그레이션은 앱 시작 시 한 번 (UI_main/main.py)
+game_db = GameDB(auto_migrate=False)
\ No newline at end of file
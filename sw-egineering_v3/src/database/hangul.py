@@ -0,0 +1,53 @@
+"""
+한글 초성 추출
+
+완성형 한글 음절(U+AC00 ~ U+D7A3)은
+((초성 * 21) + 중성) * 28 + 종성 순서로 배치되어 있으므로,
+음절마다 초성을 미리 계산한 변환 표 하나로 str.translate 한 번에 추출한다.
+한글 음절이 아닌 문자(공백, 문장부호, 영문, 낱자 자모)는 그대로 둔다.
+"""
+from typing import Iterable, List
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_COUNT = 11172
+SYLLABLES_PER_CHOSEONG = 21 * 28
+
+# 초성 19자 (호환용 자모), 음절 배치 순서
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+# 음절 -> 초성 변환 표
+_CHOSEONG_TABLE = {
+    SYLLABLE_BASE + i: CHOSEONG[i // SYLLABLES_PER_CHOSEONG] for i in range(SYLLABLE_COUNT)
+}
+
+
+# 음절 -> 자모(초성, 중성, 종성) 분해 표, 한 글자 오타를 자모 하나 차이로 보기 위함
+_JAMO_TABLE = {
+    SYLLABLE_BASE + i: (
+        chr(0x1100 + i // SYLLABLES_PER_CHOSEONG)
+        + chr(0x1161 + (i % SYLLABLES_PER_CHOSEONG) // 28)
+        + (chr(0x11A7 + i % 28) if i % 28 else "")
+    )
+    for i in range(SYLLABLE_COUNT)
+}
+
+
+# 완성형 한글 음절인지 확인
+def is_hangul_syllable(ch: str) -> bool:
+    return SYLLABLE_BASE <= ord(ch) < SYLLABLE_BASE + SYLLABLE_COUNT
+
+
+# 초성 추출 (예: "사과" -> "ㅅㄱ", "사과, apple" -> "ㅅㄱ, apple")
+def choseong(text: str) -> str:
+    return (text or "").translate(_CHOSEONG_TABLE)
+
+
+# 여러 문자열의 초성을 한 번에 추출
+def choseong_many(texts: Iterable[str]) -> List[str]:
+    table = _CHOSEONG_TABLE
+    return [(text or "").translate(table) for text in texts]
+
+
+# 자모 단위로 분해 (예: "사과" -> ㅅ,ㅏ,ㄱ,ㅘ 에 해당하는 4글자), 한글 음절이 아닌 문자는 그대로
+def decompose(text: str) -> str:
+    return (text or "").translate(_JAMO_TABLE)
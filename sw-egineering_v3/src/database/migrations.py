@@ -0,0 +1,291 @@
+"""
+스키마 마이그레이션 엔진
+
+- 현재 스키마 버전은 PRAGMA user_version 에 기록한다.
+- 각 마이그레이션은 버전 순서대로 하나의 트랜잭션 안에서 적용되며,
+  실패하면 해당 마이그레이션 전체가 롤백된다.
+- 적용할 마이그레이션이 없으면 PRAGMA 한 번만 읽고 끝나므로 시작 시 검사 비용은 O(1)이다.
+- 어떤 마이그레이션도 기존 테이블을 DROP 하지 않는다.
+"""
+import sqlite3
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .hangul import choseong_many
+from .weakness import next_score
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class MigrationError(Exception):
+    """마이그레이션 적용 중 발생한 오류"""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    steps: Tuple[Step, ...]
+
+
+# 테이블의 컬럼 이름 목록 조회
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+# 컬럼이 없을 때만 추가 (이미 있는 DB에도 안전하게 적용하기 위함)
+def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, ddl: str):
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# GameDB(game_type)와 GameScoreDB(quiz_id)가 서로 다른 컬럼을 쓰던 GameScore 테이블을 통합
+def _unify_game_score_columns(conn: sqlite3.Connection):
+    _add_column_if_missing(conn, "GameScore", "game_type", "TEXT")
+    _add_column_if_missing(conn, "GameScore", "quiz_id", "INTEGER REFERENCES quiz(quiz_id)")
+    # ALTER TABLE 은 CURRENT_TIMESTAMP 기본값을 허용하지 않으므로 NULL 허용 컬럼으로 추가
+    _add_column_if_missing(conn, "GameScore", "created_at", "DATETIME")
+
+
+# quiz_id 로만 저장된 점수에 game_type(퀴즈 유형)을 채워 넣음
+_BACKFILL_GAME_TYPE = """
+UPDATE GameScore
+SET game_type = (SELECT q.quiz_type FROM quiz q WHERE q.quiz_id = GameScore.quiz_id)
+WHERE game_type IS NULL AND quiz_id IS NOT NULL
+"""
+
+
+# 미리 만들어 둔 문제(문제 은행)를 단어와 연결하고, 단어 수정 시 무효화 여부를 기록
+def _add_question_bank_columns(conn: sqlite3.Connection):
+    _add_column_if_missing(conn, "quiz_question", "word_id", "INTEGER REFERENCES Word(word_id)")
+    _add_column_if_missing(conn, "quiz_question", "stale", "INTEGER NOT NULL DEFAULT 0")
+
+
+# 뜻의 초성(ㅅㄱ 등)을 미리 계산해 두는 컬럼 추가 후 기존 단어 채우기
+def _add_word_choseong(conn: sqlite3.Connection):
+    _add_column_if_missing(conn, "Word", "choseong", "TEXT")
+    rows = conn.execute("SELECT word_id, meaning FROM Word WHERE choseong IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE Word SET choseong = ? WHERE word_id = ?",
+        zip(choseong_many(row[1] for row in rows), (row[0] for row in rows))
+    )
+
+
+# 문제 대신 (단어 id 목록, seed) 만 저장해 퀴즈를 다시 만들 수 있게 하는 컬럼 추가
+def _add_quiz_recipe_columns(conn: sqlite3.Connection):
+    _add_column_if_missing(conn, "quiz", "word_ids", "TEXT")
+    _add_column_if_missing(conn, "quiz", "seed", "INTEGER")
+
+
+# 기존 퀴즈 이력으로 사용자별 단어 취약도 채우기 (이력 순서대로 한 번 훑음)
+def _backfill_word_weakness(conn: sqlite3.Connection):
+    stats = {}
+    for user_id, word_id, is_correct, studied_at in conn.execute(
+        "SELECT user_id, word_id, is_correct, studied_at FROM WordHistory "
+        "WHERE study_type = 'quiz' ORDER BY history_id"
+    ):
+        score, attempts, wrong, _ = stats.get((user_id, word_id), (None, 0, 0, None))
+        stats[(user_id, word_id)] = (next_score(score, bool(is_correct)), attempts + 1,
+                                     wrong + (0 if is_correct else 1), studied_at)
+    conn.executemany(
+        "INSERT OR REPLACE INTO UserWordWeakness (user_id, word_id, score, attempts, wrong, last_seen) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [(user_id, word_id, *values) for (user_id, word_id), values in stats.items()]
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base_schema", (
+        """
+        CREATE TABLE IF NOT EXISTS User (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_login_id TEXT UNIQUE NOT NULL,
+            user_pw TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            is_admin BOOLEAN DEFAULT 0,
+            user_api TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Word (
+            word_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            english TEXT NOT NULL,
+            meaning TEXT NOT NULL,
+            part_of_speech TEXT,
+            example_sentence TEXT,
+            wrong_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS WordHistory (
+            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            word_id INTEGER NOT NULL,
+            is_correct INTEGER NOT NULL,
+            study_type TEXT NOT NULL,
+            studied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (word_id) REFERENCES Word(word_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Category (
+            category_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+            UNIQUE (user_id, name)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS WordCategory (
+            category_id INTEGER,
+            word_id INTEGER,
+            PRIMARY KEY (category_id, word_id),
+            FOREIGN KEY (category_id) REFERENCES Category(category_id) ON DELETE CASCADE,
+            FOREIGN KEY (word_id) REFERENCES Word(word_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS quiz (
+            quiz_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quiz_type TEXT NOT NULL,
+            category_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES Category(category_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS quiz_question (
+            question_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quiz_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            correct_answer TEXT NOT NULL,
+            options TEXT,
+            hint TEXT,
+            FOREIGN KEY (quiz_id) REFERENCES quiz(quiz_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS GameScore (
+            score_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            game_type TEXT,
+            quiz_id INTEGER,
+            score INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (quiz_id) REFERENCES quiz(quiz_id),
+            FOREIGN KEY (user_id) REFERENCES User(user_id)
+        )
+        """,
+    )),
+    Migration(2, "unify_game_score", (
+        _unify_game_score_columns,
+    )),
+    Migration(3, "core_indexes", (
+        "CREATE INDEX IF NOT EXISTS idx_wordhistory_user_word ON WordHistory(user_id, study_type, word_id)",
+        "CREATE INDEX IF NOT EXISTS idx_wordcategory_word ON WordCategory(word_id)",
+        "CREATE INDEX IF NOT EXISTS idx_word_english ON Word(english)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_category ON quiz(category_id, quiz_type)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_question_quiz ON quiz_question(quiz_id)",
+        "CREATE INDEX IF NOT EXISTS idx_gamescore_type_score ON GameScore(game_type, score DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_gamescore_user ON GameScore(user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_gamescore_quiz ON GameScore(quiz_id, score DESC)",
+    )),
+    Migration(4, "backfill_game_type", (
+        _BACKFILL_GAME_TYPE,
+    )),
+    Migration(5, "question_bank", (
+        _add_question_bank_columns,
+        "CREATE INDEX IF NOT EXISTS idx_quiz_question_bank ON quiz_question(quiz_id, stale)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_question_word ON quiz_question(word_id)",
+    )),
+    Migration(6, "word_choseong", (
+        _add_word_choseong,
+        "CREATE INDEX IF NOT EXISTS idx_word_choseong ON Word(choseong)",
+    )),
+    Migration(7, "quiz_recipe", (
+        _add_quiz_recipe_columns,
+    )),
+    Migration(8, "word_weakness", (
+        """
+        CREATE TABLE IF NOT EXISTS UserWordWeakness (
+            user_id INTEGER NOT NULL,
+            word_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            wrong INTEGER NOT NULL DEFAULT 0,
+            last_seen TIMESTAMP,
+            PRIMARY KEY (user_id, word_id),
+            FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (word_id) REFERENCES Word(word_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+        _backfill_word_weakness,
+        "CREATE INDEX IF NOT EXISTS idx_weakness_user_score ON UserWordWeakness(user_id, score DESC)",
+    )),
+]
+
+
+# 현재 스키마 버전 조회
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# 아직 적용되지 않은 마이그레이션 목록
+def pending_migrations(conn: sqlite3.Connection,
+                       migrations: Sequence[Migration] = MIGRATIONS) -> List[Migration]:
+    current = get_schema_version(conn)
+    return [m for m in migrations if m.version > current]
+
+
+# 마이그레이션 하나를 트랜잭션으로 적용
+def _apply(conn: sqlite3.Connection, migration: Migration):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # 다른 연결이 먼저 적용했을 수 있으므로 쓰기 잠금을 잡은 뒤 다시 확인
+        if get_schema_version(conn) >= migration.version:
+            conn.rollback()
+            return
+        for step in migration.steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        # user_version 도 같은 트랜잭션에 포함되므로 실패 시 함께 롤백됨
+        conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise MigrationError(
+            f"마이그레이션 {migration.version}({migration.name}) 적용 실패: {e}"
+        ) from e
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration] = MIGRATIONS,
+            target: Optional[int] = None) -> int:
+    """대기 중인 마이그레이션을 버전 순서대로 적용합니다.
+
+    Args:
+        conn: 대상 DB 연결.
+        migrations: 버전 오름차순으로 정렬된 마이그레이션 목록.
+        target: 이 버전까지만 적용 (None 이면 최신 버전까지).
+
+    Returns:
+        적용 후 스키마 버전.
+    """
+    if not migrations:
+        return get_schema_version(conn)
+    latest = migrations[-1].version if target is None else target
+    current = get_schema_version(conn)
+    if current >= latest:
+        # 최신 상태: PRAGMA 한 번으로 검사 종료
+        return current
+    if conn.in_transaction:
+        raise MigrationError("열린 트랜잭션이 있는 상태에서는 마이그레이션을 적용할 수 없습니다.")
+
+    for migration in migrations:
+        if current < migration.version <= latest:
+            _apply(conn, migration)
+            current = migration.version
+    return current
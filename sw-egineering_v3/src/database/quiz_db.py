@@ -1,33 +1,41 @@
-from typing import Dict, List, Optional, Tuple
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 from .base_db import BaseDatabase
+from .weakness import ALPHA, PRIOR
 import random
 
+# 퀴즈 결과 알림 (가중치 캐시 갱신용), callback(db_key, user_id, word_id, is_correct)
+_result_listeners: List[Callable[[str, int, int, bool], None]] = []
+_result_listeners_lock = threading.Lock()
+
+
+def add_result_listener(callback: Callable[[str, int, int, bool], None]):
+    with _result_listeners_lock:
+        if callback not in _result_listeners:
+            _result_listeners.append(callback)
+
+
+def remove_result_listener(callback: Callable[[str, int, int, bool], None]):
+    with _result_listeners_lock:
+        if callback in _result_listeners:
+            _result_listeners.remove(callback)
+
+
+# 커밋된 결과만 알림, 리스너 오류는 DB 작업에 영향 주지 않음
+def _notify_result(db_key: str, user_id: int, word_id: int, is_correct: bool):
+    with _result_listeners_lock:
+        listeners = list(_result_listeners)
+    for callback in listeners:
+        try:
+            callback(db_key, user_id, word_id, is_correct)
+        except Exception as e:
+            print(f"Error in result listener: {e}")
+
+
 class QuizDB(BaseDatabase):
-    # 퀴즈 및 퀴즈 문제 테이블 생성 및 초기화
+    # 퀴즈 및 퀴즈 문제 테이블 생성 및 초기화 (기존 데이터는 유지, 스키마는 migrations.py 에서 관리)
     def initialize_tables(self):
-        self.execute("DROP TABLE IF EXISTS quiz")
-        self.execute("DROP TABLE IF EXISTS quiz_question")
-        self.execute("""
-        CREATE TABLE IF NOT EXISTS quiz (
-            quiz_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            quiz_type TEXT NOT NULL,
-            category_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (category_id) REFERENCES Category(category_id)
-        )
-        """)
-        self.execute("""
-        CREATE TABLE IF NOT EXISTS quiz_question (
-            question_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            quiz_id INTEGER NOT NULL,
-            question TEXT NOT NULL,
-            correct_answer TEXT NOT NULL,
-            options TEXT,
-            hint TEXT,
-            FOREIGN KEY (quiz_id) REFERENCES quiz(quiz_id)
-        )
-        """)
-        self.commit()
+        self.migrate()
 
     # 퀴즈 생성 (핵심 기능)
     def create_quiz(self, quiz_type: str, category_id: Optional[int] = None) -> int:
@@ -51,6 +59,138 @@ class QuizDB(BaseDatabase):
         self.commit()
         return self.cursor.lastrowid
 
+    # 여러 문제를 executemany 로 한 번에 추가, rows 는 (question, correct_answer, options, hint, word_id)
+    def add_quiz_questions(self, quiz_id: int, rows: List[Tuple]) -> bool:
+        try:
+            with self.write_transaction():
+                self.executemany(
+                    """
+                    INSERT INTO quiz_question (quiz_id, question, correct_answer, options, hint, word_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [(quiz_id, *row) for row in rows]
+                )
+            return True
+        except Exception as e:
+            print(f"Error in add_quiz_questions: {e}")
+            return False
+
+    # 문제 은행 저장: 새 퀴즈 생성, 문제 일괄 추가, 새로 만든 단어의 이전(stale) 문제 삭제를 하나의 트랜잭션으로 처리
+    def save_question_bank(self, quiz_type: str, category_id: Optional[int], rows: List[Tuple]) -> Optional[int]:
+        try:
+            with self.write_transaction():
+                quiz_id = self.create_quiz(quiz_type, category_id)
+                if not self.add_quiz_questions(quiz_id, rows):
+                    raise RuntimeError("문제 저장 실패")
+                self.executemany(
+                    """
+                    DELETE FROM quiz_question
+                    WHERE word_id = ? AND stale = 1 AND quiz_id IN (
+                        SELECT quiz_id FROM quiz WHERE quiz_type = ? AND category_id IS ?
+                    )
+                    """,
+                    [(row[4], quiz_type, category_id) for row in rows]
+                )
+            return quiz_id
+        except Exception as e:
+            print(f"Error in save_question_bank: {e}")
+            return None
+
+    # 퀴즈 레시피 저장: 문제 대신 단어 id 목록(쉼표 구분)과 seed 만 기록
+    def save_quiz_recipe(self, quiz_type: str, word_ids: List[int], seed: int,
+                         category_id: Optional[int] = None) -> Optional[int]:
+        try:
+            with self.write_transaction():
+                self.execute(
+                    "INSERT INTO quiz (quiz_type, category_id, word_ids, seed) VALUES (?, ?, ?, ?)",
+                    (quiz_type, category_id, ",".join(str(int(word_id)) for word_id in word_ids), seed)
+                )
+                return self.cursor.lastrowid
+        except Exception as e:
+            print(f"Error in save_quiz_recipe: {e}")
+            return None
+
+    # 퀴즈 레시피 조회, 레시피로 저장되지 않은 퀴즈는 None
+    def get_quiz_recipe(self, quiz_id: int) -> Optional[Dict]:
+        row = self.fetch_one(
+            "SELECT quiz_id, quiz_type, category_id, word_ids, seed FROM quiz WHERE quiz_id = ?",
+            (quiz_id,)
+        )
+        if row is None or row["word_ids"] is None or row["seed"] is None:
+            return None
+        row["word_ids"] = [int(word_id) for word_id in row["word_ids"].split(",") if word_id]
+        return row
+
+    # id 목록의 단어를 주어진 순서대로 조회 (없는 단어는 빠짐)
+    def get_words_by_ids(self, word_ids: List[int]) -> List[Dict]:
+        if not word_ids:
+            return []
+        rows = self.fetch_all(
+            f"""
+            SELECT word_id, english, meaning, part_of_speech, example_sentence, choseong
+            FROM Word
+            WHERE word_id IN ({", ".join("?" * len(set(word_ids)))})
+            """,
+            tuple(set(word_ids))
+        )
+        by_id = {row["word_id"]: row for row in rows}
+        return [dict(by_id[word_id]) for word_id in word_ids if word_id in by_id]
+
+    # 미리 만들어 둔(무효화되지 않은) 문제 조회 - 인덱스를 타는 단일 쿼리
+    def get_ready_questions(self, quiz_type: str, category_id: Optional[int] = None,
+                            limit: int = -1) -> List[Dict]:
+        return self.fetch_all(
+            """
+            SELECT qq.question_id, qq.quiz_id, qq.word_id, qq.question, qq.correct_answer, qq.options, qq.hint
+            FROM quiz q
+            JOIN quiz_question qq ON qq.quiz_id = q.quiz_id AND qq.stale = 0
+            WHERE q.quiz_type = ? AND q.category_id IS ?
+            ORDER BY qq.question_id
+            LIMIT ?
+            """,
+            (quiz_type, category_id, limit)
+        )
+
+    # 카테고리의 전체 단어 조회 (사지선다 오답 후보용), category_id 가 None 이면 전체 단어
+    # word_id 순으로 고정해서 같은 seed 의 오답 보기가 다시 만들어지도록 함
+    def get_category_words(self, category_id: Optional[int] = None) -> List[Dict]:
+        if category_id is None:
+            return self.fetch_all(
+                "SELECT word_id, english, meaning, part_of_speech, example_sentence, choseong FROM Word ORDER BY word_id"
+            )
+        return self.fetch_all(
+            """
+            SELECT w.word_id, w.english, w.meaning, w.part_of_speech, w.example_sentence, w.choseong
+            FROM WordCategory wc
+            JOIN Word w ON w.word_id = wc.word_id
+            WHERE wc.category_id = ?
+            ORDER BY w.word_id
+            """,
+            (category_id,)
+        )
+
+    # 문제 은행에 아직 (유효한) 문제가 없는 단어 조회, category_id 가 None 이면 전체 단어 대상
+    def get_words_without_questions(self, quiz_type: str, category_id: Optional[int] = None) -> List[Dict]:
+        category_filter = (
+            "WHERE w.word_id IN (SELECT word_id FROM WordCategory WHERE category_id = ?)"
+            if category_id is not None else "WHERE ? IS NULL"
+        )
+        return self.fetch_all(
+            f"""
+            SELECT w.word_id, w.english, w.meaning, w.part_of_speech, w.example_sentence, w.choseong
+            FROM Word w
+            {category_filter}
+            AND NOT EXISTS (
+                SELECT 1 FROM quiz_question qq
+                JOIN quiz q ON q.quiz_id = qq.quiz_id
+                WHERE qq.word_id = w.word_id AND qq.stale = 0
+                  AND q.quiz_type = ? AND q.category_id IS ?
+            )
+            ORDER BY w.word_id
+            """,
+            (category_id, quiz_type, category_id)
+        )
+
     # 퀴즈 상세 정보(문제 포함) 조회
     def get_quiz(self, quiz_id: int) -> Dict:
         quiz = self.fetch_one("SELECT * FROM quiz WHERE quiz_id = ?", (quiz_id,))
@@ -103,6 +243,7 @@ class QuizDB(BaseDatabase):
             )
 
     # 난이도별 단어 목록 조회 (wrong_count 기준)
+    # 반복해서 뽑을 때는 quiz_generation.word_sampler.sample_words(min_wrong=...) 가 전체 정렬 없이 뽑음
     def get_words_by_difficulty(self, difficulty_level: int, count: int = 10) -> List[Dict]:
         return self.fetch_all(
             """
@@ -116,29 +257,66 @@ class QuizDB(BaseDatabase):
             (difficulty_level, count)
         )
 
-    # 퀴즈 결과 기록 (핵심 기능)
+    # 퀴즈 결과 기록 (핵심 기능) - 이력 추가, 오답 횟수와 취약도 갱신을 하나의 쓰기 트랜잭션으로 처리
     def record_quiz_result(self, user_id: int, word_id: int, is_correct: bool) -> bool:
         try:
-            self.execute(
-                """
-                INSERT INTO WordHistory (
-                    user_id, word_id, is_correct, study_type
-                ) VALUES (?, ?, ?, 'quiz')
-                """,
-                (user_id, word_id, 1 if is_correct else 0)
-            )
-            if not is_correct:
+            with self.write_transaction():
                 self.execute(
                     """
-                    UPDATE Word
-                    SET wrong_count = wrong_count + 1
-                    WHERE word_id = ?
+                    INSERT INTO WordHistory (
+                        user_id, word_id, is_correct, study_type
+                    ) VALUES (?, ?, ?, 'quiz')
                     """,
-                    (word_id,)
+                    (user_id, word_id, 1 if is_correct else 0)
+                )
+                if not is_correct:
+                    self.execute(
+                        """
+                        UPDATE Word
+                        SET wrong_count = wrong_count + 1
+                        WHERE word_id = ?
+                        """,
+                        (word_id,)
+                    )
+                # 취약도는 이전 값에서 한 번에 갱신 (이력 전체를 다시 계산하지 않음, weakness.py 참고)
+                miss = 0.0 if is_correct else 1.0
+                self.execute(
+                    """
+                    INSERT INTO UserWordWeakness (user_id, word_id, score, attempts, wrong, last_seen)
+                    VALUES (?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (user_id, word_id) DO UPDATE SET
+                        score = score + ? * (? - score),
+                        attempts = attempts + 1,
+                        wrong = wrong + excluded.wrong,
+                        last_seen = excluded.last_seen
+                    """,
+                    (user_id, word_id, PRIOR + ALPHA * (miss - PRIOR), int(miss), ALPHA, miss)
                 )
-            return True
         except Exception as e:
+            # 블록 전체가 롤백되었으므로 캐시된 가중치도 바꾸지 않음
+            print(f"Error in record_quiz_result: {e}")
             return False
+        _notify_result(self.db_key, user_id, word_id, is_correct)
+        return True
+
+    # 가중치 샘플링용 단어 목록 (오답 횟수, 사용자 취약도 포함) - 한 번의 쿼리로 읽음
+    # user_id 가 None 이면 weakness 는 NULL, category_id 가 None 이면 전체 단어
+    def get_sampling_words(self, user_id: Optional[int] = None, category_id: Optional[int] = None) -> List[Dict]:
+        category_filter = (
+            "WHERE w.word_id IN (SELECT word_id FROM WordCategory WHERE category_id = ?)"
+            if category_id is not None else "WHERE ? IS NULL"
+        )
+        return self.fetch_all(
+            f"""
+            SELECT w.word_id, w.english, w.meaning, w.part_of_speech, w.example_sentence, w.choseong,
+                   w.wrong_count, uw.score as weakness
+            FROM Word w
+            LEFT JOIN UserWordWeakness uw ON uw.user_id = ? AND uw.word_id = w.word_id
+            {category_filter}
+            ORDER BY w.word_id
+            """,
+            (user_id, category_id)
+        )
 
     # 사용자별 퀴즈 이력 조회
     def get_user_quiz_history(self, user_id: int, limit: int = 50) -> List[Dict]:
@@ -154,26 +332,83 @@ class QuizDB(BaseDatabase):
             (user_id, limit)
         )
 
-    # 사용자 취약 단어 목록 조회
+    # 사용자 취약 단어 목록 조회 (정답률 70% 미만) - 미리 계산된 취약도 순, 이력 전체를 GROUP BY 하지 않음
     def get_user_weak_words(self, user_id: int, limit: int = 10) -> List[Dict]:
         return self.fetch_all(
             """
-            SELECT w.*, 
-                   COUNT(CASE WHEN h.is_correct = 0 THEN 1 END) as wrong_count,
-                   COUNT(h.history_id) as total_attempts,
-                   CAST(COUNT(CASE WHEN h.is_correct = 1 THEN 1 END) AS FLOAT) / 
-                   COUNT(h.history_id) * 100 as accuracy_rate
-            FROM Word w
-            JOIN WordHistory h ON w.word_id = h.word_id
-            WHERE h.user_id = ? AND h.study_type = 'quiz'
-            GROUP BY w.word_id
-            HAVING accuracy_rate < 70
-            ORDER BY accuracy_rate ASC
+            SELECT w.*,
+                   uw.wrong as wrong_count,
+                   uw.attempts as total_attempts,
+                   CAST(uw.attempts - uw.wrong AS FLOAT) / uw.attempts * 100 as accuracy_rate,
+                   uw.score as weakness
+            FROM UserWordWeakness uw
+            JOIN Word w ON w.word_id = uw.word_id
+            WHERE uw.user_id = ? AND uw.wrong * 10 > uw.attempts * 3
+            ORDER BY uw.score DESC
             LIMIT ?
             """,
             (user_id, limit)
         )
 
+    # 취약도가 높은 단어 상위 limit 개 - (user_id, score) 인덱스를 따라 limit 개만 읽음
+    def get_top_weak_words(self, user_id: int, limit: int = 10, min_score: float = PRIOR,
+                           exclude: Tuple[int, ...] = ()) -> List[Dict]:
+        exclude_filter = f"AND uw.word_id NOT IN ({', '.join('?' * len(exclude))})" if exclude else ""
+        return self.fetch_all(
+            f"""
+            SELECT w.word_id, w.english, w.meaning, w.part_of_speech, w.example_sentence, w.choseong,
+                   uw.score as weakness
+            FROM UserWordWeakness uw
+            JOIN Word w ON w.word_id = uw.word_id
+            WHERE uw.user_id = ? AND uw.score > ? {exclude_filter}
+            ORDER BY uw.score DESC
+            LIMIT ?
+            """,
+            (user_id, min_score, *exclude, limit)
+        )
+
+    # 복습용 임의 단어 count 개 - 전체를 섞지 않고 word_id 범위에서 무작위 위치를 골라 인덱스로 찾음
+    def get_random_review_words(self, count: int, exclude: Tuple[int, ...] = (),
+                                rng: Optional[random.Random] = None) -> List[Dict]:
+        rng = rng or random
+        bounds = self.fetch_one("SELECT MIN(word_id) AS low, MAX(word_id) AS high FROM Word")
+        if not bounds or bounds["low"] is None or count <= 0:
+            return []
+        picked = {}
+        skip = set(exclude)
+        # 빈 id 구간이나 제외 단어에 걸리면 다시 뽑음, 단어가 모자라도 끝나도록 시도 횟수 제한
+        for _ in range(count * 4):
+            if len(picked) >= count:
+                break
+            row = self.fetch_one(
+                """
+                SELECT word_id, english, meaning, part_of_speech, example_sentence, choseong
+                FROM Word WHERE word_id >= ? ORDER BY word_id LIMIT 1
+                """,
+                (rng.randint(bounds["low"], bounds["high"]),)
+            )
+            if row and row["word_id"] not in skip and row["word_id"] not in picked:
+                picked[row["word_id"]] = row
+        # id 가 듬성듬성하면 같은 단어에 몰리므로, 모자란 만큼 임의 위치부터 id 순으로 이어서 채움 (끝에 닿으면 처음부터)
+        # 읽는 행은 필요한 수 + 제외/선택된 수 까지만
+        if len(picked) < count:
+            start = rng.randint(bounds["low"], bounds["high"])
+            limit = count + len(skip) + len(picked)
+            for condition in ("word_id >= ?", "word_id < ?"):
+                rows = self.fetch_all(
+                    f"""
+                    SELECT word_id, english, meaning, part_of_speech, example_sentence, choseong
+                    FROM Word WHERE {condition} ORDER BY word_id LIMIT ?
+                    """,
+                    (start, limit)
+                )
+                for row in rows:
+                    if len(picked) >= count:
+                        break
+                    if row["word_id"] not in skip and row["word_id"] not in picked:
+                        picked[row["word_id"]] = row
+        return list(picked.values())
+
     # 사용자 퀴즈 통계 조회
     def get_quiz_statistics(self, user_id: int) -> Dict:
         return self.fetch_one(
@@ -190,4 +425,5 @@ class QuizDB(BaseDatabase):
             (user_id,)
         )
 
-quiz_db = QuizDB() 
\ No newline at end of file
+# import 만으로 실제 DB 를 바꾸지 않도록 마이그레이션은 앱 시작 시 한 번 (UI_main/main.py)
+quiz_db = QuizDB(auto_migrate=False)
\ No newline at end of file
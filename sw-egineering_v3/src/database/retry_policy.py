@@ -0,0 +1,83 @@
+"""
+SQLITE_BUSY / SQLITE_LOCKED 재시도 정책
+
+다른 프로세스(또는 다른 창의 연결)가 쓰기 잠금을 잡고 있을 때
+지터가 포함된 지수 백오프로 쓰기를 다시 시도한다.
+"""
+import random
+import sqlite3
+import time
+from typing import Callable, Optional, TypeVar
+
+from .db_metrics import db_metrics, DBMetrics
+
+T = TypeVar('T')
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+# 잠금 때문에 실패한 오류인지 확인
+def is_lock_error(error: BaseException) -> bool:
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None and code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED):
+        return True
+    message = str(error).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+class RetryPolicy:
+    """
+    재시도 횟수와 백오프 설정
+
+    Args:
+        max_attempts: 첫 시도를 포함한 최대 시도 횟수
+        base_delay: 첫 재시도 전 최대 대기 시간 (초), 시도마다 두 배로 증가
+        max_delay: 한 번의 대기 시간 상한 (초)
+        rng: 지터 계산에 사용할 난수 생성기
+    """
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.02, max_delay: float = 1.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    # attempt 번째 재시도 전 대기 시간 (상한의 절반 ~ 상한 사이에서 무작위)
+    def delay(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self.rng.uniform(cap / 2, cap)
+
+    def run(self, operation: Callable[[], T], metrics: DBMetrics = db_metrics,
+            sleep: Callable[[float], None] = time.sleep) -> T:
+        """operation 을 실행하고 잠금 오류면 백오프 후 재시도합니다.
+
+        잠금 이외의 오류나 마지막 시도의 잠금 오류는 그대로 전달됩니다.
+        잠금 오류가 한 번이라도 있었다면 첫 시도부터 끝날 때까지의 시간을
+        lock_wait_seconds 히스토그램에 기록합니다.
+        """
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                result = operation()
+            except sqlite3.OperationalError as e:
+                if not is_lock_error(e):
+                    raise
+                metrics.increment('lock_errors')
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    metrics.increment('lock_failures')
+                    metrics.observe('lock_wait_seconds', time.perf_counter() - started)
+                    raise
+                metrics.increment('lock_retries')
+                sleep(self.delay(attempt - 1))
+                continue
+            if attempt:
+                metrics.observe('lock_wait_seconds', time.perf_counter() - started)
+            return result
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
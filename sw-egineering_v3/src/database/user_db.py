@@ -3,12 +3,12 @@ from .base_db import BaseDatabase
 import sqlite3
 
 class UserDB(BaseDatabase):
-    def __init__(self, db_path: str = 'toeic_vocabulary.db'):
-        super().__init__(db_path)
+    def __init__(self, db_path: str = 'toeic_vocabulary.db', **kwargs):
+        super().__init__(db_path, **kwargs)
 
     # User 테이블 생성 및 초기화
     def initialize_tables(self):
-        self.execute("PRAGMA foreign_keys = OFF")
+        self.disable_foreign_keys()
         self.execute("""
         CREATE TABLE IF NOT EXISTS User (
             user_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -19,8 +19,7 @@ class UserDB(BaseDatabase):
             user_api TEXT
         )
         """)
-        self.execute("PRAGMA foreign_keys = ON")
-        self.commit()
+        self.enable_foreign_keys()
 
     # 회원가입: 새로운 사용자 등록, user_id 반환
     def register_user(self, user_login_id, user_pw, user_name, is_admin=0, user_api=None):
@@ -105,4 +104,5 @@ class UserDB(BaseDatabase):
             self.rollback()
             return False
 
-user_db = UserDB() 
\ No newline at end of file
+# import 만으로 실제 DB 를 바꾸지 않도록 마이그레이션은 앱 시작 시 한 번 (UI_main/main.py)
+user_db = UserDB(auto_migrate=False)
\ No newline at end of file
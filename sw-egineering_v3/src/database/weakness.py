@@ -0,0 +1,18 @@
+"""
+사용자별 단어 취약도 (최근 답일수록 크게 반영하는 오답률)
+
+score = score + ALPHA * (오답 여부 - score)
+처음 보는 단어는 PRIOR 에서 시작하므로 PRIOR 보다 크면 평소보다 자주 틀리는 단어다.
+"""
+from typing import Optional
+
+ALPHA = 0.3
+PRIOR = 0.5
+
+
+# 답 하나를 반영한 새 취약도
+def next_score(score: Optional[float], is_correct: bool) -> float:
+    if score is None:
+        score = PRIOR
+    return score + ALPHA * ((0.0 if is_correct else 1.0) - score)
+
@@ -1,6 +1,8 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from .base_db import BaseDatabase
+from .hangul import CHOSEONG, choseong
 import csv
+import threading
 # import os # os 모듈이 직접 사용되지 않으면 삭제 가능
 # import sqlite3 # sqlite3 모듈이 직접 사용되지 않으면 삭제 가능
 # from .category_db import CategoryDB # CategoryDB 임포트 (순환참조 주의하며 실제 경로로)
@@ -18,9 +20,38 @@ import csv
 
 # from .category_db import CategoryDB # CategoryDB 임포트 (순환참조 주의하며 실제 경로로)
 
+# 단어 변경 알림 (단어로 만든 인덱스/캐시 갱신용), callback(event, word_id)
+# event 는 'add', 'update', 'delete', 'category'(단어가 카테고리에 추가/제거됨) 중 하나
+_word_listeners: List[Callable[[str, int], None]] = []
+_word_listeners_lock = threading.Lock()
+
+
+def add_word_listener(callback: Callable[[str, int], None]):
+    with _word_listeners_lock:
+        if callback not in _word_listeners:
+            _word_listeners.append(callback)
+
+
+def remove_word_listener(callback: Callable[[str, int], None]):
+    with _word_listeners_lock:
+        if callback in _word_listeners:
+            _word_listeners.remove(callback)
+
+
+# 커밋된 변경만 알림, 리스너 오류는 DB 작업에 영향 주지 않음
+def _notify_word_change(event: str, word_id: int):
+    with _word_listeners_lock:
+        listeners = list(_word_listeners)
+    for callback in listeners:
+        try:
+            callback(event, word_id)
+        except Exception as e:
+            print(f"Error in word listener: {e}")
+
+
 class WordDB(BaseDatabase):
-    def __init__(self, db_path: str = 'toeic_vocabulary.db'):
-        super().__init__(db_path)
+    def __init__(self, db_path: str = 'toeic_vocabulary.db', **kwargs):
+        super().__init__(db_path, **kwargs)
 
     # CSV 파일에서 단어 데이터 임포트 (카테고리 연결 로직 추가)
     def import_from_csv(self, csv_path: str, user_id: int, category_db_instance: 'CategoryDB') -> bool:
@@ -186,13 +217,13 @@ class WordDB(BaseDatabase):
                 # print(f"Word '{word}' already exists with ID {existing_word['word_id']}. Returning existing ID.") # 이전 메시지에서 로그 추가 제안했었음
                 return existing_word['word_id'] # 중복 시 기존 ID 반환
 
-            # 새 단어 추가
+            # 새 단어 추가 (뜻의 초성도 함께 저장)
             self.execute(
                 """
-                INSERT INTO Word (english, meaning, part_of_speech, example_sentence)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO Word (english, meaning, part_of_speech, example_sentence, choseong)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                (word, meaning, part_of_speech, example)
+                (word, meaning, part_of_speech, example, choseong(meaning))
             )
             self.commit() # 단어 추가 후 커밋
             new_word_id = self.cursor.lastrowid
@@ -203,6 +234,7 @@ class WordDB(BaseDatabase):
                 self.rollback() # 혹시 모를 변경사항 롤백
                 return None
             
+            _notify_word_change('add', new_word_id)
             return new_word_id
         except Exception as e:
             self.rollback()
@@ -256,8 +288,10 @@ class WordDB(BaseDatabase):
     def get_word_detail(self, word_id): # 이 메서드는 get_word_details와 유사. 하나로 통일하거나 역할 분담.
         return self.fetch_one("SELECT example_sentence, pronunciation FROM Word WHERE word_id = ?", (word_id,))
 
-    # 단어 검색 (영어/한글) (카테고리 JOIN 유지)
+    # 단어 검색 (영어/한글) (카테고리 JOIN 유지), 초성만 입력하면 초성 검색
     def search_words(self, keyword: str) -> List[Dict]:
+        if keyword and all(ch in CHOSEONG for ch in keyword):
+            return self.search_by_choseong(keyword)
         keyword_param = f"{keyword}%"
         try:
             return self.fetch_all(
@@ -276,6 +310,28 @@ class WordDB(BaseDatabase):
             print(f"Error in search_words: {e}")
             return []
             
+    # 뜻의 초성으로 단어 검색 (예: "ㅅㄱ" -> 사과), 초성 인덱스 범위 검색
+    def search_by_choseong(self, query: str, limit: int = 50) -> List[Dict]:
+        query = choseong(query.strip())
+        if not query:
+            return []
+        try:
+            return self.fetch_all(
+                """
+                SELECT 
+                    w.*, 
+                    (SELECT GROUP_CONCAT(cat.name) FROM Category cat JOIN WordCategory wc_join ON cat.category_id = wc_join.category_id WHERE wc_join.word_id = w.word_id) as categories
+                FROM Word w
+                WHERE w.choseong >= ? AND w.choseong < ?
+                ORDER BY w.choseong, w.english
+                LIMIT ?
+                """,
+                (query, query + "\uffff", limit)
+            )
+        except Exception as e:
+            print(f"Error in search_by_choseong: {e}")
+            return []
+
     # 단어 조회 (word_id) (카테고리 JOIN 유지)
     def get_word(self, word_id: int) -> Optional[Dict]: # 반환 타입 Optional[Dict]로 명시
         try:
@@ -299,17 +355,22 @@ class WordDB(BaseDatabase):
     # 단어 정보 수정 (카테고리 연결 로직 제거)
     def update_word(self, word_id: int, word: str, meaning: str, part_of_speech: str, example: str) -> bool: # category_id 인자 삭제
         try:
-            # Word 테이블 업데이트
-            self.execute(
-                """
-                UPDATE Word
-                SET english = ?, meaning = ?, part_of_speech = ?, example_sentence = ?
-                WHERE word_id = ?
-                """,
-                (word, meaning, part_of_speech, example, word_id)
-            )
-            self.commit()
-            return self.cursor.rowcount > 0 # 실제로 업데이트 되었는지 확인
+            with self.write_transaction():
+                # Word 테이블 업데이트
+                self.execute(
+                    """
+                    UPDATE Word
+                    SET english = ?, meaning = ?, part_of_speech = ?, example_sentence = ?, choseong = ?
+                    WHERE word_id = ?
+                    """,
+                    (word, meaning, part_of_speech, example, choseong(meaning), word_id)
+                )
+                updated = self.cursor.rowcount > 0 # 실제로 업데이트 되었는지 확인
+                # 이 단어로 미리 만들어 둔 문제는 다시 생성해야 함
+                self.execute("UPDATE quiz_question SET stale = 1 WHERE word_id = ?", (word_id,))
+            if updated:
+                _notify_word_change('update', word_id)
+            return updated
         except Exception as e:
             self.rollback()
             print(f"Error in update_word: {e}")
@@ -318,12 +379,16 @@ class WordDB(BaseDatabase):
     # 단어 삭제 (변경 없음, ON DELETE CASCADE로 WordCategory 등에서 자동 처리 기대)
     def delete_word(self, word_id: int) -> bool:
         try:
-            self.execute(
-                "DELETE FROM Word WHERE word_id = ?",
-                (word_id,)
-            )
-            self.commit()
-            return self.cursor.rowcount > 0
+            with self.write_transaction():
+                self.execute(
+                    "DELETE FROM Word WHERE word_id = ?",
+                    (word_id,)
+                )
+                deleted = self.cursor.rowcount > 0
+                self.execute("UPDATE quiz_question SET stale = 1 WHERE word_id = ?", (word_id,))
+            if deleted:
+                _notify_word_change('delete', word_id)
+            return deleted
         except Exception as e:
             self.rollback()
             print(f"Error in delete_word: {e}")
@@ -0,0 +1,61 @@
+import random
+from typing import Dict, List, Optional
+
+from quiz_generation.base_quiz_gen_class import BaseQuizModel
+from quiz_generation.factory import QuizRecipe, get_spec, new_seed, quiz_from_recipe
+
+
+def adaptive_words(user_id: int, k: int = 10, review_ratio: float = 0.3, db=None,
+                   rng: Optional[random.Random] = None) -> List[Dict]:
+    """
+    Words for an adaptive quiz: the user's weakest words mixed with random review words
+
+    Weak words are read from the per-user weakness table (see
+    database/weakness.py) along its (user_id, score) index, and review
+    words are found by random word_id probes, topped up by a short scan
+    from a random id when the ids are sparse, so picking k words costs
+    O(k log n) whatever the size of the word table and the history.
+    When the user has fewer weak words than slots, the rest is review.
+
+    Args:
+        user_id: user whose weak words are drawn
+        k: number of words
+        review_ratio: share of review words, e.g. 0.3 for 3 of 10
+        db: database with get_top_weak_words() and get_random_review_words(),
+            defaults to quiz_db
+        rng: random source of the review words and of the order
+
+    Returns:
+        word rows in quiz order
+    """
+    if db is None:
+        from database.quiz_db import quiz_db as db
+    rng = rng or random
+    review_ratio = min(max(review_ratio, 0.0), 1.0)
+    weak = db.get_top_weak_words(user_id, k - round(k * review_ratio))
+    review = db.get_random_review_words(k - len(weak), exclude=tuple(word["word_id"] for word in weak), rng=rng)
+    words = weak + review
+    rng.shuffle(words)
+    return words
+
+
+def adaptive_recipe(user_id: int, quiz_type: str = "short_answer_ek", k: int = 10, review_ratio: float = 0.3,
+                    seed: Optional[int] = None, db=None) -> QuizRecipe:
+    """
+    Recipe of an adaptive quiz (see adaptive_words), seed drives both the
+    word choice and the quiz
+    """
+    get_spec(quiz_type)
+    seed = new_seed() if seed is None else seed
+    words = adaptive_words(user_id, k, review_ratio, db, random.Random(seed))
+    return QuizRecipe(quiz_type, tuple(word["word_id"] for word in words), seed)
+
+
+def adaptive_quiz(user_id: int, quiz_type: str = "short_answer_ek", k: int = 10, review_ratio: float = 0.3,
+                  seed: Optional[int] = None, db=None, **options) -> BaseQuizModel:
+    """
+    Adaptive quiz of any registered quiz type
+
+    Store adaptive_recipe() instead to replay the same quiz later.
+    """
+    return quiz_from_recipe(adaptive_recipe(user_id, quiz_type, k, review_ratio, seed, db), db, **options)
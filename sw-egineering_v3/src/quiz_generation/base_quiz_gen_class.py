@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from typing import Iterable, Iterator, Tuple, Optional
+
+from quiz_generation.grading import is_correct
+from quiz_generation.quiz_batch import QuizBatch
 
 
 class BaseQuizModel(ABC):
@@ -7,39 +10,53 @@ class BaseQuizModel(ABC):
     Base class for quiz model
 
     Input:
-        db: database
+        db: word rows, any iterable (a list, a generator, an endless stream)
         APIKEY: optional APIKEY
     Output:
         (Question, Answer, Hint) pairs
     
-    Whole pairs can be retrieved by .get() method at once
-    This class can be used as an iterable, which returns single pairs at a time
+    Pairs are made lazily by _iter_pairs, one word row at a time.
+    Whole pairs can be retrieved by .get() method at once, they are built on
+    the first call and kept in a compact QuizBatch
+    This class can be used as an iterable. Every iter() returns a new
+    iterator, so two loops over the same quiz do not interfere. Before
+    .get() has been called, iterating generates pairs on demand, so a quiz
+    over a large or endless word stream starts at once and keeps no pairs
+    in memory
     """
     def __init__(self, db, APIKEY = None):
-        pass
-
-    @abstractmethod
-    def _parse_db(self, db):
-        pass
+        self.db = db
+        self.APIKEY = APIKEY
+        self._pairs: Optional[QuizBatch] = None
 
     @abstractmethod
-    def _create_pairs(self, parsed_db):
+    def _iter_pairs(self, rows: Iterable) -> Iterator[Tuple[str, str, str]]:
+        """
+        Yields (Question, Answer, Hint) for the given word rows
+        """
         pass
 
-    @abstractmethod
-    def get(self) -> List[Tuple[str,str,str]]:
+    def get(self) -> QuizBatch:
         """
         Returns every (Question, Answer, Hint) pairs
 
         Returns:
-            List[Tuple[str,str,str]]: List of (Question, Answer, Hint)
+            QuizBatch: sequence of (Question, Answer, Hint)
         """
-        pass
+        if self._pairs is None:
+            self._pairs = QuizBatch.from_pairs(self._iter_pairs(iter(self.db)))
+        return self._pairs
     
-    @abstractmethod
-    def __iter__(self):
-        pass
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        if self._pairs is not None:
+            return iter(self._pairs)
+        return self._iter_pairs(iter(self.db))
 
-    @abstractmethod
-    def __next__(self):
-        pass
\ No newline at end of file
+    def check(self, answer: str, correct: str) -> bool:
+        """
+        Grades a typed answer (see quiz_generation.grading)
+
+        Any sense of the correct answer is accepted, ignoring case and
+        spacing, and so are small typos in Hangul answers.
+        """
+        return is_correct(answer, correct)
@@ -1,8 +1,17 @@
 from quiz_generation.base_quiz_gen_class import BaseQuizModel
-from typing import Tuple, List
-from LLM.LLMResponse import get_response
-from googletrans import Translator
-import asyncio
+from typing import Dict, Iterable, Iterator, Tuple, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from LLM.LLMResponse import get_response, get_response_stream, iter_lines
+from LLM.instrumentation import bind_context, current_quiz, llm_context
+from LLM.prompt_planner import PromptPlanner
+from LLM.rate_limit import RateLimiter
+from LLM.resilience import CallPolicy, CallTimeout, CircuitOpenError, get_circuit_breaker, iter_with_timeout
+from LLM.response_cache import ResponseCache, get_default_cache, make_cache_key
+from LLM.structured import array_schema, iter_json_items, parse_stats
+from LLM.tokens import estimate_tokens
+from translation.translator import BatchTranslator, get_default_translator
+import re
+import threading
 
 
 PROMPT_BASE = "주어진 단어에 대하여, 영어로 쓰인, 한국인 사용자가 풀 수 있는 빈칸 퀴즈를 만들어줘."\
@@ -13,16 +22,212 @@ PROMPT_BASE = "주어진 단어에 대하여, 영어로 쓰인, 한국인 사용
                 "[Example]: \"Q:His behavior was clearly ______, driven by a deep-seated need for attention;A:pathological\" "\
                 "[words]:"
 
+PROMPT_JSON_BASE = "주어진 단어에 대하여, 영어로 쓰인, 한국인 사용자가 풀 수 있는 빈칸 퀴즈를 만들어줘."\
+                "각 단어 당 하나의 문제를 만들어줘."\
+                "JSON 배열 외에는 아무것도 출력하지 마."\
+                "[input word format]: \"word1;word2;word3;...\" "\
+                "[output format]: [{\"word\": 입력 단어, \"question\": 빈칸(______)이 있는 문장, \"answer\": 빈칸에 들어갈 단어}, ...] "\
+                "[Example]: [{\"word\": \"pathological\", \"question\": \"His behavior was clearly ______, driven by a deep-seated need for attention\", \"answer\": \"pathological\"}] "\
+                "[words]:"
+
+CLOZE_SCHEMA = array_schema({"word": "string", "question": "string", "answer": "string"})
+
+# "Q:question;A:answer", tolerating numbering and spaces around the markers
+_QA_LINE = re.compile(r"^\s*(?:\d+[.)]\s*)?Q\s*:\s*(?P<q>.+?)\s*;\s*A\s*:\s*(?P<a>.+?)\s*$")
+
+# Size (in estimated tokens) of one generation request, prompt plus expected output
+DEFAULT_CHUNK_TOKEN_BUDGET = 1200
+# Expected output per word, one "Q:...;A:..." line
+OUTPUT_TOKENS_PER_WORD = 30
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CHUNK_RETRIES = 2
+DEFAULT_MODEL = "gemini-2.0-flash"
+# Seconds one LLM request may take before it counts as failed
+DEFAULT_CALL_TIMEOUT = 20.0
+
+
+def _is_exact_answer(word: str, answer: str) -> bool:
+    return answer.strip().lower() == word.lower()
+
+
+def _answer_matches(word: str, answer: str) -> bool:
+    # The model may answer with an inflected form (apple -> apples)
+    word, answer = word.lower(), answer.strip().lower()
+    return answer == word or answer.startswith(word[:max(3, len(word) - 2)])
+
+
+def make_fallback_question(word: str, example: Optional[str]) -> Optional[str]:
+    """
+    Builds a cloze question without the LLM by blanking the word
+    (or an inflected form of it) out of its stored example sentence.
+
+    Args:
+        word (str): Target word.
+        example (Optional[str]): Example sentence of the word.
+
+    Returns:
+        Optional[str]: The question, or None if the word is not in the example.
+    """
+    if not example:
+        return None
+    stem = re.escape(word[:max(3, len(word) - 2)])
+    question, count = re.subn(rf"\b{stem}\w*", "______", example, count=1, flags=re.IGNORECASE)
+    return question if count else None
+
+
+class _HintBatcher:
+    """
+    Translates streamed questions into hints without holding up the stream
+
+    Questions are sent to the translator as they arrive, but only one
+    request per stream is in flight: questions parsed meanwhile wait and
+    go out together in the next request. A chunk thus costs a few
+    translation round trips instead of one per question, and parsing
+    continues while a translation runs.
+
+    Input:
+        submit: texts -> Future of their translations
+        publish: called with (word, question, answer, hint) once translated
+    """
+    def __init__(self, submit, publish):
+        self._submit = submit
+        self._publish = publish
+        self._pending: List[Tuple[str, str, str]] = []
+        self._in_flight = False
+        self._idle = threading.Condition()
+
+    def add(self, items: List[Tuple[str, str, str]]):
+        """
+        Queues (word, question, answer) items for translation
+        """
+        with self._idle:
+            self._pending.extend(items)
+            if self._in_flight or not self._pending:
+                return
+            batch, self._pending, self._in_flight = self._pending, [], True
+        self._send(batch)
+
+    def wait(self):
+        """
+        Waits until every queued item is published
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: not self._in_flight)
+
+    def _send(self, batch: List[Tuple[str, str, str]]):
+        try:
+            future = self._submit([question for _, question, _ in batch])
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(lambda done: self._done(batch, done))
+
+    def _done(self, batch: List[Tuple[str, str, str]], future: Future):
+        try:
+            try:
+                hints = future.result()
+            except Exception as e:
+                print(f"Translation failed: {e}")
+                hints = [""] * len(batch)
+            for (word, question, answer), hint in zip(batch, hints):
+                self._publish(word, question, answer, hint)
+        finally:
+            with self._idle:
+                batch, self._pending = self._pending, []
+                self._in_flight = bool(batch)
+                if not batch:
+                    self._idle.notify_all()
+        if batch:
+            self._send(batch)
+
 
 class ClozeQuizModel(BaseQuizModel):
-    def __init__(self, db, APIKEY=None):
+    """
+    Cloze quiz generated by LLM
+
+    Questions are cached per word, so only words without a cached question
+    are sent. Those are packed into prompts that fit chunk_token_budget and
+    the prompts are generated concurrently, so latency stays close to one
+    small request. A failed or incomplete chunk is retried on its own.
+    Estimated tokens of every request are kept in token_usage.
+
+    With structured=True the provider is asked for a JSON array that follows
+    CLOZE_SCHEMA. Items are validated one by one while they stream in, and
+    only the words of invalid items are asked again. Accepted and rejected
+    items are counted per model in LLM.structured.parse_stats.
+
+    Every request runs under a timeout with bounded retries, and a circuit
+    breaker shared per model stops calling a failing provider. Words the
+    LLM could not cover get a fallback question made from their stored
+    example sentence, so starting a quiz never waits longer than
+    call_policy allows.
+
+    Hints are translated per chunk as soon as the chunk is generated,
+    overlapping with the chunks still waiting for the LLM. While streaming,
+    the questions of a chunk are translated in batches as they arrive
+    (see _HintBatcher).
+
+    LLM calls are recorded to the metrics store (LLM.instrumentation)
+    tagged with user_id and quiz "cloze", unless the caller already tagged them.
+
+    With stream=True the constructor returns immediately. Questions are
+    parsed line by line from the streamed responses and can be iterated
+    while later ones are still generating; get() waits for all of them.
+
+    Input:
+        db: word rows
+        APIKEY: api key for the LLM
+        use_cache: set False to always call the model instead of the question cache
+        chunk_token_budget: estimated tokens per request, prompt plus expected output
+        max_concurrency: number of requests in flight at once
+        requests_per_second: optional rate limit for starting requests
+        max_chunk_retries: retries for a failed chunk
+        stream: generate in the background and yield questions as they arrive
+        model: LLM model name, e.g. "local" to generate offline (see LLM.providers)
+        call_policy: timeout/retry/circuit breaker policy for LLM requests
+        translator: hint translator, defaults to the shared cached translator
+        cache: question cache, defaults to the on-disk LLM response cache
+        structured: request JSON output instead of "Q:...;A:..." lines
+        user_id: user the quiz is generated for, used to tag LLM call metrics
+    """
+    def __init__(self, db, APIKEY=None, use_cache: bool = True,
+                 chunk_token_budget: int = DEFAULT_CHUNK_TOKEN_BUDGET,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_second: Optional[float] = None,
+                 max_chunk_retries: int = DEFAULT_CHUNK_RETRIES,
+                 stream: bool = False, model: str = DEFAULT_MODEL,
+                 call_policy: Optional[CallPolicy] = None,
+                 translator: Optional[BatchTranslator] = None,
+                 cache: Optional[ResponseCache] = None, structured: bool = False,
+                 user_id: Optional[int] = None):
         super().__init__(db)
         self.pairs = []
-        self.current_index = 0
+        # Word row each pair of self.pairs was generated for, same order
+        self.pair_rows = []
         self.APIKEY = APIKEY
+        self.use_cache = use_cache
+        self.cache = (cache or get_default_cache()) if use_cache else None
+        self.chunk_token_budget = chunk_token_budget
+        self.structured = structured
+        self.planner = PromptPlanner(PROMPT_JSON_BASE if structured else PROMPT_BASE, chunk_token_budget,
+                                     output_tokens_per_item=OUTPUT_TOKENS_PER_WORD)
+        self.token_usage = []
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+        self.max_chunk_retries = max_chunk_retries
+        self.stream = stream
+        self.model = model
+        self.translator = translator
+        self.user_id = user_id
+        self.call_policy = call_policy or CallPolicy(timeout=DEFAULT_CALL_TIMEOUT,
+                                                     breaker=get_circuit_breaker(model))
+        self._ready = threading.Condition()
+        self._finished = False
         self.db = db
         self.words = []
         self.meanings = []
+        self.examples = {}
+        self._rows = {}
         self._parse_db(db)
     
     def _parse_db(self, db):
@@ -30,49 +235,291 @@ class ClozeQuizModel(BaseQuizModel):
             #word_id, english, meaning, pos, example = word
             self.words.append(word["english"])
             self.meanings.append(word["meaning"])
-        self._create_pairs()
+            self.examples[word["english"]] = word.get("example_sentence") or word.get("example")
+            self._rows.setdefault(word["english"], word)
+        with llm_context(quiz=current_quiz() or "cloze", user_id=self.user_id):
+            if self.stream:
+                threading.Thread(target=bind_context(self._stream_pairs), daemon=True).start()
+            else:
+                self._create_pairs()
+                self._finished = True
 
     def _create_pairs(self):
-        # Create the prompt using the current words
-        prompt = self.__create_prompt()
-        
-        # Get the response from the LLM
-        response = get_response(prompt, "gemini-2.0-flash", self.APIKEY)
-        
-        # Parse the response to get question-answer pairs
-        qa_pairs = self.__parse_llm_response(response)
-        translated_questions = self.__translate_examples([i[0] for i in qa_pairs])
+        cached = self._cached_pairs(self.words)
+        chunks = [planned.items for planned in self.planner.plan(self.words, cached.__contains__).prompts]
 
-        # Create quiz pairs
-        for (question, answer), translated_question in zip(qa_pairs, translated_questions):
+        # Generate (and translate) every chunk concurrently, cached words need translation only
+        jobs = [lambda: self._translate_pairs(cached)] if cached else []
+        jobs += [lambda chunk=chunk: self._translate_pairs(self._generate_chunk(chunk)) for chunk in chunks]
+        if len(jobs) <= 1:
+            results = [job() for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(jobs))) as pool:
+                results = list(pool.map(bind_context(lambda job: job()), jobs))
 
-            self.pairs.append((question, answer, translated_question))
+        # Create quiz pairs in word order
+        by_word = {word: pair for chunk_pairs in results for word, pair in chunk_pairs.items()}
+        for word in dict.fromkeys(self.words):
+            if word in by_word:
+                self.pairs.append(by_word[word])
+                self.pair_rows.append(self._rows[word])
+
+    def _cached_pairs(self, words: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Looks up the cached question of every word.
+
+        Returns:
+            Dict[str, Tuple[str, str]]: word -> (question, answer) for the cached words.
+        """
+        cached = {}
+        if self.cache is None:
+            return cached
+        for word in dict.fromkeys(words):
+            line = self.cache.get(self._cache_key(word))
+            for question, answer in self.__parse_llm_response(line or ""):
+                cached[word] = (question, answer)
+        return cached
+
+    def _cache_key(self, word: str) -> str:
+        return make_cache_key(word, self.model, {"task": "cloze_question"})
+
+    def _store(self, word: str, question: str, answer: str):
+        if self.cache is not None:
+            self.cache.put(self._cache_key(word), f"Q:{question};A:{answer}", self.model)
+
+    def _record_usage(self, words: List[str], prompt: str, response: str):
+        with self._ready:
+            self.token_usage.append({
+                "words": len(words),
+                "prompt_tokens": estimate_tokens(prompt),
+                "response_tokens": estimate_tokens(response),
+            })
+
+    def _translate_pairs(self, qa_pairs: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[str, str, str]]:
+        try:
+            translated_questions = self.__translate_examples([q for q, _ in qa_pairs.values()])
+        except Exception as e:
+            print(f"Translation failed: {e}")
+            translated_questions = [""] * len(qa_pairs)
+        return {word: (question, answer, translated_question)
+                for (word, (question, answer)), translated_question in zip(qa_pairs.items(), translated_questions)}
+
+    def _stream_pairs(self):
+        try:
+            cached = self._cached_pairs(self.words)
+            hints = _HintBatcher(self.__submit_examples, self._publish)
+            hints.add([(word, question, answer) for word, (question, answer) in cached.items()])
+            chunks = [planned.items for planned in self.planner.plan(self.words, cached.__contains__).prompts]
+            if chunks:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+                    list(pool.map(bind_context(self._stream_chunk), chunks))
+            hints.wait()
+        except Exception as e:
+            print(f"Cloze quiz streaming failed: {e}")
+        finally:
+            with self._ready:
+                self._finished = True
+                self._ready.notify_all()
+
+    def _stream_chunk(self, words: List[str]):
+        """
+        Streams one chunk and publishes every complete Q/A line as soon as
+        its hint is translated. Words missing when the stream ends are
+        generated again without streaming.
+
+        The whole stream runs under call_policy.timeout. A stream that takes
+        longer counts as a failure and its missing words get the fallback
+        question right away, so iteration never waits on a hanging provider.
+        """
+        missing = list(words)
+        if not missing:
+            return
+        hints = _HintBatcher(self.__submit_examples, self._publish)
+        breaker = self.call_policy.breaker
+        timed_out = False
+        if breaker is None or breaker.allow():
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            prompt, received = self.planner.build(missing), []
+            try:
+                # Questions are cached per word below, the whole response is not
+                pieces = iter_with_timeout(get_response_stream, self.call_policy.timeout,
+                                           prompt, self.model, self.APIKEY, use_cache=False,
+                                           response_schema=CLOZE_SCHEMA if self.structured else None)
+                for word, question, answer in self._parse_items(self._recording(pieces, received), missing):
+                    self._store(word, question, answer)
+                    hints.add([(word, question, answer)])
+                if breaker:
+                    breaker.record_success()
+            except Exception as e:
+                print(f"Cloze chunk streaming failed: {e}")
+                timed_out = isinstance(e, CallTimeout)
+                if breaker:
+                    breaker.record_failure()
+            self._record_usage(words, prompt, "".join(received))
+        if missing:
+            pairs = self._fallback_pairs(missing) if timed_out else self._generate_chunk(missing)
+            hints.add([(word, question, answer) for word, (question, answer) in pairs.items()])
+        hints.wait()
+
+    def _publish(self, word: str, question: str, answer: str, hint: str):
+        with self._ready:
+            self.pairs.append((question, answer, hint))
+            self.pair_rows.append(self._rows[word])
+            self._ready.notify_all()
 
     def get(self) -> List[Tuple[str, str, str]]:
+        with self._ready:
+            self._ready.wait_for(lambda: self._finished)
         return self.pairs
+
+    def get_with_rows(self) -> List[Tuple[Dict, Tuple[str, str, str]]]:
+        """
+        Every (word row, (Question, Answer, Hint)), the row being the one the
+        question was generated for
+
+        Returns:
+            List[Tuple[Dict, Tuple[str, str, str]]]: in the order of get()
+        """
+        pairs = self.get()
+        return list(zip(self.pair_rows, pairs))
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        return self._iter_pairs(self.db)
+
+    def _iter_pairs(self, rows: Iterable) -> Iterator[Tuple[str, str, str]]:
+        """
+        Yields the generated questions, each caller from its own position
+
+        rows are not read again, the questions come from the generation
+        started in the constructor. In stream mode this waits until the
+        next question arrives or generation ends.
+        """
+        index = 0
+        while True:
+            with self._ready:
+                self._ready.wait_for(lambda: index < len(self.pairs) or self._finished)
+                if index >= len(self.pairs):
+                    return
+                pair = self.pairs[index]
+            index += 1
+            yield pair
     
-    def __iter__(self):
-        self.current_index = 0
-        return self
-
-    def __next__(self):
-        if self.current_index >= len(self.pairs):
-            raise StopIteration
-        pair = self.pairs[self.current_index]
-        self.current_index += 1
-        return pair 
-    
-    def __create_prompt(self) -> str:
+    def _generate_chunk(self, words: List[str]) -> Dict[str, Tuple[str, str]]:
         """
-        Creates a complete prompt from the quiz pairs.
-        
+        Generates question-answer pairs for one chunk, retrying only the words
+        that are still missing after a truncated response. Words left over
+        after the retries, a request failure or with the circuit open get a
+        fallback question from their example sentence.
+
+        Args:
+            words (List[str]): Words of the chunk.
+
+        Returns:
+            Dict[str, Tuple[str, str]]: word -> (question, answer) in word order.
+        """
+        found = {}
+        missing = list(words)
+        for attempt in range(self.max_chunk_retries + 1):
+            if not missing:
+                break
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            prompt = self.planner.build(missing)
+            try:
+                # Questions are cached per word below, the whole response is not
+                response = self.call_policy.call(get_response, prompt, self.model, self.APIKEY, use_cache=False,
+                                                 response_schema=CLOZE_SCHEMA if self.structured else None)
+            except CircuitOpenError:
+                break
+            except Exception as e:
+                # call_policy already retried with backoff
+                print(f"Cloze chunk generation failed: {e}")
+                break
+            self._record_usage(missing, prompt, response or "")
+            # Invalid items leave their word in missing, so only those are asked again
+            for word, question, answer in self._parse_items([response or ""], missing):
+                found[word] = (question, answer)
+                self._store(word, question, answer)
+
+        found.update(self._fallback_pairs(missing))
+        return {w: found[w] for w in words if w in found}
+
+    def _fallback_pairs(self, words: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Questions made from the stored example sentences, without the LLM.
+        Words whose example does not contain them are left out.
+        """
+        found = {}
+        for word in words:
+            question = make_fallback_question(word, self.examples.get(word))
+            if question:
+                found[word] = (question, word)
+        return found
+
+    @staticmethod
+    def _recording(pieces: Iterable[str], received: List[str]) -> Iterator[str]:
+        for piece in pieces:
+            received.append(piece)
+            yield piece
+
+    def _parse_items(self, pieces: Iterable[str], missing: List[str]) -> Iterator[Tuple[str, str, str]]:
+        """
+        Parses and validates questions as the response arrives.
+
+        A question is accepted when it has a blank and its answer matches a
+        word still missing; that word is removed from missing. Exact answers
+        are matched as they arrive. Inflected answers (apples) wait for the
+        end of the response and only get the words no exact answer claimed,
+        the longest fitting word first, so with "go" and "good" the answer
+        "good" is never taken for "go". Rejected items are counted in
+        parse_stats.
+
+        Args:
+            pieces (Iterable[str]): Response text pieces.
+            missing (List[str]): Words without a question yet.
+
         Returns:
-            str: A formatted string containing all questions.
+            Iterator[Tuple[str, str, str]]: (word, question, answer) per accepted item.
         """
-        prompt = PROMPT_BASE
-        for word in self.words:
-            prompt += f"{word};\n"
-        return prompt.strip()
+        if self.structured:
+            candidates = ((item.get("word"), item.get("question"), item.get("answer")) if item else (None, None, None)
+                          for item, _ in iter_json_items(pieces))
+        else:
+            candidates = ((None, *self._parse_line(line)) for line in iter_lines(pieces) if line.strip())
+        ok = failed = 0
+        inflected = []
+        try:
+            for word, question, answer in candidates:
+                if not (isinstance(question, str) and isinstance(answer, str) and "__" in question):
+                    failed += 1
+                    continue
+                # Prefer the word the item names, but its answer has to be that word
+                target = next((w for w in missing if w == word and _is_exact_answer(w, answer)), None)
+                target = target or next((w for w in missing if _is_exact_answer(w, answer)), None)
+                if target is None:
+                    inflected.append((word, question, answer))
+                    continue
+                missing.remove(target)
+                ok += 1
+                yield target, question.strip(), answer.strip()
+
+            for word, question, answer in inflected:
+                fitting = [w for w in missing if _answer_matches(w, answer)]
+                target = word if word in fitting else max(fitting, key=len, default=None)
+                if target is None:
+                    failed += 1
+                    continue
+                missing.remove(target)
+                ok += 1
+                yield target, question.strip(), answer.strip()
+        finally:
+            parse_stats.record(self.model, ok, failed)
+
+    @staticmethod
+    def _parse_line(line: str) -> Tuple[Optional[str], Optional[str]]:
+        match = _QA_LINE.match(line)
+        return (match.group("q"), match.group("a")) if match else (None, None)
 
     def __parse_llm_response(self, response: str) -> List[Tuple[str, str]]:
         """
@@ -85,16 +532,16 @@ class ClozeQuizModel(BaseQuizModel):
             List[Tuple[str, str]]: A list of tuples containing (question, answer).
         """
         qa_pairs = []
-        lines = response.strip().split('\n')
-        for line in lines:
-            if line.startswith("Q:") and ";A:" in line:
-                q, a = line.split(';A:')
-                qa_pairs.append((q.replace('Q:', '').strip(), a.strip()))
+        for line in response.strip().split('\n'):
+            q, a = self._parse_line(line)
+            if q is not None:
+                qa_pairs.append((q, a))
         return qa_pairs
     
     def __translate_examples(self, examples: List[str]) -> List[str]:
-        translator = Translator()
-        result = translator.translate(examples, src="en", dest="ko")
+        translator = self.translator or get_default_translator()
+        return translator.translate(examples)
 
-        result = asyncio.get_event_loop().run_until_complete(result) 
-        return [i.text for i in result]
+    def __submit_examples(self, examples: List[str]) -> Future:
+        translator = self.translator or get_default_translator()
+        return translator.submit(examples)
@@ -0,0 +1,158 @@
+import random
+import threading
+from typing import Iterable, List, Optional, Sequence
+
+from database.word_db import add_word_listener
+
+
+class DistractorSampler:
+    """
+    Samples wrong choices for a four-choice question without scanning the pool
+
+    The words are kept in an array with a word -> index map. To draw k
+    distractors, k positions are sampled from the pool size minus the
+    excluded words and shifted past the excluded indices, so a draw costs
+    O(k) no matter how large the pool is. When the pool has too few other
+    words, the rest is drawn from the fallback sampler (usually the whole
+    Word table, see get_word_table_sampler).
+
+    Input:
+        words: candidate words, duplicates and empty words are ignored
+        fallback: sampler used to top up a small pool
+        rng: random source, e.g. random.Random(seed), the global random
+            module when None
+    """
+    def __init__(self, words: Iterable[str], fallback: Optional["DistractorSampler"] = None,
+                 rng: Optional[random.Random] = None):
+        self.words: List[str] = list(dict.fromkeys(w for w in words if w))
+        self._index = {word: i for i, word in enumerate(self.words)}
+        self.fallback = fallback
+        self.rng = rng or random
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._index
+
+    def sample(self, answer: str, k: int = 3, exclude: Sequence[str] = (),
+               rng: Optional[random.Random] = None) -> List[str]:
+        """
+        Draws up to k distinct words other than answer and exclude
+
+        Args:
+            rng: random source of this draw, also used by the fallback,
+                defaults to the sampler's rng
+
+        Returns:
+            fewer than k words only if the pool and the fallback together
+            do not have enough
+        """
+        rng = rng or self.rng
+        excluded = sorted({self._index[w] for w in (answer, *exclude) if w in self._index})
+        available = len(self.words) - len(excluded)
+        picks = []
+        for position in rng.sample(range(available), min(k, max(0, available))):
+            # Skip over excluded indices (ascending) to map into the full array
+            for index in excluded:
+                if position < index:
+                    break
+                position += 1
+            picks.append(self.words[position])
+        if len(picks) < k and self.fallback is not None:
+            # The shared fallback draws with this rng, so a seeded pool stays reproducible
+            picks += self.fallback.sample(answer, k - len(picks), exclude=(*exclude, *picks), rng=rng)
+        return picks
+
+    def options(self, answer: str, k: int = 3, shuffle: bool = False,
+                rng: Optional[random.Random] = None) -> List[str]:
+        """
+        answer followed by k distractors, or all of them shuffled
+        """
+        rng = rng or self.rng
+        choices = [answer] + self.sample(answer, k, rng=rng)
+        if shuffle:
+            rng.shuffle(choices)
+        return choices
+
+
+class HardDistractorSampler(DistractorSampler):
+    """
+    Draws the words spelled most like the answer first (see NeighbourIndex),
+    then random words of the pool
+
+    Input:
+        words: candidate words for the random part
+        index: NeighbourIndex with the confusable words
+        fallback: sampler used to top up a small pool
+        rng: random source
+    """
+    def __init__(self, words: Iterable[str], index, fallback: Optional[DistractorSampler] = None,
+                 rng: Optional[random.Random] = None):
+        super().__init__(words, fallback, rng)
+        self.index = index
+
+    def sample(self, answer: str, k: int = 3, exclude: Sequence[str] = (),
+               rng: Optional[random.Random] = None) -> List[str]:
+        picks = self.index.nearest(answer, k, exclude=exclude)
+        if len(picks) < k:
+            picks += super().sample(answer, k - len(picks), exclude=(*exclude, *picks), rng=rng)
+        return picks
+
+
+_word_table: Optional[DistractorSampler] = None
+_word_table_lock = threading.Lock()
+
+
+def _invalidate_word_table(event: str, word_id: int):
+    global _word_table
+    with _word_table_lock:
+        _word_table = None
+
+
+def get_word_table_sampler(db=None) -> DistractorSampler:
+    """
+    Shared sampler over every word of the Word table
+
+    Built on first use and rebuilt after a word is added, updated or
+    deleted through WordDB.
+
+    Args:
+        db: database with get_category_words(), defaults to quiz_db
+    """
+    global _word_table
+    with _word_table_lock:
+        if _word_table is None:
+            if db is None:
+                from database.quiz_db import quiz_db as db
+            try:
+                words = [row["english"] for row in db.get_category_words(None)]
+            except Exception as e:
+                print(f"Error loading distractor words: {e}")
+                return DistractorSampler([])
+            _word_table = DistractorSampler(words)
+            add_word_listener(_invalidate_word_table)
+        return _word_table
+
+
+def make_sampler(words: Sequence[str], choices: int = 4, db=None,
+                 rng: Optional[random.Random] = None, hard: bool = False) -> DistractorSampler:
+    """
+    Sampler over a quiz pool, backed by the Word table only when the pool
+    has fewer than `choices` distinct words
+
+    With hard=True the confusable words of the shared NeighbourIndex come
+    first. Until that index is built (in the background, see
+    get_neighbour_index) the plain sampler is used.
+    """
+    index = None
+    if hard:
+        from quiz_generation.neighbour_index import get_neighbour_index
+        index = get_neighbour_index()
+    if index is not None and index.ready.is_set():
+        sampler = HardDistractorSampler(words, index, rng=rng)
+    else:
+        sampler = DistractorSampler(words, rng=rng)
+    if len(sampler) < choices:
+        sampler.fallback = get_word_table_sampler(db)
+    return sampler
@@ -0,0 +1,235 @@
+import random
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from LLM.instrumentation import bind_context
+from quiz_generation.base_quiz_gen_class import BaseQuizModel
+from quiz_generation.cloze_quiz import ClozeQuizModel
+from quiz_generation.four_choice_quiz import FourChoiceQuizModel
+from quiz_generation.quiz_batch import QuizBatch
+from quiz_generation.rain_quiz import RainQuizModel
+from quiz_generation.short_answer_quiz import ShortAnswerEKQuizModel, ShortAnswerKEQuizModel
+
+
+class QuizSpec(NamedTuple):
+    """
+    model_class: quiz model made by create_quiz
+    io_bound: generation waits on the network (LLM), run on threads
+    seeded: the model takes an rng argument
+    """
+    model_class: Type[BaseQuizModel]
+    io_bound: bool = False
+    seeded: bool = False
+
+
+QUIZ_TYPES: Dict[str, QuizSpec] = {}
+
+
+def register_quiz(quiz_type: str, model_class: Type[BaseQuizModel], io_bound: bool = False, seeded: bool = False):
+    """
+    Makes a quiz model available to create_quiz and generate_many
+    """
+    QUIZ_TYPES[quiz_type] = QuizSpec(model_class, io_bound, seeded)
+
+
+register_quiz("cloze", ClozeQuizModel, io_bound=True)
+register_quiz("four_choice", FourChoiceQuizModel, seeded=True)
+register_quiz("short_answer_ek", ShortAnswerEKQuizModel)
+register_quiz("short_answer_ke", ShortAnswerKEQuizModel)
+register_quiz("rain", RainQuizModel)
+
+
+def get_spec(quiz_type: str) -> QuizSpec:
+    if quiz_type not in QUIZ_TYPES:
+        raise ValueError(f"Unknown quiz type: {quiz_type}")
+    return QUIZ_TYPES[quiz_type]
+
+
+def create_quiz(quiz_type: str, words: Iterable[Dict], seed: Optional[int] = None, **options) -> BaseQuizModel:
+    """
+    Builds the quiz model registered for quiz_type
+
+    Args:
+        quiz_type: one of QUIZ_TYPES
+        words: word rows (english, meaning, ...)
+        seed: seed of the random choices of seeded models
+        options: extra model arguments, e.g. model="local" for cloze
+
+    Returns:
+        BaseQuizModel
+    """
+    spec = get_spec(quiz_type)
+    if spec.seeded and seed is not None:
+        options.setdefault("rng", random.Random(seed))
+    return spec.model_class(words, **options)
+
+
+class QuizRecipe(NamedTuple):
+    """
+    Everything needed to make a quiz again: its type, its words in order and
+    the seed of its random choices. Storing a recipe instead of the pairs
+    keeps quiz history small.
+
+    A recipe rebuilds the same quiz as long as its words are unchanged.
+    Cloze questions come from the LLM and repeat only through the
+    response cache.
+    """
+    quiz_type: str
+    word_ids: Tuple[int, ...]
+    seed: int
+
+
+def new_seed() -> int:
+    # Fits the signed 64-bit INTEGER column of the quiz table
+    return random.SystemRandom().randrange(1 << 62)
+
+
+def make_recipe(quiz_type: str, words: Iterable[Dict], seed: Optional[int] = None) -> QuizRecipe:
+    """
+    Recipe of a quiz over word rows, with a new seed unless one is given
+    """
+    get_spec(quiz_type)
+    return QuizRecipe(quiz_type, tuple(word["word_id"] for word in words), new_seed() if seed is None else seed)
+
+
+def quiz_from_recipe(recipe: QuizRecipe, db=None, **options) -> BaseQuizModel:
+    """
+    Builds the quiz a recipe describes
+
+    Args:
+        recipe: see QuizRecipe
+        db: database with get_words_by_ids(), defaults to quiz_db
+        options: extra model arguments, see create_quiz
+
+    Raises:
+        ValueError: a word of the recipe no longer exists
+    """
+    if db is None:
+        from database.quiz_db import quiz_db as db
+    words = db.get_words_by_ids(list(recipe.word_ids))
+    if len(words) != len(recipe.word_ids):
+        found = {word["word_id"] for word in words}
+        missing = [word_id for word_id in recipe.word_ids if word_id not in found]
+        raise ValueError(f"Words of the quiz no longer exist: {missing}")
+    return create_quiz(recipe.quiz_type, words, recipe.seed, **options)
+
+
+def save_recipe(recipe: QuizRecipe, db=None, category_id: Optional[int] = None) -> Optional[int]:
+    """
+    Stores a recipe as a quiz row without questions
+
+    Returns:
+        quiz_id, None when it could not be stored
+    """
+    if db is None:
+        from database.quiz_db import quiz_db as db
+    return db.save_quiz_recipe(recipe.quiz_type, list(recipe.word_ids), recipe.seed, category_id)
+
+
+def load_recipe(quiz_id: int, db=None) -> Optional[QuizRecipe]:
+    """
+    Recipe stored by save_recipe, None for quizzes stored with their questions
+    """
+    if db is None:
+        from database.quiz_db import quiz_db as db
+    row = db.get_quiz_recipe(quiz_id)
+    if row is None:
+        return None
+    return QuizRecipe(row["quiz_type"], tuple(row["word_ids"]), row["seed"])
+
+
+# Word row columns sent to worker processes
+WORD_COLUMNS = ("word_id", "english", "meaning", "part_of_speech", "example_sentence", "choseong")
+
+WordPack = Tuple[Tuple[Any, ...], ...]
+
+
+def pack_words(rows: Iterable[Dict]) -> WordPack:
+    """
+    Word rows as plain tuples in WORD_COLUMNS order
+
+    Small to pickle and free of DB connections, so it can be sent to
+    another process. Missing columns are None.
+    """
+    return tuple(tuple(row.get(column) for column in WORD_COLUMNS) for row in rows)
+
+
+def unpack_words(pack: WordPack) -> List[Dict]:
+    return [dict(zip(WORD_COLUMNS, values)) for values in pack]
+
+
+class QuizJob(NamedTuple):
+    """
+    One quiz to generate with generate_many
+
+    key: name of the result, e.g. (quiz_type, category_id)
+    quiz_type: one of QUIZ_TYPES
+    words: pack_words() of the word rows
+    seed: see create_quiz
+    options: extra model arguments, must be picklable for CPU bound types
+    """
+    key: Hashable
+    quiz_type: str
+    words: WordPack
+    seed: Optional[int] = None
+    options: Tuple[Tuple[str, Any], ...] = ()
+
+
+def _run_job(job: QuizJob) -> bytes:
+    # Runs in a worker process: the batch goes back as its compact bytes
+    quiz = create_quiz(job.quiz_type, unpack_words(job.words), job.seed, **dict(job.options))
+    return quiz.get().to_bytes(compress=False)
+
+
+def generate_many(jobs: Iterable[QuizJob], processes: Optional[int] = None,
+                  threads: int = 4) -> Dict[Hashable, QuizBatch]:
+    """
+    Generates several quizzes at the same time
+
+    CPU bound quiz types run on a ProcessPoolExecutor, so they do not hold
+    each other up on the GIL. I/O bound types (LLM calls) run on threads
+    of this process, keeping the caller's llm_context and response cache.
+    A job that fails is reported and left out of the result.
+
+    Args:
+        jobs: quizzes to generate
+        processes: worker processes, None for one per CPU, 0 to run CPU
+            bound jobs on the threads as well
+        threads: worker threads for I/O bound jobs
+
+    Returns:
+        key -> QuizBatch of (Question, Answer, Hint)
+    """
+    jobs = list(jobs)
+    for job in jobs:
+        get_spec(job.quiz_type)
+    cpu_jobs = {id(job) for job in jobs if not QUIZ_TYPES[job.quiz_type].io_bound}
+    # A single CPU bound job is not worth starting processes for
+    if processes == 0 or len(cpu_jobs) < 2:
+        cpu_jobs = set()
+
+    futures: List[Tuple[QuizJob, Future]] = []
+    thread_pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="quiz-factory")
+    process_pool = ProcessPoolExecutor(max_workers=processes) if cpu_jobs else None
+    try:
+        run_here = bind_context(lambda job: create_quiz(
+            job.quiz_type, unpack_words(job.words), job.seed, **dict(job.options)).get())
+        for job in jobs:
+            if id(job) in cpu_jobs:
+                futures.append((job, process_pool.submit(_run_job, job)))
+            else:
+                futures.append((job, thread_pool.submit(run_here, job)))
+
+        results = {}
+        for job, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error generating {job.quiz_type} quiz {job.key}: {e}")
+                continue
+            results[job.key] = QuizBatch.from_bytes(result) if isinstance(result, bytes) else result
+        return results
+    finally:
+        thread_pool.shutdown(wait=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=True)
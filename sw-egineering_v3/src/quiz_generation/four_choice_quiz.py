@@ -1,47 +1,47 @@
-from quiz_generation.base_quiz_gen_class import BaseQuizModel
-from typing import Tuple, List
 import random
+from quiz_generation.base_quiz_gen_class import BaseQuizModel
+from quiz_generation.distractors import DistractorSampler, make_sampler
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Tuple, Optional
 
 
 class FourChoiceQuizModel(BaseQuizModel):
-    def __init__(self, db):
+    """
+    Four-choice quiz, the first choice is the correct answer
+
+    Distractors are drawn from the quiz words by a DistractorSampler, and
+    from the whole Word table when there are fewer than 4 words. A word
+    stream (not a list) has no pool to draw from, so its distractors come
+    from the Word table.
+
+    Input:
+        db: word rows
+        distractors: sampler to draw wrong choices from instead of the quiz words
+        hard: prefer words spelled like the answer (see neighbour_index)
+        rng: random source of the distractors, e.g. random.Random(seed)
+    """
+    def __init__(self, db, distractors: Optional[DistractorSampler] = None, hard: bool = False,
+                 rng: Optional[random.Random] = None):
         super().__init__(db)
-        self.pairs = []
-        self.current_index = 0
-        self.words = []
-        self.meanings = []
-        self._parse_db(db)
-    
-    def _parse_db(self, db):
-        for word in db:
-            #word_id, english, meaning, pos, example = word
-            self.words.append(word["english"])
-            self.meanings.append(word["meaning"])
-        self._create_pairs()
+        self.distractors = distractors
+        self.hard = hard
+        self.rng = rng
 
-    def _create_pairs(self):
+    def _sampler(self) -> DistractorSampler:
+        if self.distractors is None:
+            words = [word["english"] for word in self.db] if isinstance(self.db, Sequence) else []
+            self.distractors = make_sampler(words, rng=self.rng, hard=self.hard)
+        return self.distractors
+
+    def _iter_pairs(self, rows: Iterable) -> Iterator[Tuple[str, str, str]]:
+        sampler = self._sampler()
         # The first word in Question is the correct answer  
-        for word, meaning in zip(self.words, self.meanings):
-            # Get 3 random other words as distractors
-            other_words = random.sample([w for w in self.words if w != word], 3)
-            # Combine correct answer with distractors and shuffle
-            choices = [word] + other_words
+        for word in rows:
+            #word_id, english, meaning, pos, example = word
+            # Correct answer followed by 3 random other words as distractors
+            choices = sampler.options(word["english"], 3, rng=self.rng)
             # random.shuffle(choices)
             choices_str = ",".join(choices)
             
-            question = f"다음의 뜻을 가진 단어는? 뜻: {meaning}"
-            self.pairs.append((question, choices_str, "hint"))
-
-    def get(self) -> List[Tuple[str, str, str]]:
-        return self.pairs
-    
-    def __iter__(self):
-        self.current_index = 0
-        return self
-
-    def __next__(self):
-        if self.current_index >= len(self.pairs):
-            raise StopIteration
-        pair = self.pairs[self.current_index]
-        self.current_index += 1
-        return pair 
\ No newline at end of file
+            question = f"다음의 뜻을 가진 단어는? 뜻: {word['meaning']}"
+            yield (question, choices_str, "hint")
@@ -0,0 +1,155 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from database.hangul import decompose, is_hangul_syllable
+
+# Separators between the senses of one meaning, e.g. "사과, 사죄" or "run; manage"
+_SENSE_SPLIT = re.compile(r"[,;/|·\n]+")
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_SPACES = re.compile(r"\s+")
+
+
+class Grade(NamedTuple):
+    correct: bool
+    exact: bool
+    sense: Optional[str]
+    distance: int
+
+
+class AnswerKey(NamedTuple):
+    senses: Tuple[str, ...]
+    # Normalized senses -> display sense, for the exact match fast path
+    exact: dict
+    # (jamo string, display sense) of every Hangul sense, for typo matching
+    units: Tuple[Tuple[str, str], ...]
+
+
+def normalize(text: str) -> str:
+    """
+    NFC, case folded, with runs of whitespace collapsed
+    """
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text or "")).strip().casefold()
+
+
+def split_senses(meaning: str) -> Tuple[str, ...]:
+    """
+    Senses of a meaning, e.g. "사과, (과일) 능금" -> ("사과", "능금", "(과일) 능금")
+
+    A sense with a parenthesized note is also accepted without it.
+    """
+    senses = []
+    for part in _SENSE_SPLIT.split(meaning or ""):
+        part = part.strip()
+        if not part:
+            continue
+        bare = _SPACES.sub(" ", _PARENTHESES.sub(" ", part)).strip()
+        if bare:
+            senses.append(bare)
+        senses.append(part)
+    return tuple(dict.fromkeys(senses))
+
+
+@lru_cache(maxsize=4096)
+def answer_key(correct: str) -> AnswerKey:
+    """
+    Normalized senses of a correct answer, cached per answer string
+    """
+    senses = split_senses(correct) or (correct or "",)
+    exact, units = {}, []
+    for sense in senses:
+        normalized = normalize(sense)
+        if normalized not in exact:
+            exact[normalized] = sense
+            # English answers stay exact: adopt/adapt or affect/effect are different words
+            if any(is_hangul_syllable(ch) for ch in normalized):
+                units.append((decompose(normalized), sense))
+    return AnswerKey(senses, exact, tuple(units))
+
+
+def max_typos(length: int) -> int:
+    """
+    Edits accepted for an answer of `length` letters or jamo
+    """
+    if length < 5:
+        return 0
+    return 1 if length < 10 else 2
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance of a and b, or limit + 1 as soon as it must exceed limit
+
+    Only the diagonal band of width 2 * limit + 1 is computed, so the cost
+    is O(limit * len) instead of O(len(a) * len(b)).
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    too_far = limit + 1
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= limit else too_far
+        best = current[0]
+        ca = a[i - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost <= limit else too_far
+            if cost < best:
+                best = cost
+        if best > limit:
+            return too_far
+        previous = current
+    return previous[len(b)]
+
+
+def grade(answer: str, correct: str, typos: bool = True) -> Grade:
+    """
+    Grades a typed answer against a correct answer (word or meaning)
+
+    The answer is correct if it matches one sense of `correct` after
+    normalization (case and spacing), or, with typos=True, is within
+    max_typos() jamo edits of a Hangul sense. English senses are never
+    matched with typos, confusable words like adopt/adapt differ by one
+    letter.
+
+    Args:
+        answer: what the user typed
+        correct: the stored answer, may list several senses
+        typos: accept near misses
+
+    Returns:
+        Grade(correct, exact, matched sense, edit distance)
+    """
+    key = answer_key(correct)
+    typed = normalize(answer)
+    if typed in key.exact:
+        return Grade(True, True, key.exact[typed], 0)
+    if not typos or not typed:
+        return Grade(False, False, None, -1)
+    typed_units = decompose(typed)
+    best = None
+    for units, sense in key.units:
+        limit = max_typos(len(units))
+        if limit == 0:
+            continue
+        distance = bounded_distance(typed_units, units, limit)
+        if distance <= limit and (best is None or distance < best[1]):
+            best = (sense, distance)
+    if best is None:
+        return Grade(False, False, None, -1)
+    return Grade(True, False, best[0], best[1])
+
+
+def is_correct(answer: str, correct: str, typos: bool = True) -> bool:
+    return grade(answer, correct, typos).correct
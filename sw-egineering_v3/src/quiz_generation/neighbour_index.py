@@ -0,0 +1,526 @@
+import argparse
+import heapq
+import json
+import math
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from database.word_db import add_word_listener, remove_word_listener
+
+
+DEFAULT_NEIGHBOUR_INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'neighbour_index.db')
+
+
+def distance_from(word: str) -> Callable[[str], int]:
+    """
+    edit_distance(word, other) as a function of other
+
+    Bit-parallel Levenshtein (Myers/Hyyrö): one column of the distance
+    table is a pair of bit masks over the letters of word, so comparing
+    with other costs a few integer operations per letter of other instead
+    of len(word) * len(other) steps. The masks of word are built once, for
+    the many comparisons of one tree search.
+    """
+    m = len(word)
+    if not m:
+        return len
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(word):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    def distance(other: str) -> int:
+        # pv / mv: vertical +1 / -1 differences of the current column
+        pv, mv, score = mask, 0, m
+        for c in other:
+            eq = peq.get(c, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = (ph << 1) | 1
+            pv = ((mh << 1) | ~(xv | ph)) & mask
+            mv = ph & xv
+        return score
+    return distance
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance of two words
+    """
+    return distance_from(a)(b)
+
+
+def ngrams(word: str, n: int = 3) -> Set[str]:
+    """
+    Character n-gram signature, padded so prefixes and suffixes count
+    """
+    padded = f"^{word}$"
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _normalize_pos(part_of_speech: Optional[str]) -> str:
+    return (part_of_speech or "").strip().lower()
+
+
+class NeighbourIndex:
+    """
+    Confusable words for hard four-choice distractors
+
+    Words are kept in one BK-tree per part_of_speech, keyed by edit
+    distance. Every word also keeps its `stored` nearest words of the same
+    part_of_speech (ties broken by character trigram overlap), so nearest()
+    is a dict lookup. Each list comes from a best-first search of the tree
+    that stops at the list's own k-th distance.
+
+    Every tree node also knows its reach: the largest distance at which a
+    new word can still enter a neighbour list in its subtree. Adding a word
+    only visits subtrees within reach, and deleting one searches again only
+    the lists that held it, so a change costs a few bounded searches
+    instead of a pass over the bucket.
+
+    Tree nodes and neighbour lists are stored in SQLite and loaded as they
+    are, so the index is built once (build(), build_in_background() or
+    `python -m quiz_generation.neighbour_index`) and afterwards only changed
+    words are inserted. `ready` is set once the index holds a build.
+    attach() keeps it up to date with WordDB add/update/delete. BK-trees
+    cannot remove a node, so deleted or renamed words are kept as
+    tombstones that searches skip.
+
+    Input:
+        path: SQLite file of the index (":memory:" for a process-local index)
+        db: database the Word rows are read from, defaults to quiz_db
+        stored: neighbours kept per word
+    """
+    def __init__(self, path: str = DEFAULT_NEIGHBOUR_INDEX_PATH, db=None, stored: int = 8):
+        self.path = path
+        self.db = db
+        self.stored = stored
+        self._lock = threading.RLock()
+        self.ready = threading.Event()
+        self._build_thread: Optional[threading.Thread] = None
+        # Word changes made while build() runs, applied after it
+        self._building = False
+        self._pending: List[Tuple[str, int]] = []
+        self._pending_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS bk_node (
+                node_id INTEGER PRIMARY KEY,
+                pos TEXT NOT NULL,
+                word_id INTEGER NOT NULL,
+                english TEXT NOT NULL,
+                parent INTEGER,
+                distance INTEGER,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                neighbours TEXT NOT NULL DEFAULT '[]'
+            )
+        """)
+        self._conn.commit()
+        self._load()
+        if self._english:
+            self.ready.set()
+
+    def _load(self):
+        self._english: Dict[int, str] = {}
+        self._deleted: Set[int] = set()
+        self._children: Dict[int, Dict[int, int]] = {}
+        self._parent: Dict[int, Optional[int]] = {}
+        # node -> largest distance at which a new word enters a neighbour list in its subtree
+        self._reach: Dict[int, float] = {}
+        self._roots: Dict[str, int] = {}
+        self._node_pos: Dict[int, str] = {}
+        self._by_word_id: Dict[int, int] = {}
+        self._by_english: Dict[str, int] = {}
+        self._signatures: Dict[int, Set[str]] = {}
+        # node -> [(distance, -similarity, neighbour node)], nearest first
+        self._neighbours: Dict[int, List[Tuple[int, float, int]]] = {}
+        # node -> nodes that list it as a neighbour
+        self._listed_by: Dict[int, Set[int]] = {}
+        rows = self._conn.execute(
+            "SELECT node_id, pos, word_id, english, parent, distance, deleted, neighbours FROM bk_node ORDER BY node_id"
+        ).fetchall()
+        for node_id, pos, word_id, english, parent, distance, deleted, neighbours in rows:
+            self._add_node(node_id, pos, word_id, english, parent, distance, bool(deleted))
+            if not deleted:
+                self._set_neighbours(node_id, [tuple(entry) for entry in json.loads(neighbours)],
+                                     save=False, refresh=False)
+        self._compute_reach()
+
+    def _add_node(self, node_id, pos, word_id, english, parent, distance, deleted=False):
+        self._english[node_id] = english
+        self._children[node_id] = {}
+        self._parent[node_id] = parent
+        # Counted once the node has its neighbour list
+        self._reach[node_id] = -1
+        self._node_pos[node_id] = pos
+        if parent is None:
+            self._roots[pos] = node_id
+        else:
+            self._children[parent][distance] = node_id
+        if deleted:
+            self._deleted.add(node_id)
+        else:
+            self._by_word_id[word_id] = node_id
+            self._by_english[english] = node_id
+            self._signatures[node_id] = ngrams(english)
+
+    def __len__(self) -> int:
+        return len(self._by_word_id)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._by_english
+
+    def _database(self):
+        if self.db is None:
+            from database.quiz_db import quiz_db
+            self.db = quiz_db
+        return self.db
+
+    def build(self) -> int:
+        """
+        Rebuilds the index from the whole Word table
+
+        Word changes reported by WordDB meanwhile do not wait for the build,
+        they are applied once it is done.
+
+        Returns:
+            number of indexed words
+        """
+        with self._pending_lock:
+            self._building = True
+        try:
+            self._build()
+        finally:
+            with self._pending_lock:
+                self._building = False
+                pending, self._pending = self._pending, []
+        for event, word_id in pending:
+            self._on_word_change(event, word_id)
+        self.ready.set()
+        return len(self)
+
+    def _build(self):
+        rows = self._database().fetch_all("SELECT word_id, english, part_of_speech FROM Word ORDER BY word_id")
+        with self._lock:
+            self._conn.execute("DELETE FROM bk_node")
+            self._load()
+            for row in rows:
+                english = (row["english"] or "").strip()
+                if english:
+                    self._place(row["word_id"], english, _normalize_pos(row["part_of_speech"]))
+            # Lists are searched once every word is in the tree, each bounded by its own k-th distance
+            live = [node for node in self._english if node not in self._deleted]
+            for node in live:
+                self._set_neighbours(node, self._search(self._node_pos[node], self._english[node], self.stored, {node}),
+                                     save=False, refresh=False)
+            self._conn.executemany("UPDATE bk_node SET neighbours = ? WHERE node_id = ?",
+                                   [(json.dumps([list(entry) for entry in self._neighbours[node]]), node)
+                                    for node in live])
+            self._compute_reach()
+            self._conn.commit()
+
+    def build_in_background(self) -> threading.Thread:
+        """
+        Builds the index in a daemon thread, once; check `ready` before relying on it
+        """
+        with self._lock:
+            if self._build_thread is None:
+                def run():
+                    try:
+                        self.build()
+                    except Exception as e:
+                        print(f"Error building neighbour index: {e}")
+                self._build_thread = threading.Thread(target=run, name="neighbour-index-build", daemon=True)
+                self._build_thread.start()
+            return self._build_thread
+
+    def add(self, word_id: int, english: str, part_of_speech: Optional[str] = None):
+        """
+        Inserts (or moves) one word
+        """
+        with self._lock:
+            self._insert(word_id, english, part_of_speech)
+            self._conn.commit()
+
+    def remove(self, word_id: int):
+        with self._lock:
+            self._remove(word_id)
+            self._conn.commit()
+
+    def _insert(self, word_id: int, english: str, part_of_speech: Optional[str]):
+        english = english.strip()
+        if not english:
+            return
+        pos = _normalize_pos(part_of_speech)
+        old = self._by_word_id.get(word_id)
+        if old is not None:
+            if self._english[old] == english and self._node_pos[old] == pos:
+                return
+            self._remove(word_id)
+
+        node = self._place(word_id, english, pos)
+        self._set_neighbours(node, self._search(pos, english, self.stored, {node}))
+        for d, similarity, other in self._accepting(pos, english, node):
+            entries = self._neighbours[other]
+            entry = (d, similarity, node)
+            if len(entries) < self.stored or entry < entries[-1]:
+                self._set_neighbours(other, sorted(entries + [entry])[:self.stored])
+
+    def _place(self, word_id: int, english: str, pos: str) -> int:
+        # Puts the word in the tree of its bucket, without neighbour lists
+        parent, distance = None, None
+        node = self._roots.get(pos)
+        distance_to = distance_from(english)
+        while node is not None:
+            d = distance_to(self._english[node])
+            if d == 0:
+                break
+            parent, distance = node, d
+            node = self._children[node].get(d)
+
+        if node is not None:
+            # The same spelling was indexed before, revive that node
+            self._deleted.discard(node)
+            self._by_word_id[word_id] = node
+            self._by_english[english] = node
+            self._signatures[node] = ngrams(english)
+            self._conn.execute("UPDATE bk_node SET word_id = ?, deleted = 0 WHERE node_id = ?", (word_id, node))
+        else:
+            cursor = self._conn.execute(
+                "INSERT INTO bk_node (pos, word_id, english, parent, distance) VALUES (?, ?, ?, ?, ?)",
+                (pos, word_id, english, parent, distance)
+            )
+            node = cursor.lastrowid
+            self._add_node(node, pos, word_id, english, parent, distance)
+        return node
+
+    def _accepting(self, pos: str, word: str, new: int) -> List[Tuple[int, float, int]]:
+        """
+        Live nodes whose neighbour list the word of node `new` may enter
+        """
+        root = self._roots.get(pos)
+        if root is None:
+            return []
+        signature = ngrams(word)
+        distance_to = distance_from(word)
+        found = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            d = distance_to(self._english[node])
+            if node != new and d <= self._own_reach(node):
+                found.append((d, -_similarity(signature, self._signatures[node]), node))
+            # Every word below a child is `distance` from node, so at least |distance - d| from word
+            for distance, child in self._children[node].items():
+                if abs(distance - d) <= self._reach[child]:
+                    stack.append(child)
+        return found
+
+    def _remove(self, word_id: int):
+        node = self._by_word_id.pop(word_id, None)
+        if node is None:
+            return
+        if self._by_english.get(self._english[node]) == node:
+            del self._by_english[self._english[node]]
+        self._deleted.add(node)
+        self._set_neighbours(node, [])
+        self._conn.execute("UPDATE bk_node SET deleted = 1 WHERE node_id = ?", (node,))
+        # Lists that held the word are searched again to stay full
+        for other in list(self._listed_by.pop(node, ())):
+            english = self._english[other]
+            self._set_neighbours(other, self._search(self._node_pos[other], english, self.stored, {other}))
+
+    def _set_neighbours(self, node: int, entries: List[Tuple[int, float, int]], save: bool = True,
+                        refresh: bool = True):
+        for _, _, old in self._neighbours.get(node, ()):
+            self._listed_by.get(old, set()).discard(node)
+        self._neighbours[node] = entries
+        for _, _, neighbour in entries:
+            self._listed_by.setdefault(neighbour, set()).add(node)
+        if save:
+            self._conn.execute("UPDATE bk_node SET neighbours = ? WHERE node_id = ?",
+                               (json.dumps([list(entry) for entry in entries]), node))
+        if refresh:
+            self._refresh_reach(node)
+
+    def _own_reach(self, node: int) -> float:
+        # Largest distance at which a new word enters this node's list, -1 for never
+        if node in self._deleted:
+            return -1
+        entries = self._neighbours.get(node, ())
+        if len(entries) < self.stored:
+            return math.inf
+        return entries[-1][0] if entries else -1
+
+    def _refresh_reach(self, node: Optional[int]):
+        # Recomputes the reach of node and its ancestors, up to the first one that is unchanged
+        while node is not None:
+            reach = max([self._own_reach(node)] + [self._reach[child] for child in self._children[node].values()])
+            if self._reach.get(node) == reach:
+                return
+            self._reach[node] = reach
+            node = self._parent[node]
+
+    def _compute_reach(self):
+        # Children are inserted after their parent, so they have larger node ids
+        for node in sorted(self._english, reverse=True):
+            self._reach[node] = max([self._own_reach(node)] +
+                                    [self._reach[child] for child in self._children[node].values()])
+
+    def nearest(self, word: str, k: int = 3, part_of_speech: Optional[str] = None,
+                exclude: Sequence[str] = ()) -> List[str]:
+        """
+        k indexed words spelled most like word
+
+        Args:
+            word: the answer to find confusable words for
+            k: number of words
+            part_of_speech: bucket to search, defaults to the indexed part_of_speech of word
+            exclude: words that must not be returned (word itself never is)
+
+        Returns:
+            up to k words, nearest first; other parts of speech are used
+            only when the bucket has too few words
+        """
+        with self._lock:
+            node = self._by_english.get(word)
+            if part_of_speech is None and node is not None:
+                pos = self._node_pos[node]
+            else:
+                pos = _normalize_pos(part_of_speech)
+            skip = {self._by_english[w] for w in (word, *exclude) if w in self._by_english}
+
+            entries = self._neighbours.get(node, []) if node is not None and self._node_pos[node] == pos else None
+            found = [entry for entry in entries or () if entry[2] not in skip][:k]
+            if entries is None or (len(found) < k and len(entries) >= self.stored):
+                # Not indexed, or the stored list ran out after exclusions
+                found = self._search(pos, word, k, skip)
+            if len(found) < k:
+                others = []
+                for other in self._roots:
+                    if other != pos:
+                        others += self._search(other, word, k - len(found), skip)
+                found += sorted(others)[:k - len(found)]
+            return [self._english[n] for _, _, n in found]
+
+    def _search(self, pos: str, word: str, k: Optional[int], skip: Set[int],
+                radius: Optional[int] = None) -> List[Tuple[int, float, int]]:
+        """
+        k nearest live nodes of one bucket, or every node within radius when k is None
+        """
+        root = self._roots.get(pos)
+        if root is None or k == 0:
+            return []
+        signature = ngrams(word)
+        distance_to = distance_from(word)
+        # Min-heap of (-distance, similarity, node), so the root is the worst kept entry
+        best: List[Tuple[int, float, int]] = []
+        # Min-heap of (lower bound of the distance to word, node): closest subtrees first
+        pending = [(0, root)]
+        while pending:
+            bound, node = heapq.heappop(pending)
+            limit = -best[0][0] if k is not None and len(best) >= k else radius
+            if limit is not None and bound > limit:
+                # Every pending subtree is at least this far away
+                break
+            d = distance_to(self._english[node])
+            keep = node not in self._deleted and node not in skip
+            if keep and (radius is None or d <= radius):
+                entry = (-d, _similarity(signature, self._signatures[node]), node)
+                if k is None or len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            # Triangle inequality: only children within the limit can hold closer words
+            limit = -best[0][0] if k is not None and len(best) >= k else radius
+            for distance, child in self._children[node].items():
+                lower = max(bound, abs(distance - d))
+                if limit is None or lower <= limit:
+                    heapq.heappush(pending, (lower, child))
+        return sorted((-d, -similarity, node) for d, similarity, node in best)
+
+    def _on_word_change(self, event: str, word_id: int):
+        if event == "category":
+            # Spelling and part of speech are unchanged
+            return
+        with self._pending_lock:
+            if self._building:
+                self._pending.append((event, word_id))
+                return
+        if event == "delete":
+            self.remove(word_id)
+            return
+        row = self._database().fetch_one(
+            "SELECT english, part_of_speech FROM Word WHERE word_id = ?", (word_id,)
+        )
+        if row is None:
+            self.remove(word_id)
+        else:
+            self.add(word_id, row["english"], row["part_of_speech"])
+
+    def attach(self):
+        """
+        Keeps the index up to date with WordDB add/update/delete
+        """
+        add_word_listener(self._on_word_change)
+
+    def detach(self):
+        remove_word_listener(self._on_word_change)
+
+    def close(self):
+        self.detach()
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[NeighbourIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_neighbour_index() -> NeighbourIndex:
+    """
+    Shared on-disk index, kept up to date with WordDB changes
+
+    Never builds in the caller: an index that was not built yet (see
+    main()) is built in a background thread, check `ready` before using it.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NeighbourIndex()
+            _index.attach()
+        if not _index.ready.is_set():
+            _index.build_in_background()
+        return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the confusable word index for four-choice quizzes")
+    parser.add_argument("--index", default=DEFAULT_NEIGHBOUR_INDEX_PATH, help="index database path")
+    parser.add_argument("--word", help="print the neighbours of a word instead of rebuilding")
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    index = NeighbourIndex(args.index)
+    if args.word:
+        print(", ".join(index.nearest(args.word, args.k)))
+    else:
+        print(f"Indexed {index.build()} words")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from database.quiz_db import QuizDB
+from database.word_db import add_word_listener, remove_word_listener
+from LLM.instrumentation import bind_context, llm_context
+from LLM.response_cache import ResponseCache
+from quiz_generation.cloze_quiz import DEFAULT_MODEL
+from quiz_generation.factory import WordPack, create_quiz, get_spec, pack_words, unpack_words
+from quiz_generation.quiz_batch import QuizBatch
+
+# quiz_question row without quiz_id: (question, correct_answer, options, hint, word_id)
+Row = Tuple[str, str, Optional[str], str, int]
+
+
+def _build_cloze(words: List[Dict], pool: List[Dict], APIKEY, model, cache=None) -> List[Row]:
+    quiz = create_quiz("cloze", words, APIKEY=APIKEY, model=model, cache=cache)
+    return [(question, answer, None, hint, word["word_id"])
+            for word, (question, answer, hint) in quiz.get_with_rows()]
+
+
+def _build_four_choice(words: List[Dict], pool: List[Dict], APIKEY, model, cache=None) -> List[Row]:
+    # Distractors come from the whole category, so questions are made over the pool
+    if len(pool) < 4:
+        return []
+    needed = {w["word_id"] for w in words}
+    quiz = create_quiz("four_choice", pool)
+    rows = []
+    for word, (question, choices, hint) in zip(pool, quiz.get()):
+        if word["word_id"] in needed:
+            rows.append((question, choices.split(",")[0], choices, hint, word["word_id"]))
+    return rows
+
+
+def _build_short_answer(quiz_type: str) -> Callable:
+    def build(words: List[Dict], pool: List[Dict], APIKEY, model, cache=None) -> List[Row]:
+        quiz = create_quiz(quiz_type, words)
+        return [(question, answer, None, hint, word["word_id"])
+                for word, (question, answer, hint) in zip(words, quiz.get())]
+    return build
+
+
+QUIZ_BUILDERS: Dict[str, Callable] = {
+    "cloze": _build_cloze,
+    "four_choice": _build_four_choice,
+    "short_answer_ek": _build_short_answer("short_answer_ek"),
+    "short_answer_ke": _build_short_answer("short_answer_ke"),
+}
+
+
+def _build_packed(quiz_type: str, words: WordPack, pool: WordPack, APIKEY, model) -> List[Row]:
+    # Runs in a worker process, words come as pack_words() tuples
+    return QUIZ_BUILDERS[quiz_type](unpack_words(words), unpack_words(pool), APIKEY, model)
+
+
+class QuestionBank:
+    """
+    Pre-generated questions stored in quiz / quiz_question
+
+    refresh() generates questions only for words that have none yet or
+    whose questions went stale through WordDB.update_word, and stores them
+    with one executemany. Starting a quiz then only needs get_pairs(),
+    a single indexed read. The pairs of a bank are kept as a serialized
+    QuizBatch after the first read, until the bank is refreshed or a word
+    changes.
+
+    Input:
+        db: QuizDB to store the questions in
+        APIKEY: api key for the LLM (cloze)
+        model: LLM model name for cloze questions
+        cache: question cache of cloze questions, defaults to the on-disk LLM response cache
+        max_workers: banks generated at the same time in the background
+        processes: worker processes refresh_all builds CPU bound banks in,
+            0 to build everything in this process
+    """
+    def __init__(self, db: QuizDB, APIKEY=None, model: str = DEFAULT_MODEL, max_workers: int = 2,
+                 processes: int = 0, cache: Optional[ResponseCache] = None):
+        self.db = db
+        self.APIKEY = APIKEY
+        self.model = model
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.processes = max(0, processes)
+        self._executor = None
+        self._locks: Dict[Tuple[str, Optional[int]], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._snapshots: Dict[Tuple[str, Optional[int]], bytes] = {}
+        self._snapshots_lock = threading.Lock()
+        self._generation = 0
+        add_word_listener(self._invalidate)
+
+    def _lock(self, quiz_type: str, category_id: Optional[int]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((quiz_type, category_id), threading.Lock())
+
+    def refresh(self, quiz_type: str, category_id: Optional[int] = None,
+                processes: Optional[Executor] = None) -> int:
+        """
+        Generates the missing questions of one bank
+
+        Args:
+            quiz_type: one of QUIZ_BUILDERS
+            category_id: category of the bank, None for all words
+            processes: process pool to build CPU bound questions in, the
+                database is still read and written in this process
+
+        Returns:
+            number of questions stored
+        """
+        if quiz_type not in QUIZ_BUILDERS:
+            raise ValueError(f"Unknown quiz type: {quiz_type}")
+        # Two refreshes of the same bank would generate the same words twice
+        with self._lock(quiz_type, category_id), llm_context(quiz=f"bank:{quiz_type}"):
+            words = self.db.get_words_without_questions(quiz_type, category_id)
+            if not words:
+                return 0
+            pool = self.db.get_category_words(category_id) if quiz_type == "four_choice" else words
+            if processes is not None and not get_spec(quiz_type).io_bound:
+                rows = processes.submit(_build_packed, quiz_type, pack_words(words), pack_words(pool),
+                                        self.APIKEY, self.model).result()
+            else:
+                rows = QUIZ_BUILDERS[quiz_type](words, pool, self.APIKEY, self.model, self.cache)
+            if not rows or self.db.save_question_bank(quiz_type, category_id, rows) is None:
+                return 0
+            self._invalidate_bank(quiz_type, category_id)
+            return len(rows)
+
+    def refresh_all(self, quiz_types: Iterable[str] = tuple(QUIZ_BUILDERS),
+                    category_ids: Iterable[Optional[int]] = (None,)) -> Dict[Tuple[str, Optional[int]], int]:
+        """
+        Refreshes every (quiz type, category) bank, several at a time
+
+        Returns:
+            number of stored questions per (quiz_type, category_id)
+        """
+        jobs = [(t, c) for c in category_ids for t in quiz_types]
+        processes = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                counts = pool.map(bind_context(lambda job: self.refresh(*job, processes=processes)), jobs)
+                return dict(zip(jobs, counts))
+        finally:
+            if processes is not None:
+                processes.shutdown(wait=True)
+
+    def start_background(self, quiz_types: Iterable[str] = tuple(QUIZ_BUILDERS),
+                         category_ids: Iterable[Optional[int]] = (None,)) -> Future:
+        """
+        Runs refresh_all in a background thread and returns its future
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-bank")
+        return self._executor.submit(self.refresh_all, tuple(quiz_types), tuple(category_ids))
+
+    def shutdown(self, wait: bool = True):
+        remove_word_listener(self._invalidate)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _invalidate(self, event: str, word_id: int):
+        # An edited or deleted word makes its stored questions stale in every bank
+        with self._snapshots_lock:
+            self._snapshots.clear()
+            self._generation += 1
+
+    def _invalidate_bank(self, quiz_type: str, category_id: Optional[int]):
+        with self._snapshots_lock:
+            self._snapshots.pop((quiz_type, category_id), None)
+            self._generation += 1
+
+    def snapshot(self, quiz_type: str, category_id: Optional[int] = None) -> bytes:
+        """
+        Every ready pair of a bank as QuizBatch bytes (see QuizBatch.to_bytes)
+        """
+        key = (quiz_type, category_id)
+        with self._snapshots_lock:
+            data = self._snapshots.get(key)
+            generation = self._generation
+        if data is None:
+            batch = QuizBatch.from_pairs(
+                (row["question"], row["options"] if quiz_type == "four_choice" else row["correct_answer"], row["hint"])
+                for row in self.db.get_ready_questions(quiz_type, category_id)
+            )
+            data = batch.to_bytes()
+            with self._snapshots_lock:
+                # Not kept if the bank changed while it was read
+                if generation == self._generation:
+                    self._snapshots[key] = data
+        return data
+
+    def get_pairs(self, quiz_type: str, category_id: Optional[int] = None,
+                  limit: int = -1) -> QuizBatch:
+        """
+        Ready-made (Question, Answer, Hint) pairs in the format of the quiz models
+
+        Four choice pairs carry the comma separated choices as the answer,
+        the correct one first, like FourChoiceQuizModel.
+        """
+        batch = QuizBatch.from_bytes(self.snapshot(quiz_type, category_id))
+        return batch[:limit] if limit >= 0 else batch
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    """
+    Shared bank over quiz_db
+    """
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            from database.quiz_db import quiz_db
+            _bank = QuestionBank(quiz_db)
+        return _bank
+
+
+def warm_up(category_ids: Iterable[Optional[int]] = (None,)) -> Future:
+    """
+    Fills the banks that need no LLM call in the background, e.g. at login
+    """
+    quiz_types = [quiz_type for quiz_type in QUIZ_BUILDERS if not get_spec(quiz_type).io_bound]
+    return get_question_bank().start_background(quiz_types, category_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate quiz question banks")
+    parser.add_argument("--db", default="toeic_vocabulary.db", help="database path")
+    parser.add_argument("--types", nargs="+", default=list(QUIZ_BUILDERS), choices=list(QUIZ_BUILDERS))
+    parser.add_argument("--categories", nargs="+", type=int, default=None,
+                        help="category ids (default: one bank over all words)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help='LLM model for cloze questions, e.g. "local"')
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="worker processes for the quiz types that do not call the LLM")
+    args = parser.parse_args(argv)
+
+    db = QuizDB(args.db)
+    bank = QuestionBank(db, args.api_key, args.model, args.workers, args.processes)
+    counts = bank.refresh_all(args.types, args.categories or [None])
+    for (quiz_type, category_id), count in counts.items():
+        print(f"{quiz_type} (category {category_id if category_id is not None else 'all'}): {count} new questions")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
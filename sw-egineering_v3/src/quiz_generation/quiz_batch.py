@@ -0,0 +1,166 @@
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Optional, Tuple
+
+# 4-byte unsigned index type, the serialized form always uses 4 bytes
+_INDEX = "I" if array("I").itemsize == 4 else "L"
+# String id of a None field
+_NONE = 0xFFFFFFFF
+
+MAGIC = b"QZB1"
+_HEADER = struct.Struct("<4sBII")  # magic, flags, number of strings, number of pairs
+_FLAG_ZLIB = 1
+
+Pair = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def _to_le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(_INDEX, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(data: bytes) -> array:
+    values = array(_INDEX)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class QuizBatch(Sequence):
+    """
+    Read-only sequence of (Question, Answer, Hint) pairs in a compact form
+
+    Every distinct string is stored once in one text buffer and addressed
+    by its offset, and a pair is three string ids in an array. Repeated
+    hints ("hint", choseong initials) and answers cost 4 bytes per use
+    instead of a tuple and three string objects, and the whole batch
+    serializes to a few flat buffers (see to_bytes / from_bytes).
+
+    Indexing and iteration return plain tuples, so a QuizBatch can be used
+    wherever a list of pairs was. Slicing returns a QuizBatch sharing the
+    text buffer.
+    """
+    __slots__ = ("_text", "_offsets", "_fields")
+
+    def __init__(self, text: str = "", offsets: Optional[array] = None, fields: Optional[array] = None):
+        self._text = text
+        self._offsets = offsets if offsets is not None else array(_INDEX, [0])
+        self._fields = fields if fields is not None else array(_INDEX)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Pair]) -> "QuizBatch":
+        """
+        Builds a batch in one pass over pairs (a list or a generator)
+        """
+        ids = {}
+        parts = []
+        offsets = array(_INDEX, [0])
+        fields = array(_INDEX)
+        for pair in pairs:
+            if len(pair) != 3:
+                raise ValueError(f"Expected a (Question, Answer, Hint) pair, got {pair!r}")
+            for value in pair:
+                if value is None:
+                    fields.append(_NONE)
+                    continue
+                string_id = ids.get(value)
+                if string_id is None:
+                    string_id = ids[value] = len(parts)
+                    parts.append(value)
+                    offsets.append(offsets[-1] + len(value))
+                fields.append(string_id)
+        return cls("".join(parts), offsets, fields)
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == _NONE:
+            return None
+        return self._text[self._offsets[string_id]:self._offsets[string_id + 1]]
+
+    def __len__(self) -> int:
+        return len(self._fields) // 3
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                fields = self._fields[start * 3:max(start, stop) * 3]
+            else:
+                fields = array(_INDEX)
+                for i in range(start, stop, step):
+                    fields.extend(self._fields[i * 3:i * 3 + 3])
+            return QuizBatch(self._text, self._offsets, fields)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("QuizBatch index out of range")
+        base = index * 3
+        return (self._string(self._fields[base]),
+                self._string(self._fields[base + 1]),
+                self._string(self._fields[base + 2]))
+
+    def __iter__(self) -> Iterator[Pair]:
+        fields, string = self._fields, self._string
+        for base in range(0, len(fields), 3):
+            yield (string(fields[base]), string(fields[base + 1]), string(fields[base + 2]))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, QuizBatch):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"QuizBatch({len(self)} pairs, {len(self._offsets) - 1} strings)"
+
+    def to_bytes(self, compress: bool = True) -> bytes:
+        """
+        Serializes the batch
+
+        Layout after the header: string offsets and pair fields as
+        little-endian uint32, then the text buffer as utf-8. With compress
+        the body is zlib compressed.
+        """
+        strings = len(self._offsets) - 1
+        body = _to_le(self._offsets) + _to_le(self._fields) + self._text.encode("utf-8")
+        flags = 0
+        if compress:
+            body = zlib.compress(body)
+            flags |= _FLAG_ZLIB
+        return _HEADER.pack(MAGIC, flags, strings, len(self)) + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QuizBatch":
+        """
+        Inverse of to_bytes, raises ValueError for data it did not write
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("QuizBatch data is truncated")
+        magic, flags, strings, pairs = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not QuizBatch data")
+        body = data[_HEADER.size:]
+        if flags & _FLAG_ZLIB:
+            try:
+                body = zlib.decompress(body)
+            except zlib.error as e:
+                raise ValueError(f"Corrupt QuizBatch data: {e}")
+        offsets_end = (strings + 1) * 4
+        fields_end = offsets_end + pairs * 3 * 4
+        if len(body) < fields_end:
+            raise ValueError("QuizBatch data is truncated")
+        offsets = _from_le(body[:offsets_end])
+        fields = _from_le(body[offsets_end:fields_end])
+        try:
+            text = body[fields_end:].decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Corrupt QuizBatch text: {e}")
+        if offsets[-1] != len(text) or any(f >= strings and f != _NONE for f in fields):
+            raise ValueError("Corrupt QuizBatch data")
+        return cls(text, offsets, fields)
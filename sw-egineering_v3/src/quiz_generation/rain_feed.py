@@ -0,0 +1,127 @@
+import queue
+import random
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from quiz_generation.rain_quiz import RainQuizModel
+from quiz_generation.word_sampler import sample_words
+
+
+class RainLevel(NamedTuple):
+    """
+    spawn_ms: time between two falling words
+    fall_step: pixels a word falls per tick
+    rarity: share of words drawn by how often they are answered wrong
+    """
+    spawn_ms: int
+    fall_step: int
+    rarity: float
+
+
+def rain_level(score: int) -> RainLevel:
+    """
+    Difficulty for a score, one step every 5 points up to level 10
+    """
+    level = min(score // 5, 10)
+    return RainLevel(spawn_ms=2000 - level * 130, fall_step=5 + level // 2, rarity=level / 10)
+
+
+class RainWordFeed:
+    """
+    Endless (Question, Answer, Hint) pairs for the acid rain game
+
+    A background thread iterates a RainQuizModel over an endless stream of
+    word rows, drawn batch by batch from the category with the shared
+    word sampler, and keeps up to `prefetch` pairs ready in a queue.
+    next_word() only takes from that queue, so the game loop never waits
+    on the database. Words seen in the last batches are not drawn again
+    while the category has others.
+
+    Input:
+        category_id: category to draw from, None for all words
+        user_id: user whose weak words the rarer draws prefer
+        batch_size: words read per sampler call
+        prefetch: pairs kept ready
+        fallback: word rows to use when the database has no words
+        db: QuizDB, defaults to quiz_db
+        rng: random source of the draws
+    """
+    def __init__(self, category_id: Optional[int] = None, user_id: Optional[int] = None,
+                 batch_size: int = 20, prefetch: int = 40, fallback: Sequence[Dict] = (),
+                 db=None, rng: Optional[random.Random] = None):
+        self.category_id = category_id
+        self.user_id = user_id
+        self.batch_size = max(1, batch_size)
+        self.fallback = list(fallback)
+        self.db = db
+        self.rng = rng or random.Random()
+        self.rarity = 0.0
+        self._ready: "queue.Queue[Tuple[str, str, str]]" = queue.Queue(maxsize=max(1, prefetch))
+        self._recent = deque(maxlen=self.batch_size * 2)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, name="rain-feed", daemon=True)
+        self._thread.start()
+
+    def set_rarity(self, rarity: float):
+        """
+        0 draws every word alike, 1 draws by how often words are answered wrong
+        """
+        self.rarity = min(max(rarity, 0.0), 1.0)
+
+    def next_word(self, timeout: Optional[float] = None) -> Optional[Tuple[str, str, str]]:
+        """
+        Next (Question, Answer, Hint), None when nothing is ready yet
+
+        Does not wait unless a timeout is given, call it again later.
+        """
+        try:
+            if timeout is None:
+                return self._ready.get_nowait()
+            return self._ready.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._stop.set()
+
+    def _batch(self) -> List[Dict]:
+        if self.rng.random() < self.rarity:
+            weighting, user_id = ("weakness", self.user_id) if self.user_id is not None else ("wrong_count", None)
+        else:
+            weighting, user_id = "uniform", None
+        rows = sample_words(self.batch_size, weighting, user_id, self.category_id,
+                            exclude=tuple(self._recent), db=self.db, rng=self.rng)
+        if not rows and self._recent:
+            # A small category: repeat words rather than run dry
+            self._recent.clear()
+            rows = sample_words(self.batch_size, weighting, user_id, self.category_id, db=self.db, rng=self.rng)
+        self._recent.extend(row["word_id"] for row in rows)
+        return rows
+
+    def _rows(self) -> Iterator[Dict]:
+        while not self._stop.is_set():
+            try:
+                rows = self._batch()
+            except Exception as e:
+                print(f"Error loading rain words: {e}")
+                rows = []
+            if not rows:
+                rows = list(self.fallback)
+                self.rng.shuffle(rows)
+            if not rows:
+                # Nothing to show yet, look again later
+                self._stop.wait(1.0)
+            yield from rows
+
+    def _fill(self):
+        for pair in RainQuizModel(self._rows()):
+            # Waits while the queue is full, checking for close() now and then
+            while not self._stop.is_set():
+                try:
+                    self._ready.put(pair, timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+            if self._stop.is_set():
+                return
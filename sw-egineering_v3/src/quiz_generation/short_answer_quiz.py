@@ -1,85 +1,34 @@
 from quiz_generation.base_quiz_gen_class import BaseQuizModel
-from typing import Tuple, List
-from jamo import h2j, j2hcj
+from typing import Iterable, Iterator, Tuple
+from database.hangul import choseong
+from quiz_generation.grading import answer_key
 
 
 class ShortAnswerEKQuizModel(BaseQuizModel):
     def __init__(self, db):
         super().__init__(db)
-        self.pairs = []
-        self.current_index = 0
-        self.words = []
-        self.meanings = []
-        self._parse_db(db)
-    
-    def _parse_db(self, db):
-        for word in db:
-            #word_id, english, meaning, pos, example = word
-            self.words.append(word["english"])
-            self.meanings.append(word["meaning"])
-        self._create_pairs()
-
-    def _create_pairs(self):
-        for word, meaning in zip(self.words, self.meanings):
-            question = f"이 단어의 뜻이 무엇인가요: {word}"
-            self.pairs.append((question, meaning, self.__extract_initial(meaning)))
-
-    def __extract_initial(self, word):
-        list = []
-        for x in word:
-            temp = h2j(x)
-            imf = j2hcj(temp)
-            list.append(imf[0])
-        return "".join(list)
 
-    def get(self) -> List[Tuple[str, str, str]]:
-        return self.pairs
-    
-    def __iter__(self):
-        self.current_index = 0
-        return self
-
-    def __next__(self):
-        if self.current_index >= len(self.pairs):
-            raise StopIteration
-        pair = self.pairs[self.current_index]
-        self.current_index += 1
-        return pair
+    def _iter_pairs(self, rows: Iterable) -> Iterator[Tuple[str, str, str]]:
+        for word in rows:
+            #word_id, english, meaning, pos, example = word
+            meaning = word["meaning"]
+            question = f"이 단어의 뜻이 무엇인가요: {word['english']}"
+            # Split the senses now so grading an answer is only a lookup
+            answer_key(meaning)
+            # Rows from the Word table carry the precomputed initials
+            yield (question, meaning, word.get("choseong") or choseong(meaning))
     
 
 class ShortAnswerKEQuizModel(BaseQuizModel):
     def __init__(self, db):
         super().__init__(db)
-        self.pairs = []
-        self.current_index = 0
-        self.words = []
-        self.meanings = []
-        self._parse_db(db)
-    
-    def _parse_db(self, db):
-        for word in db:
-            #word_id, english, meaning, pos, example = word
-            self.words.append(word["english"])
-            self.meanings.append(word["meaning"])
-        self._create_pairs()
 
-    def _create_pairs(self):
+    def _iter_pairs(self, rows: Iterable) -> Iterator[Tuple[str, str, str]]:
         ratio = 0.3
-        for word, meaning in zip(self.words, self.meanings):
-            question = f"다음 의미를 가지는 단어는 무엇인가요: {meaning}"
+        for row in rows:
+            #word_id, english, meaning, pos, example = word
+            word = row["english"]
+            question = f"다음 의미를 가지는 단어는 무엇인가요: {row['meaning']}"
             length = max(int(len(word) * ratio), 1)
-            self.pairs.append((question, word, word[:length] + '_' * (len(word) - length)))
-
-    def get(self) -> List[Tuple[str, str, str]]:
-        return self.pairs
-    
-    def __iter__(self):
-        self.current_index = 0
-        return self
-
-    def __next__(self):
-        if self.current_index >= len(self.pairs):
-            raise StopIteration
-        pair = self.pairs[self.current_index]
-        self.current_index += 1
-        return pair
\ No newline at end of file
+            answer_key(word)
+            yield (question, word, word[:length] + '_' * (len(word) - length))
@@ -0,0 +1,339 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from database.quiz_db import add_result_listener
+from database.weakness import PRIOR, next_score
+from database.word_db import add_word_listener
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table: built in O(n), draws an index in O(1)
+
+    Items of weight 0 are never drawn.
+
+    Input:
+        weights: non-negative weight per index
+    """
+    __slots__ = ("_prob", "_alias", "_index")
+
+    def __init__(self, weights: Sequence[float]):
+        # Only positive weights take part, _index maps back to the caller's indices
+        self._index = [i for i, w in enumerate(weights) if w > 0]
+        n = len(self._index)
+        total = sum(weights[i] for i in self._index)
+        scaled = [weights[i] * n / total for i in self._index] if n else []
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # What is left is 1 up to rounding
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def draw(self, rng) -> int:
+        column = int(rng.random() * len(self._index))
+        if rng.random() >= self._prob[column]:
+            column = self._alias[column]
+        return self._index[column]
+
+
+class FenwickTree:
+    """
+    Prefix sums of weights with O(log n) updates and weighted draws
+
+    Input:
+        weights: non-negative weight per index
+    """
+    __slots__ = ("_tree", "_weights", "_top")
+
+    def __init__(self, weights: Sequence[float]):
+        self._weights = [float(w) for w in weights]
+        n = len(self._weights)
+        self._tree = [0.0] + self._weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __getitem__(self, index: int) -> float:
+        return self._weights[index]
+
+    @property
+    def weights(self) -> List[float]:
+        return list(self._weights)
+
+    @property
+    def total(self) -> float:
+        total, i = 0.0, len(self._weights)
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def set(self, index: int, weight: float):
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        i = index + 1
+        while i <= len(self._weights):
+            self._tree[i] += delta
+            i += i & -i
+
+    def find(self, value: float) -> int:
+        """
+        First index whose prefix sum exceeds value, 0 <= value < total
+        """
+        position, step = 0, self._top
+        while step:
+            nxt = position + step
+            if nxt <= len(self._weights) and self._tree[nxt] <= value:
+                position = nxt
+                value -= self._tree[nxt]
+            step >>= 1
+        # Rounding can step past the last positive weight
+        while position >= len(self._weights) or (position > 0 and self._weights[position] <= 0):
+            position -= 1
+        return position
+
+    def draw(self, rng) -> int:
+        return self.find(rng.random() * self.total)
+
+
+class WeightedSampler:
+    """
+    Draws items with probability proportional to their weight
+
+    Draws use an alias table (O(1) each). A weight update costs O(log n)
+    on a Fenwick tree. Until the alias table is rebuilt, draws go through
+    the tree (O(log n)), and the table is rebuilt once enough draws have
+    been made to pay for it.
+
+    Input:
+        items: the items, e.g. word rows
+        weights: non-negative weight per item
+        key: item -> key used by update() and exclude
+        rng: random source, the global random module when None
+    """
+    def __init__(self, items: Iterable, weights: Iterable[float],
+                 key: Callable[[object], Hashable] = lambda item: item["word_id"],
+                 rng: Optional[random.Random] = None):
+        self.items = list(items)
+        weights = [max(0.0, float(w)) for w in weights]
+        if len(weights) != len(self.items):
+            raise ValueError("items and weights differ in length")
+        self.key = key
+        self.rng = rng or random
+        self._positions = {key(item): i for i, item in enumerate(self.items)}
+        self._tree = FenwickTree(weights)
+        self._alias: Optional[AliasTable] = AliasTable(weights)
+        self._tree_draws = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def weight(self, key: Hashable) -> float:
+        return self._tree[self._positions[key]]
+
+    def update(self, key: Hashable, weight: float):
+        """
+        Changes the weight of one item, O(log n)
+        """
+        with self._lock:
+            self._set(self._positions[key], weight)
+
+    def update_item(self, key: Hashable, change: Callable[[object], None], weigh: Callable[[object], float]):
+        """
+        Changes an item in place and sets its weight to weigh(item), atomically
+        """
+        with self._lock:
+            index = self._positions[key]
+            change(self.items[index])
+            self._set(index, weigh(self.items[index]))
+
+    def _set(self, index: int, weight: float):
+        self._tree.set(index, max(0.0, float(weight)))
+        self._alias = None
+        self._tree_draws = 0
+
+    def _draw(self, rng) -> int:
+        if self._alias is None:
+            self._tree_draws += 1
+            # An O(n) rebuild every n/4 draws keeps draws O(1) amortized
+            if self._tree_draws > max(32, len(self.items) // 4):
+                self._alias = AliasTable(self._tree.weights)
+            return self._tree.draw(rng)
+        return self._alias.draw(rng)
+
+    def sample(self, k: int = 1, exclude: Iterable[Hashable] = (),
+               rng: Optional[random.Random] = None) -> List:
+        """
+        Draws up to k distinct items, skipping the keys in exclude
+
+        Returns:
+            fewer than k items only when fewer have a positive weight,
+            dict items are copies
+        """
+        rng = rng or self.rng
+        skip = {self._positions[key] for key in exclude if key in self._positions}
+        with self._lock:
+            # Small positive totals are rounding left over from zeroed weights
+            if k <= 0 or self._tree.total <= 1e-12:
+                return []
+            picked: Dict[int, None] = {}
+            # Rejection is cheap while k is small next to the number of items
+            for _ in range(4 * k + 16):
+                if len(picked) >= k:
+                    break
+                index = self._draw(rng)
+                if index not in skip:
+                    picked[index] = None
+            if len(picked) < k:
+                picked.update(dict.fromkeys(self._sample_exact(k - len(picked), skip | set(picked), rng)))
+            return [dict(self.items[i]) if isinstance(self.items[i], dict) else self.items[i] for i in picked]
+
+    def _sample_exact(self, k: int, skip: set, rng) -> List[int]:
+        # Zero the skipped weights on the tree, draw without replacement, then restore
+        saved = {i: self._tree[i] for i in skip}
+        for i in saved:
+            self._tree.set(i, 0.0)
+        picks = []
+        try:
+            while len(picks) < k and self._tree.total > 1e-12:
+                index = self._tree.draw(rng)
+                if self._tree[index] <= 0:
+                    break
+                picks.append(index)
+                saved[index] = self._tree[index]
+                self._tree.set(index, 0.0)
+        finally:
+            for i, weight in saved.items():
+                self._tree.set(i, weight)
+        return picks
+
+
+# Weight of a word row (see QuizDB.get_sampling_words) per weighting
+WEIGHTINGS: Dict[str, Callable[[Dict], float]] = {
+    "uniform": lambda row: 1.0,
+    # Words answered wrong more often come up more
+    "wrong_count": lambda row: 1.0 + (row["wrong_count"] or 0),
+    # Recency-weighted error rate of the user, unseen words in the middle
+    "weakness": lambda row: row["weakness"] if row["weakness"] is not None else PRIOR,
+}
+
+
+class SamplerKey(NamedTuple):
+    # BaseDatabase.db_key, every in-memory database has its own
+    db_key: str
+    weighting: str
+    user_id: Optional[int]
+    category_id: Optional[int]
+    min_wrong: int
+
+
+class WordSamplerCache:
+    """
+    WeightedSampler per (weighting, user, category, min_wrong), built from
+    one query on first use
+
+    Recorded quiz answers update the affected weights in place, added,
+    updated, deleted or recategorized words drop the cached samplers.
+    At most max_entries samplers are kept, least recently used first out.
+    """
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._samplers: "OrderedDict[SamplerKey, Tuple[WeightedSampler, Callable[[Dict], float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        add_word_listener(self._on_word_change)
+        add_result_listener(self._on_result)
+
+    def get(self, weighting: str = "wrong_count", user_id: Optional[int] = None,
+            category_id: Optional[int] = None, min_wrong: int = 0, db=None) -> WeightedSampler:
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting}")
+        if db is None:
+            from database.quiz_db import quiz_db as db
+        if weighting != "weakness":
+            user_id = None
+        key = SamplerKey(db.db_key, weighting, user_id, category_id, min_wrong)
+        with self._lock:
+            if key in self._samplers:
+                self._samplers.move_to_end(key)
+                return self._samplers[key][0]
+
+        base = WEIGHTINGS[weighting]
+
+        def weigh(row: Dict) -> float:
+            return base(row) if (row["wrong_count"] or 0) >= min_wrong else 0.0
+
+        rows = db.get_sampling_words(user_id, category_id)
+        sampler = WeightedSampler(rows, (weigh(row) for row in rows))
+        with self._lock:
+            self._samplers[key] = (sampler, weigh)
+            while len(self._samplers) > self.max_entries:
+                self._samplers.popitem(last=False)
+        return sampler
+
+    def clear(self):
+        with self._lock:
+            self._samplers.clear()
+
+    def _on_word_change(self, event: str, word_id: int):
+        self.clear()
+
+    def _on_result(self, db_key: str, user_id: int, word_id: int, is_correct: bool):
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._samplers.items() if key.db_key == db_key]
+        for key, (sampler, weigh) in entries:
+            if word_id not in sampler:
+                continue
+            sampler.update_item(word_id, lambda row: self._apply_result(row, key, user_id, is_correct), weigh)
+
+    @staticmethod
+    def _apply_result(row: Dict, key: SamplerKey, user_id: int, is_correct: bool):
+        # Same updates as QuizDB.record_quiz_result
+        if not is_correct:
+            row["wrong_count"] = (row["wrong_count"] or 0) + 1
+        if key.user_id == user_id:
+            row["weakness"] = next_score(row["weakness"], is_correct)
+
+
+word_sampler_cache = WordSamplerCache()
+
+
+def sample_words(count: int, weighting: str = "wrong_count", user_id: Optional[int] = None,
+                 category_id: Optional[int] = None, min_wrong: int = 0, exclude: Iterable[int] = (),
+                 db=None, rng: Optional[random.Random] = None) -> List[Dict]:
+    """
+    Up to count distinct word rows drawn by weight, without ORDER BY RANDOM()
+
+    Args:
+        count: number of words
+        weighting: one of WEIGHTINGS
+        user_id: user of the "weakness" weighting
+        category_id: only words of this category, None for all words
+        min_wrong: only words answered wrong at least this often
+        exclude: word ids not to draw
+        db: QuizDB, defaults to quiz_db
+        rng: random source, e.g. random.Random(seed)
+
+    Returns:
+        word rows (copies, safe to change)
+    """
+    return word_sampler_cache.get(weighting, user_id, category_id, min_wrong, db).sample(count, exclude, rng)
@@ -0,0 +1,86 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _candidate(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def _chat_completion(text):
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]}
+
+
+def _chat_chunk(text):
+    return {"choices": [{"index": 0, "delta": {"content": text}}]}
+
+
+class FakeLLMServer:
+    """
+    Local HTTP server standing in for the gemini API (and for OpenAI
+    compatible /chat/completions endpoints) in tests
+
+    responder(prompt) returns the text the fake model answers with.
+    Streaming requests get one server-sent event per line of that text.
+    Every request is recorded as (client_port, path, prompt), so tests can
+    check how many TCP connections were opened.
+    """
+    def __init__(self, responder=lambda prompt: "Q:I ate an ______;A:apple"):
+        self.responder = responder
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.endswith("/chat/completions"):
+                    prompt = body["messages"][-1]["content"]
+                else:
+                    prompt = body["contents"][0]["parts"][0]["text"]
+                server.requests.append((self.client_address[1], self.path, prompt))
+                text = server.responder(prompt)
+                if self.path.endswith("/chat/completions") and body.get("stream"):
+                    content_type = "text/event-stream"
+                    payload = ("".join(
+                        "data: " + json.dumps(_chat_chunk(piece)) + "\n\n"
+                        for piece in text.splitlines(keepends=True)
+                    ) + "data: [DONE]\n\n").encode("utf-8")
+                elif self.path.endswith("/chat/completions"):
+                    content_type = "application/json"
+                    payload = json.dumps(_chat_completion(text)).encode("utf-8")
+                elif "streamGenerateContent" in self.path:
+                    content_type = "text/event-stream"
+                    payload = "".join(
+                        "data: " + json.dumps(_candidate(piece)) + "\r\n\r\n"
+                        for piece in text.splitlines(keepends=True)
+                    ).encode("utf-8")
+                else:
+                    content_type = "application/json"
+                    payload = json.dumps(_candidate(text)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # 서버가 본 서로 다른 TCP 연결 수
+    def connection_count(self):
+        return len({port for port, _, _ in self.requests})
@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from database.weakness import next_score
+from quiz_generation.adaptive import adaptive_quiz, adaptive_recipe, adaptive_words
+from quiz_generation.factory import quiz_from_recipe
+
+
+class TestWordWeakness(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db = QuizDB(path)
+        self.word_db = WordDB(path)
+        self.word_ids = [self.word_db.add_word(f"word{i}", f"뜻{i}", "noun", "") for i in range(40)]
+
+    def tearDown(self):
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def weakness(self, user_id, word_id):
+        return self.quiz_db.fetch_one(
+            "SELECT score, attempts, wrong FROM UserWordWeakness WHERE user_id = ? AND word_id = ?",
+            (user_id, word_id))
+
+    def test_score_is_updated_incrementally(self):
+        expected = None
+        for is_correct in [False, False, True, False]:
+            self.assertTrue(self.quiz_db.record_quiz_result(1, self.word_ids[0], is_correct))
+            expected = next_score(expected, is_correct)
+        row = self.weakness(1, self.word_ids[0])
+        self.assertAlmostEqual(row["score"], expected)
+        self.assertEqual((row["attempts"], row["wrong"]), (4, 3))
+        # Other users are not affected
+        self.assertIsNone(self.weakness(2, self.word_ids[0]))
+
+    def test_recent_answers_count_more(self):
+        old_misses, new_misses = self.word_ids[:2]
+        for is_correct in [False, False, True, True]:
+            self.quiz_db.record_quiz_result(1, old_misses, is_correct)
+        for is_correct in [True, True, False, False]:
+            self.quiz_db.record_quiz_result(1, new_misses, is_correct)
+        top = self.quiz_db.get_top_weak_words(1, 2)
+        self.assertEqual([word["word_id"] for word in top], [new_misses])
+        weak = self.quiz_db.get_user_weak_words(1)
+        self.assertEqual(weak[0]["word_id"], new_misses)
+        self.assertEqual(weak[0]["accuracy_rate"], 50.0)
+
+    def test_top_weak_words_use_index(self):
+        plan = " ".join(row["detail"] for row in self.quiz_db.fetch_all(
+            "EXPLAIN QUERY PLAN SELECT word_id FROM UserWordWeakness WHERE user_id = ? AND score > ? "
+            "ORDER BY score DESC LIMIT 5", (1, 0.5)))
+        self.assertIn("idx_weakness_user_score", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_adaptive_words_mix_weak_and_review(self):
+        weak_ids = self.word_ids[5:12]
+        for word_id in weak_ids:
+            self.quiz_db.record_quiz_result(1, word_id, False)
+        self.quiz_db.record_quiz_result(1, self.word_ids[0], True)
+
+        words = adaptive_words(1, k=10, review_ratio=0.3, db=self.quiz_db, rng=random.Random(3))
+        ids = [word["word_id"] for word in words]
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(len(set(ids)), 10)
+        self.assertEqual(set(weak_ids), set(ids) & set(weak_ids))
+
+    def test_new_user_gets_review_words(self):
+        words = adaptive_words(99, k=5, db=self.quiz_db, rng=random.Random(1))
+        self.assertEqual(len({word["word_id"] for word in words}), 5)
+
+    def test_review_words_on_sparse_ids(self):
+        # Random probes over ids {first, 1000} nearly always land on 1000
+        self.quiz_db.execute("DELETE FROM Word WHERE word_id > ?", (self.word_ids[0],))
+        self.quiz_db.execute("INSERT INTO Word (word_id, english, meaning) VALUES (1000, 'sparse', '드문')")
+        for seed in range(20):
+            words = self.quiz_db.get_random_review_words(2, rng=random.Random(seed))
+            self.assertEqual(sorted(word["word_id"] for word in words), [self.word_ids[0], 1000])
+        words = self.quiz_db.get_random_review_words(2, exclude=(1000,), rng=random.Random(0))
+        self.assertEqual([word["word_id"] for word in words], [self.word_ids[0]])
+        self.assertEqual(len(adaptive_words(1, k=5, db=self.quiz_db, rng=random.Random(0))), 2)
+
+    def test_adaptive_recipe_replays(self):
+        for word_id in self.word_ids[:4]:
+            self.quiz_db.record_quiz_result(1, word_id, False)
+        recipe = adaptive_recipe(1, "four_choice", k=6, seed=42, db=self.quiz_db)
+        self.assertEqual(adaptive_recipe(1, "four_choice", k=6, seed=42, db=self.quiz_db), recipe)
+        quiz = adaptive_quiz(1, "four_choice", k=6, seed=42, db=self.quiz_db)
+        self.assertEqual(quiz.get(), quiz_from_recipe(recipe, self.quiz_db).get())
+
+
+if __name__ == "__main__":
+    unittest.main()
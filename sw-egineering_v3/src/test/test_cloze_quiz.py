@@ -1,20 +1,44 @@
 import unittest
-import pandas as pd
-from quiz_generation.cloze_quiz import ClozeQuizModel
+from concurrent.futures import Future
+from unittest import mock
+from quiz_generation.cloze_quiz import ClozeQuizModel, make_fallback_question
+from LLM.resilience import CallPolicy, CircuitBreaker
+import threading
 import time
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+def translated(examples):
+    # 스트리밍 힌트 번역 (translator.submit) 대신 바로 끝난 Future
+    future = Future()
+    future.set_result(["번역"] * len(examples))
+    return future
+
 
 class TestClozeQuizModel(unittest.TestCase):
     def setUp(self):
         # Sample data for testing
-        data = {
-            "word": ["apple", "banana"],
-            "meaning": ["사과", "바나나"]
-        }
-        self.db = pd.DataFrame(data)
-        self.model = ClozeQuizModel(self.db, APIKEY="dummy")
+        self.db = [
+            {"english": "apple", "meaning": "사과"},
+            {"english": "banana", "meaning": "바나나"},
+        ]
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # The local provider answers offline, no API key needed
+        self.model = ClozeQuizModel(self.db, model="local", use_cache=False)
 
     def test_pairs_creation(self):
-        # Mocking the LLM response
         pairs = self.model.get()
         for pair in pairs:
             print(pair)
@@ -27,5 +51,187 @@ class TestClozeQuizModel(unittest.TestCase):
             expected_length -= 1
         self.assertEqual(expected_length, 0)
 
+def fake_llm(prompt, *args, **kwargs):
+    # 프롬프트의 [words]: 뒤에 있는 단어마다 한 문제씩 응답
+    words = [w.strip() for w in prompt.split("[words]:")[1].split(";") if w.strip()]
+    time.sleep(0.05)
+    return "\n".join(f"Q:I like the ______ very much;A:{w}" for w in words)
+
+
+class TestClozeChunking(unittest.TestCase):
+    def setUp(self):
+        self.words = [{"english": f"word{i}", "meaning": f"뜻{i}"} for i in range(40)]
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunks_fit_budget_and_keep_order(self):
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=fake_llm) as llm:
+            model = ClozeQuizModel(self.words, APIKEY="dummy", use_cache=False, chunk_token_budget=450, max_concurrency=8)
+        self.assertGreater(llm.call_count, 1)
+        self.assertEqual([pair[1] for pair in model.get()], [w["english"] for w in self.words])
+
+    def test_chunks_run_concurrently(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        def tracking_llm(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return fake_llm(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=tracking_llm):
+            ClozeQuizModel(self.words, APIKEY="dummy", use_cache=False, chunk_token_budget=450, max_concurrency=3)
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 3)
+
+    def test_failed_chunk_is_retried_alone(self):
+        calls = []
+        def flaky_llm(prompt, *args, **kwargs):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise TimeoutError("provider timed out")
+            return fake_llm(prompt)
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=flaky_llm):
+            model = ClozeQuizModel(self.words[:3], APIKEY="dummy", use_cache=False)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(model.get()), 3)
+
+    def test_overlapping_stems_keep_their_questions(self):
+        def stem_llm(prompt, *args, **kwargs):
+            # good 의 문제가 먼저 오고, go 는 변형(goes)으로 답함
+            return "Q:The food was ______;A:good\nQ:She ______ home early;A:goes"
+        words = [{"english": "go", "meaning": "가다"}, {"english": "good", "meaning": "좋은"}]
+        cache = mock.Mock()
+        cache.get.return_value = None
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=stem_llm):
+            model = ClozeQuizModel(words, APIKEY="dummy", cache=cache)
+        self.assertEqual([pair[:2] for pair in model.get()],
+                         [("She ______ home early", "goes"), ("The food was ______", "good")])
+        stored = {call.args[0]: call.args[1] for call in cache.put.call_args_list}
+        self.assertEqual(stored[model._cache_key("good")], "Q:The food was ______;A:good")
+        self.assertEqual(stored[model._cache_key("go")], "Q:She ______ home early;A:goes")
+
+    def test_truncated_reply_retries_missing_words(self):
+        prompts = []
+        def truncating_llm(prompt, *args, **kwargs):
+            prompts.append(prompt)
+            return fake_llm(prompt).split("\n")[0]  # 첫 줄만 돌려줌
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=truncating_llm):
+            model = ClozeQuizModel(self.words[:3], APIKEY="dummy", use_cache=False)
+        self.assertEqual([pair[1] for pair in model.get()], ["word0", "word1", "word2"])
+        self.assertNotIn("word0", prompts[1])
+
+
+class TestClozeStreaming(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__submit_examples",
+                             side_effect=translated)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.release = threading.Event()
+
+    def gated_stream(self, prompt, *args, **kwargs):
+        # 첫 줄을 보낸 뒤 release 될 때까지 나머지를 보내지 않음
+        text = fake_llm(prompt)
+        cut = text.index("\n") + 10  # 두 번째 줄 중간에서 끊음
+        yield text[:cut]
+        self.release.wait(5)
+        yield text[cut:]
+
+    def test_first_question_before_stream_ends(self):
+        words = [{"english": w, "meaning": "뜻"} for w in ["apple", "banana", "cherry"]]
+        with mock.patch("quiz_generation.cloze_quiz.get_response_stream", side_effect=self.gated_stream):
+            model = ClozeQuizModel(words, APIKEY="dummy", use_cache=False, stream=True)
+            iterator = iter(model)
+            first = next(iterator)
+            self.assertEqual(first[1], "apple")
+            self.release.set()
+            rest = [next(iterator), next(iterator)]
+            with self.assertRaises(StopIteration):
+                next(iterator)
+        self.assertEqual([pair[1] for pair in rest], ["banana", "cherry"])
+        self.assertEqual(len(model.get()), 3)
+
+    def test_missing_words_are_filled_after_stream(self):
+        words = [{"english": w, "meaning": "뜻"} for w in ["apple", "banana"]]
+        with mock.patch("quiz_generation.cloze_quiz.get_response_stream",
+                        side_effect=lambda prompt, *a, **k: iter(["Q:An ______ a day;A:apple\n"])), \
+             mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=fake_llm):
+            model = ClozeQuizModel(words, APIKEY="dummy", use_cache=False, stream=True)
+            pairs = model.get()
+        self.assertEqual(sorted(pair[1] for pair in pairs), ["apple", "banana"])
+
+
+class TestClozeFallback(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__submit_examples",
+                             side_effect=translated)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.words = [
+            {"english": "apple", "meaning": "사과", "example_sentence": "I like Apples."},
+            {"english": "banana", "meaning": "바나나", "example": "A banana is yellow."},
+        ]
+
+    def test_fallback_question(self):
+        self.assertEqual(make_fallback_question("apple", "I like Apples."), "I like ______.")
+        self.assertIsNone(make_fallback_question("apple", "No fruit here."))
+        self.assertIsNone(make_fallback_question("apple", None))
+
+    def test_hanging_provider_is_bounded(self):
+        def hanging_llm(*args, **kwargs):
+            time.sleep(5)
+        policy = CallPolicy(timeout=0.1, max_attempts=2, base_delay=0.01)
+        started = time.perf_counter()
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=hanging_llm):
+            model = ClozeQuizModel(self.words, use_cache=False, call_policy=policy)
+        self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual([pair[:2] for pair in model.get()],
+                         [("I like ______.", "apple"), ("A ______ is yellow.", "banana")])
+
+    def test_hanging_stream_is_bounded(self):
+        def hanging_stream(*args, **kwargs):
+            yield "Q:An ______ a day;A:apple\n"
+            time.sleep(5)
+            yield "Q:A ______ split;A:banana\n"
+        breaker = CircuitBreaker(failure_threshold=1)
+        policy = CallPolicy(timeout=0.5, breaker=breaker)
+        started = time.perf_counter()
+        with mock.patch("quiz_generation.cloze_quiz.get_response_stream", side_effect=hanging_stream), \
+             mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=fake_llm) as llm:
+            model = ClozeQuizModel(self.words, use_cache=False, call_policy=policy, stream=True)
+            pairs = [pair[:2] for pair in model]
+        self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual(pairs, [("An ______ a day", "apple"), ("A ______ is yellow.", "banana")])
+        # 시간 초과는 실패로 기록되고 다시 LLM 을 부르지 않음
+        self.assertEqual(llm.call_count, 0)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_open_circuit_skips_provider(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        policy = CallPolicy(timeout=1, breaker=breaker)
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=fake_llm) as llm, \
+             mock.patch("quiz_generation.cloze_quiz.get_response_stream") as llm_stream:
+            model = ClozeQuizModel(self.words, use_cache=False, call_policy=policy)
+            streamed = ClozeQuizModel(self.words, use_cache=False, call_policy=policy, stream=True)
+            self.assertEqual(len(streamed.get()), 2)
+        self.assertEqual(llm.call_count + llm_stream.call_count, 0)
+        self.assertEqual(len(model.get()), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
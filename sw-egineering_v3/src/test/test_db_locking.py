@@ -0,0 +1,120 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from database.db_metrics import db_metrics
+from database.quiz_db import QuizDB, add_result_listener, remove_result_listener
+from database.retry_policy import RetryPolicy, is_lock_error
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        db_metrics.reset()
+        # busy_timeout 을 짧게 두어 재시도 정책이 동작하도록 함
+        self.db = QuizDB(self.db_path, busy_timeout_ms=10,
+                         retry_policy=RetryPolicy(max_attempts=20, base_delay=0.01, max_delay=0.05))
+        self.other = sqlite3.connect(self.db_path, timeout=0, isolation_level=None, check_same_thread=False)
+
+    def tearDown(self):
+        self.other.close()
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _hold_write_lock(self, seconds):
+        self.other.execute("BEGIN IMMEDIATE")
+        def release():
+            time.sleep(seconds)
+            self.other.execute("COMMIT")
+        thread = threading.Thread(target=release)
+        thread.start()
+        return thread
+
+    def test_write_retries_until_lock_released(self):
+        thread = self._hold_write_lock(0.2)
+        self.assertTrue(self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('cloze')"))
+        self.db.commit()
+        thread.join()
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 1)
+        self.assertGreater(db_metrics.counter('lock_retries'), 0)
+        self.assertGreater(db_metrics.histogram('lock_wait_seconds')['count'], 0)
+
+    def test_write_transaction_waits_for_lock(self):
+        thread = self._hold_write_lock(0.2)
+        with self.db.write_transaction():
+            self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+            self.db.commit()  # 블록 안에서는 커밋이 미뤄짐
+            self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+        thread.join()
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 2)
+        self.assertEqual(db_metrics.histogram('begin_immediate_seconds')['count'], 1)
+
+    def test_write_transaction_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.db.write_transaction():
+                self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+                raise ValueError("boom")
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 0)
+
+    def test_failed_statement_rolls_back_block(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.write_transaction():
+                self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+                self.db.execute("INSERT INTO quiz (quiz_type) VALUES (NULL)")  # NOT NULL 위반
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 0)
+        # 블록 밖에서는 예전처럼 False 를 돌려줌
+        self.assertFalse(self.db.execute("INSERT INTO quiz (quiz_type) VALUES (NULL)"))
+
+    def test_swallowed_failure_still_rolls_back(self):
+        with self.assertRaises(sqlite3.DatabaseError):
+            with self.db.write_transaction():
+                self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+                try:
+                    self.db.executemany("INSERT INTO quiz (quiz_type) VALUES (?)", [("cloze",), (None,)])
+                except sqlite3.IntegrityError:
+                    pass
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 0)
+        # 다음 트랜잭션에는 영향 없음
+        with self.db.write_transaction():
+            self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], 1)
+
+    def test_failed_result_is_not_notified(self):
+        self.db.enable_foreign_keys()
+        self.db.execute("INSERT INTO User (user_login_id, user_pw, user_name) VALUES ('u', 'pw', 'user')")
+        self.db.execute("INSERT INTO Word (english, meaning) VALUES ('apple', '사과')")
+        self.db.commit()
+        user_id = self.db.fetch_one("SELECT user_id FROM User")["user_id"]
+        word_id = self.db.fetch_one("SELECT word_id FROM Word")["word_id"]
+        notified = []
+        listener = lambda db_key, user, word, is_correct: notified.append(word)
+        add_result_listener(listener)
+        try:
+            self.assertFalse(self.db.record_quiz_result(user_id, 999, False))
+            self.assertTrue(self.db.record_quiz_result(user_id, word_id, False))
+        finally:
+            remove_result_listener(listener)
+        self.assertEqual(notified, [word_id])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM WordHistory")["n"], 1)
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM UserWordWeakness")["n"], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        self.db.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001)
+        self.other.execute("BEGIN IMMEDIATE")
+        try:
+            self.assertFalse(self.db.execute("INSERT INTO quiz (quiz_type) VALUES ('cloze')"))
+        finally:
+            self.other.execute("COMMIT")
+        self.assertEqual(db_metrics.counter('lock_failures'), 1)
+
+    def test_is_lock_error(self):
+        self.assertTrue(is_lock_error(sqlite3.OperationalError("database is locked")))
+        self.assertFalse(is_lock_error(sqlite3.OperationalError("no such table: x")))
+        self.assertFalse(is_lock_error(ValueError("database is locked")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from database.quiz_db import QuizDB
+
+
+class TestThreadSafeDatabase(unittest.TestCase):
+    THREADS = 16
+    OPS_PER_THREAD = 40
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = QuizDB(os.path.join(self.tmpdir.name, "test.db"))
+        self.db.execute("INSERT INTO Word (english, meaning) VALUES ('apple', '사과')")
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_each_thread_gets_own_connection(self):
+        connections = []
+        def grab():
+            connections.append(self.db.conn)
+        thread = threading.Thread(target=grab)
+        thread.start()
+        thread.join()
+        self.assertIsNot(connections[0], self.db.conn)
+
+    def test_mixed_reads_and_writes_from_many_threads(self):
+        def worker(n):
+            created = []
+            for i in range(self.OPS_PER_THREAD):
+                if i % 4 == 0:
+                    quiz_id = self.db.create_quiz(f"type{n}")
+                    self.db.add_quiz_question(quiz_id, f"Q{n}-{i}", "A")
+                    created.append(quiz_id)
+                elif i % 4 == 1:
+                    self.assertTrue(self.db.record_quiz_result(n, 1, i % 3 == 0))
+                elif i % 4 == 2:
+                    quiz = self.db.get_quiz(created[-1])
+                    self.assertEqual(quiz["quiz_type"], f"type{n}")
+                else:
+                    self.db.get_user_quiz_history(n, limit=5)
+            return created
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            results = list(pool.map(worker, range(self.THREADS)))
+
+        quiz_ids = [quiz_id for created in results for quiz_id in created]
+        self.assertEqual(len(set(quiz_ids)), len(quiz_ids))  # lastrowid 가 스레드 간에 섞이지 않음
+        expected = self.THREADS * self.OPS_PER_THREAD // 4
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz")["n"], expected)
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM quiz_question")["n"], expected)
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM WordHistory")["n"], expected)
+
+    def test_foreign_keys_setting_reaches_new_threads(self):
+        def setting():
+            result = []
+            thread = threading.Thread(target=lambda: result.append(
+                self.db.fetch_one("PRAGMA foreign_keys")["foreign_keys"]))
+            thread.start()
+            thread.join()
+            return result[0]
+
+        self.db.enable_foreign_keys()
+        self.assertEqual(setting(), 1)
+        # 다른 스레드의 연결에서도 없는 단어의 결과는 저장되지 않음
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self.assertFalse(pool.submit(self.db.record_quiz_result, 1, 999, True).result())
+        self.db.disable_foreign_keys()
+        self.assertEqual(setting(), 0)
+
+    def test_memory_database_is_shared_between_threads(self):
+        db = QuizDB(":memory:")
+        quiz_id = db.create_quiz("cloze")
+        result = []
+        thread = threading.Thread(target=lambda: result.append(db.get_quiz(quiz_id)))
+        thread.start()
+        thread.join()
+        self.assertEqual(result[0]["quiz_type"], "cloze")
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from quiz_generation import distractors
+from quiz_generation.distractors import DistractorSampler, get_word_table_sampler, make_sampler
+from quiz_generation.four_choice_quiz import FourChoiceQuizModel
+
+
+class TestDistractorSampler(unittest.TestCase):
+    def test_excludes_answer_and_duplicates(self):
+        sampler = DistractorSampler(["a", "b", "a", "c", "d"], rng=random.Random(1))
+        for _ in range(200):
+            picks = sampler.sample("b", 3)
+            self.assertEqual(sorted(picks), ["a", "c", "d"])
+
+    def test_draw_is_uniform(self):
+        sampler = DistractorSampler([f"w{i}" for i in range(10)], rng=random.Random(7))
+        counts = Counter(w for _ in range(3000) for w in sampler.sample("w4", 3, exclude=["w0"]))
+        self.assertNotIn("w4", counts)
+        self.assertNotIn("w0", counts)
+        self.assertEqual(len(counts), 8)
+        self.assertLess(max(counts.values()) - min(counts.values()), 250)
+
+    def test_small_pool_uses_fallback(self):
+        table = DistractorSampler(["a", "b", "x", "y", "z"])
+        sampler = DistractorSampler(["a", "b"], fallback=table)
+        options = sampler.options("a", 3)
+        self.assertEqual(options[0], "a")
+        self.assertIn("b", options)
+        self.assertEqual(len(set(options)), 4)
+
+    def test_too_few_words_anywhere(self):
+        self.assertEqual(DistractorSampler(["a", "b"]).options("a", 3), ["a", "b"])
+        self.assertEqual(DistractorSampler([]).sample("a", 3), [])
+
+
+class TestWordTableSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db = QuizDB(path)
+        self.word_db = WordDB(path)
+        for english in ["apple", "banana", "cherry", "grape"]:
+            self.word_db.add_word(english, "뜻", "noun", "")
+        distractors._invalidate_word_table("reset", 0)
+
+    def tearDown(self):
+        distractors._invalidate_word_table("reset", 0)
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_rebuilt_after_word_change(self):
+        table = get_word_table_sampler(self.quiz_db)
+        self.assertIs(get_word_table_sampler(self.quiz_db), table)
+        word_id = self.word_db.add_word("melon", "멜론", "noun", "")
+        self.assertIn("melon", get_word_table_sampler(self.quiz_db))
+        self.word_db.delete_word(word_id)
+        self.assertNotIn("melon", get_word_table_sampler(self.quiz_db))
+
+    def test_four_choice_with_small_pool(self):
+        sampler = make_sampler(["apple", "banana"], db=self.quiz_db)
+        model = FourChoiceQuizModel([{"english": "apple", "meaning": "사과"},
+                                     {"english": "banana", "meaning": "바나나"}], distractors=sampler)
+        for _, choices, _ in model.get():
+            self.assertEqual(len(set(choices.split(","))), 4)
+        self.assertEqual(model.get()[0][1].split(",")[0], "apple")
+
+    def test_seeded_fallback_is_reproducible(self):
+        for english in ["lemon", "melon", "peach", "plum", "kiwi", "mango"]:
+            self.word_db.add_word(english, "뜻", "noun", "")
+        words = [{"english": "apple", "meaning": "사과"}]
+        draws = [FourChoiceQuizModel(words, distractors=make_sampler(["apple"], db=self.quiz_db),
+                                     rng=random.Random(11)).get()[0][1] for _ in range(3)]
+        self.assertEqual(len(set(draws)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,10 @@ class TestFourChoiceQuizModel(unittest.TestCase):
     def setUp(self):
         # Sample data for testing
         data = {
-            "word": ["apple", "banana", "orange", "grape"],
+            "english": ["apple", "banana", "orange", "grape"],
             "meaning": ["사과", "바나나", "오렌지", "포도"]
         }
-        self.db = pd.DataFrame(data)
+        self.db = pd.DataFrame(data).to_dict("records")
         self.model = FourChoiceQuizModel(self.db)
 
     def test_pairs_creation(self):
@@ -24,4 +24,4 @@ class TestFourChoiceQuizModel(unittest.TestCase):
         self.assertEqual(expected_length, 0)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
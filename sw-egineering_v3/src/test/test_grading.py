@@ -0,0 +1,71 @@
+import random
+import time
+import unicodedata
+import unittest
+from quiz_generation.grading import bounded_distance, grade, is_correct, split_senses
+from quiz_generation.neighbour_index import edit_distance
+from quiz_generation.short_answer_quiz import ShortAnswerEKQuizModel, ShortAnswerKEQuizModel
+
+
+class TestGrading(unittest.TestCase):
+    def test_any_sense_is_accepted(self):
+        self.assertTrue(is_correct("사죄", "사과, 사죄"))
+        self.assertTrue(is_correct(" 사과 ", "사과; 사죄"))
+        self.assertTrue(is_correct("능금", "(과일) 능금"))
+        self.assertFalse(is_correct("사과, 사죄", "사과"))
+        self.assertEqual(split_senses("사과, (과일) 능금"), ("사과", "능금", "(과일) 능금"))
+
+    def test_normalization(self):
+        self.assertTrue(is_correct("APPLE", "apple"))
+        self.assertTrue(is_correct("ice  cream", "ice cream"))
+        # Decomposed (NFD) input equals the composed answer
+        self.assertTrue(grade("사과", "사과").exact)
+
+    def test_jamo_typos(self):
+        result = grade("사과하디", "사과하다")
+        self.assertTrue(result.correct)
+        self.assertFalse(result.exact)
+        self.assertEqual(result.distance, 1)
+        # Short answers have no typo budget
+        self.assertFalse(is_correct("사고", "사과"))
+        self.assertFalse(is_correct("cat", "car"))
+        self.assertFalse(is_correct("사과하디", "사과하다", typos=False))
+        self.assertFalse(is_correct("", "사과"))
+
+    def test_english_answers_are_exact(self):
+        # Confusable TOEIC words, also served as hard distractors, must not pass as typos
+        for typed, correct in [("adopt", "adapt"), ("effect", "affect"), ("advise", "advice"),
+                               ("later", "latter"), ("lose", "loose"), ("aple", "apple")]:
+            self.assertFalse(is_correct(typed, correct), (typed, correct))
+            self.assertFalse(is_correct(correct, typed), (correct, typed))
+        self.assertTrue(is_correct(" Adapt ", "adapt"))
+        # A Hangul sense of the same answer still accepts typos
+        self.assertTrue(is_correct("사과하디", "apologize, 사과하다"))
+        self.assertFalse(is_correct("apologise", "apologize, 사과하다"))
+
+    def test_bounded_distance_matches_full(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            a = "".join(rng.choices("abc", k=rng.randint(0, 8)))
+            b = "".join(rng.choices("abc", k=rng.randint(0, 8)))
+            full = edit_distance(a, b)
+            for limit in range(4):
+                self.assertEqual(bounded_distance(a, b, limit), min(full, limit + 1), (a, b, limit))
+
+    def test_grading_takes_microseconds(self):
+        started = time.perf_counter()
+        for _ in range(1000):
+            is_correct("사과하디", "사과, 사과하다")
+        self.assertLess((time.perf_counter() - started) / 1000, 0.001)
+
+    def test_short_answer_models(self):
+        ek = ShortAnswerEKQuizModel([{"english": "apple", "meaning": "사과, 능금"}])
+        self.assertTrue(ek.check("능금", ek.get()[0][1]))
+        ke = ShortAnswerKEQuizModel([{"english": "apple", "meaning": "사과"}])
+        self.assertTrue(ke.check("Apple", ke.get()[0][1]))
+        self.assertFalse(ke.check("Aple", ke.get()[0][1]))
+        self.assertFalse(ke.check("banana", ke.get()[0][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from database.hangul import choseong, choseong_many
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from quiz_generation.short_answer_quiz import ShortAnswerEKQuizModel
+
+
+class TestChoseong(unittest.TestCase):
+    def test_syllables(self):
+        self.assertEqual(choseong("사과"), "ㅅㄱ")
+        self.assertEqual(choseong("까치 힘"), "ㄲㅊ ㅎ")
+        self.assertEqual(choseong("가"), "ㄱ")
+        self.assertEqual(choseong("힣"), "ㅎ")
+
+    def test_other_characters_are_kept(self):
+        self.assertEqual(choseong("(사과), apple ㅋ"), "(ㅅㄱ), apple ㅋ")
+        self.assertEqual(choseong(""), "")
+        self.assertEqual(choseong(None), "")
+
+    def test_batch(self):
+        self.assertEqual(choseong_many(["사과", "바나나", None]), ["ㅅㄱ", "ㅂㄴㄴ", ""])
+
+
+class TestChoseongColumn(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.word_db = WordDB(path)
+        self.quiz_db = QuizDB(path)
+        self.apple = self.word_db.add_word("apple", "사과", "noun", "")
+        self.word_db.add_word("banana", "바나나", "noun", "")
+        self.word_db.add_word("apology", "사과하다", "verb", "")
+
+    def tearDown(self):
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_search_by_initials(self):
+        self.assertEqual([w["english"] for w in self.word_db.search_by_choseong("ㅅㄱ")], ["apple", "apology"])
+        self.assertEqual([w["english"] for w in self.word_db.search_words("ㅂㄴ")], ["banana"])
+        self.assertEqual(self.word_db.search_by_choseong("ㅎ"), [])
+
+    def test_kept_up_to_date_on_update(self):
+        self.word_db.update_word(self.apple, "apple", "능금", "noun", "")
+        self.assertEqual([w["english"] for w in self.word_db.search_by_choseong("ㄴㄱ")], ["apple"])
+        self.assertEqual([w["english"] for w in self.word_db.search_by_choseong("ㅅㄱ")], ["apology"])
+
+    def test_short_answer_hint_from_column(self):
+        rows = self.quiz_db.get_category_words()
+        self.assertEqual(rows[0]["choseong"], "ㅅㄱ")
+        pairs = ShortAnswerEKQuizModel(rows).get()
+        self.assertEqual([hint for _, _, hint in pairs], ["ㅅㄱ", "ㅂㄴㄴ", "ㅅㄱㅎㄷ"])
+        # Rows without the column still get a hint
+        self.assertEqual(ShortAnswerEKQuizModel([{"english": "x", "meaning": "사과"}]).get()[0][2], "ㅅㄱ")
+
+
+if __name__ == "__main__":
+    unittest.main()
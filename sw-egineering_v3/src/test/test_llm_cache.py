@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from LLM import LLMResponse
+from LLM.providers import get_provider
+from LLM.response_cache import ResponseCache, make_cache_key
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(":memory:", ttl_seconds=60, max_entries=3, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_key_depends_on_prompt_model_and_config(self):
+        base = make_cache_key("p", "gemini-2.0-flash", {"temperature": 0})
+        self.assertEqual(base, make_cache_key("p", "gemini-2.0-flash", {"temperature": 0}))
+        self.assertNotEqual(base, make_cache_key("q", "gemini-2.0-flash", {"temperature": 0}))
+        self.assertNotEqual(base, make_cache_key("p", "gemini-1.5-pro", {"temperature": 0}))
+        self.assertNotEqual(base, make_cache_key("p", "gemini-2.0-flash", {"temperature": 1}))
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", "response")
+        self.assertEqual(self.cache.get("k"), "response")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_ttl_expiry(self):
+        self.cache.put("k", "response")
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.stats()["expired"], 1)
+
+    def test_lru_eviction(self):
+        for key in ["a", "b", "c"]:
+            self.cache.put(key, key)
+            self.clock.now += 1
+        self.cache.get("a")  # a 가 가장 최근에 사용됨
+        self.clock.now += 1
+        self.cache.put("d", "d")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), "a")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_size_limit(self):
+        cache = ResponseCache(":memory:", max_bytes=10, clock=self.clock)
+        cache.put("a", "x" * 6)
+        self.clock.now += 1
+        cache.put("b", "y" * 6)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "y" * 6)
+        cache.close()
+
+
+class TestGetResponseCaching(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(":memory:")
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_second_call_is_served_from_cache(self):
+        with mock.patch.object(get_provider("gemini"), "generate", return_value="Q:x;A:y") as remote:
+            first = LLMResponse.get_response("prompt", API_KEY="key", cache=self.cache)
+            second = LLMResponse.get_response("prompt", API_KEY="key", cache=self.cache)
+        self.assertEqual(first, second)
+        self.assertEqual(remote.call_count, 1)
+
+    def test_bypass_flag(self):
+        with mock.patch.object(get_provider("gemini"), "generate", return_value="Q:x;A:y") as remote:
+            LLMResponse.get_response("prompt", API_KEY="key", cache=self.cache)
+            LLMResponse.get_response("prompt", API_KEY="key", cache=self.cache, use_cache=False)
+        self.assertEqual(remote.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from LLM import LLMResponse
+from LLM.client_pool import ClientPool, client_pool
+from fake_llm_server import FakeLLMServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pool = ClientPool(idle_seconds=10, clock=self.clock)
+        self.pool.register_factory("fake", lambda api_key, **options: FakeClient(api_key))
+
+    def test_reuses_client_per_key(self):
+        a = self.pool.get("fake", "key1")
+        self.assertIs(a, self.pool.get("fake", "key1"))
+        self.assertIsNot(a, self.pool.get("fake", "key2"))
+        stats = self.pool.stats()
+        self.assertEqual((stats["created"], stats["reused"]), (2, 1))
+
+    def test_closes_idle_clients(self):
+        old = self.pool.get("fake", "key1")
+        self.clock.now += 11
+        fresh = self.pool.get("fake", "key2")
+        self.assertTrue(old.closed)
+        self.assertFalse(fresh.closed)
+        self.assertEqual(self.pool.stats()["open_clients"], 1)
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            self.pool.get("nope", "key")
+
+
+class TestGeminiConnectionReuse(unittest.TestCase):
+    def test_requests_share_one_connection(self):
+        with FakeLLMServer(lambda prompt: f"echo {prompt}") as server:
+            before = client_pool.stats()
+            for i in range(5):
+                text = LLMResponse.generate_gemini_response(f"p{i}", "test-key", base_url=server.url)
+                self.assertEqual(text, f"echo p{i}")
+            after = client_pool.stats()
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(server.connection_count(), 1)
+        self.assertEqual(after["created"] - before["created"], 1)
+        self.assertEqual(after["reused"] - before["reused"], 4)
+
+    def test_threads_share_client(self):
+        with FakeLLMServer(lambda prompt: "ok") as server:
+            before = client_pool.stats()
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(
+                    lambda i: LLMResponse.generate_gemini_response(f"p{i}", "thread-key", base_url=server.url),
+                    range(12)
+                ))
+            after = client_pool.stats()
+        self.assertEqual(results, ["ok"] * 12)
+        self.assertEqual(after["created"] - before["created"], 1)
+        self.assertLessEqual(server.connection_count(), 4)
+
+
+    def test_stream_through_shared_client(self):
+        with FakeLLMServer(lambda prompt: "Q:a;A:b\nQ:c;A:d\n") as server:
+            pieces = list(LLMResponse.generate_gemini_response_stream("p", "test-key", base_url=server.url))
+        self.assertEqual(list(LLMResponse.iter_lines(pieces)), ["Q:a;A:b", "Q:c;A:d"])
+        self.assertIn("streamGenerateContent", server.requests[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
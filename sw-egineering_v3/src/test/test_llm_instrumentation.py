@@ -0,0 +1,91 @@
+import threading
+import unittest
+from unittest import mock
+from LLM.instrumentation import LLMCallRecord, MetricsStore, bind_context, llm_context, set_metrics_store
+from LLM.LLMResponse import get_response, get_response_stream
+from LLM.providers import LocalProvider, register_provider
+from LLM.resilience import CallPolicy
+from LLM.response_cache import ResponseCache
+from quiz_generation.cloze_quiz import ClozeQuizModel
+
+
+class TestLLMInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.store = MetricsStore(":memory:")
+        set_metrics_store(self.store)
+        self.addCleanup(set_metrics_store, None)
+        self.addCleanup(self.store.close)
+        self.cache = ResponseCache(":memory:")
+        self.addCleanup(self.cache.close)
+        register_provider(LocalProvider(responder=lambda p: "line1\nline2", latency=0.05,
+                                        first_token_latency=0.01), name="slowlocal")
+
+    def test_records_call_and_cache_hit(self):
+        with llm_context(quiz="cloze", user_id=7):
+            get_response("hello", "slowlocal:m", cache=self.cache)
+            get_response("hello", "slowlocal:m", cache=self.cache)
+        first, second = self.store.records()
+        self.assertFalse(first.cache_hit)
+        self.assertGreaterEqual(first.latency, 0.05)
+        self.assertEqual((first.quiz, first.user_id), ("cloze", 7))
+        self.assertGreater(first.response_tokens, 0)
+        self.assertTrue(second.cache_hit)
+        summary = self.store.summary()["slowlocal:m"]
+        self.assertEqual(summary["calls"], 2)
+        self.assertEqual(summary["cache_hit_rate"], 0.5)
+        self.assertGreaterEqual(summary["latency_p50"], 0.05)
+
+    def test_stream_time_to_first_token(self):
+        self.assertEqual("".join(get_response_stream("s", "slowlocal:m", use_cache=False)), "line1\nline2")
+        record = self.store.records()[0]
+        self.assertTrue(record.stream)
+        self.assertLess(record.ttft, record.latency)
+        self.assertEqual(record.response_chars, len("line1\nline2"))
+
+    def test_errors_and_retries(self):
+        policy = CallPolicy(timeout=1, max_attempts=2, base_delay=0, sleep=lambda s: None)
+        provider = LocalProvider()
+        register_provider(provider, name="flaky")
+        with mock.patch.object(provider, "generate", side_effect=[RuntimeError("down"), "ok"]):
+            self.assertEqual(policy.call(get_response, "p", "flaky:m", use_cache=False), "ok")
+        failed, retried = self.store.records()
+        self.assertEqual((failed.attempt, retried.attempt), (0, 1))
+        self.assertIn("RuntimeError", failed.error)
+        summary = self.store.summary()["flaky:m"]
+        self.assertEqual((summary["errors"], summary["retries"]), (1, 1))
+
+    def test_context_follows_worker_threads(self):
+        with llm_context(quiz="four_choice", user_id=3):
+            worker = threading.Thread(target=bind_context(lambda: get_response("t", "slowlocal:m", use_cache=False)))
+        worker.start()
+        worker.join()
+        self.assertEqual(self.store.summary("quiz")["four_choice"]["calls"], 1)
+        self.assertEqual(list(self.store.summary("user_id")), ["3"])
+
+    def test_cloze_quiz_calls_are_tagged(self):
+        words = [{"english": w, "meaning": "뜻"} for w in ["apple", "banana", "cherry"]]
+        with mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                        side_effect=lambda examples: ["번역"] * len(examples)):
+            ClozeQuizModel(words, model="local", use_cache=False, chunk_token_budget=200, user_id=11)
+        records = self.store.records()
+        self.assertGreater(len(records), 1)
+        self.assertTrue(all(r.quiz == "cloze" and r.user_id == 11 for r in records))
+
+    def test_percentiles(self):
+        self.assertEqual(self.store.summary(), {})
+        for i in range(1, 101):
+            self.store.record(_record(latency=i / 100))
+        stats = self.store.summary()["m"]
+        self.assertEqual((stats["latency_p50"], stats["latency_p95"], stats["latency_p99"]), (0.5, 0.95, 0.99))
+
+
+def _record(**fields):
+    base = dict(started_at=0.0, model="m", stream=False, cache_hit=False, latency=0.0, ttft=None,
+                prompt_chars=0, prompt_tokens=0, response_chars=0, response_tokens=0, attempt=0,
+                error=None, quiz=None, user_id=None)
+    base.update(fields)
+    return LLMCallRecord(**base)
+
+
+if __name__ == "__main__":
+    unittest.main()
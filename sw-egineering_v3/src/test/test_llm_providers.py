@@ -0,0 +1,74 @@
+import time
+import unittest
+from LLM import LLMResponse
+from LLM.providers import (LocalProvider, OpenAICompatibleProvider, get_provider, register_provider,
+                           resolve_provider, set_default_provider, template_responder)
+from LLM.response_cache import ResponseCache
+from fake_llm_server import FakeLLMServer
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+class TestProviderSelection(unittest.TestCase):
+    def tearDown(self):
+        set_default_provider(None)
+
+    def test_resolve_by_name_and_prefix(self):
+        self.assertIs(resolve_provider("gemini-2.0-flash")[0], get_provider("gemini"))
+        self.assertEqual(resolve_provider("local:fixture"), (get_provider("local"), "fixture"))
+        self.assertEqual(resolve_provider("openai:llama3"), (get_provider("openai"), "llama3"))
+        self.assertIsNone(resolve_provider("gpt-unknown")[0])
+
+    def test_default_provider(self):
+        set_default_provider("local")
+        self.assertIs(resolve_provider("gemini-2.0-flash")[0], get_provider("local"))
+
+    def test_unsupported_model(self):
+        self.assertIsNone(LLMResponse.get_response("p", "gpt-unknown", use_cache=False))
+
+
+class TestLocalProvider(unittest.TestCase):
+    def test_template_answers_every_word(self):
+        text = template_responder("make quizzes [words]:apple;\nbanana;")
+        lines = text.split("\n")
+        self.assertEqual([line.split(";A:")[1] for line in lines], ["apple", "banana"])
+        self.assertTrue(all("______" in line for line in lines))
+        self.assertEqual(text, template_responder("make quizzes [words]:apple;\nbanana;"))
+
+    def test_fixtures_and_latency(self):
+        provider = LocalProvider(fixtures={"p": "fixed"}, latency=0.05)
+        started = time.perf_counter()
+        self.assertEqual(provider.generate("p", "local"), "fixed")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+    def test_get_response_through_registry(self):
+        register_provider(LocalProvider(fixtures={"p": "from fixture"}), "fixture")
+        cache = ResponseCache(":memory:")
+        self.assertEqual(LLMResponse.get_response("p", "fixture:any", cache=cache), "from fixture")
+        pieces = list(LLMResponse.get_response_stream("p", "fixture:any", use_cache=False))
+        self.assertEqual("".join(pieces), "from fixture")
+        cache.close()
+
+
+class TestOpenAICompatibleProvider(unittest.TestCase):
+    def test_generate_and_stream(self):
+        with FakeLLMServer(lambda prompt: "Q:a;A:b\nQ:c;A:d\n") as server:
+            provider = OpenAICompatibleProvider(server.url + "/v1")
+            text = provider.generate("p", "llama3", "key")
+            pieces = list(provider.stream("p", "llama3", "key"))
+        self.assertEqual(text, "Q:a;A:b\nQ:c;A:d\n")
+        self.assertEqual(list(LLMResponse.iter_lines(pieces)), ["Q:a;A:b", "Q:c;A:d"])
+        self.assertEqual(server.requests[0][1], "/v1/chat/completions")
+        self.assertEqual(server.connection_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
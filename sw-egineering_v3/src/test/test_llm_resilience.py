@@ -0,0 +1,118 @@
+import time
+import unittest
+from LLM.resilience import (
+    CallPolicy, CallTimeout, CircuitBreaker, CircuitOpenError, call_with_timeout, iter_with_timeout
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCallWithTimeout(unittest.TestCase):
+    def test_returns_result(self):
+        self.assertEqual(call_with_timeout(lambda x: x * 2, 1.0, 21), 42)
+
+    def test_gives_up_on_slow_call(self):
+        started = time.perf_counter()
+        with self.assertRaises(CallTimeout):
+            call_with_timeout(time.sleep, 0.05, 2)
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_reraises_error(self):
+        with self.assertRaises(ValueError):
+            call_with_timeout(int, 1.0, "x")
+
+
+class TestIterWithTimeout(unittest.TestCase):
+    def test_yields_every_item(self):
+        self.assertEqual(list(iter_with_timeout(lambda n: iter(range(n)), 1.0, 3)), [0, 1, 2])
+
+    def test_deadline_covers_whole_stream(self):
+        def stalling():
+            yield "first"
+            time.sleep(5)
+            yield "second"
+        received = []
+        started = time.perf_counter()
+        with self.assertRaises(CallTimeout):
+            for item in iter_with_timeout(stalling, 0.2):
+                received.append(item)
+        self.assertEqual(received, ["first"])
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_reraises_error(self):
+        def failing():
+            yield 1
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            list(iter_with_timeout(failing, 1.0))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=self.clock)
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_allows_one_trial(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestCallPolicy(unittest.TestCase):
+    def test_retries_then_succeeds(self):
+        calls, delays = [], []
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("reset")
+            return "ok"
+        policy = CallPolicy(timeout=1, max_attempts=3, base_delay=0.1, sleep=delays.append)
+        self.assertEqual(policy.call(flaky), "ok")
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(all(0 <= d <= 0.2 for d in delays))
+
+    def test_open_breaker_fails_fast(self):
+        calls = []
+        def fail():
+            calls.append(1)
+            raise ConnectionError("down")
+        breaker = CircuitBreaker(failure_threshold=1)
+        policy = CallPolicy(timeout=1, max_attempts=3, breaker=breaker, sleep=lambda s: None)
+        # The first failure opens the breaker, so the retries are not attempted
+        with self.assertRaises(CircuitOpenError):
+            policy.call(fail)
+        with self.assertRaises(CircuitOpenError):
+            policy.call(fail)
+        self.assertEqual(len(calls), 1)
+
+    def test_bounded_time_for_hanging_call(self):
+        policy = CallPolicy(timeout=0.05, max_attempts=2, base_delay=0.01)
+        started = time.perf_counter()
+        with self.assertRaises(CallTimeout):
+            policy.call(time.sleep, 5)
+        self.assertLess(time.perf_counter() - started, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from database.migrations import (
+    MIGRATIONS, Migration, MigrationError, get_schema_version, migrate, pending_migrations
+)
+from database.quiz_db import QuizDB
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.conn = sqlite3.connect(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmpdir.cleanup()
+
+    def test_fresh_database(self):
+        version = migrate(self.conn)
+        self.assertEqual(version, MIGRATIONS[-1].version)
+        self.assertEqual(get_schema_version(self.conn), version)
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for table in ["User", "Word", "WordHistory", "Category", "WordCategory", "quiz", "quiz_question", "GameScore"]:
+            self.assertIn(table, tables)
+        self.assertEqual(pending_migrations(self.conn), [])
+
+    def test_legacy_game_score_is_kept_and_backfilled(self):
+        # GameScoreDB 가 만들던 예전 스키마 (game_type 컬럼 없음)
+        self.conn.execute("CREATE TABLE quiz (quiz_id INTEGER PRIMARY KEY AUTOINCREMENT, quiz_type TEXT NOT NULL, category_id INTEGER)")
+        self.conn.execute("CREATE TABLE GameScore (score_id INTEGER PRIMARY KEY AUTOINCREMENT, quiz_id INTEGER, user_id INTEGER, score INTEGER NOT NULL)")
+        self.conn.execute("INSERT INTO quiz (quiz_type) VALUES ('rain')")
+        self.conn.execute("INSERT INTO GameScore (quiz_id, user_id, score) VALUES (1, 1, 42)")
+        self.conn.commit()
+
+        migrate(self.conn)
+
+        row = self.conn.execute("SELECT quiz_id, game_type, score FROM GameScore").fetchone()
+        self.assertEqual(row, (1, "rain", 42))
+
+    def test_up_to_date_is_noop(self):
+        migrate(self.conn)
+        self.conn.execute("INSERT INTO Word (english, meaning) VALUES ('apple', '사과')")
+        self.conn.commit()
+        migrate(self.conn)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM Word").fetchone()[0], 1)
+
+    def test_word_choseong_backfilled(self):
+        migrate(self.conn, target=5)
+        self.conn.execute("INSERT INTO Word (english, meaning) VALUES ('apple', '사과')")
+        self.conn.commit()
+        migrate(self.conn)
+        self.assertEqual(self.conn.execute("SELECT choseong FROM Word").fetchone()[0], "ㅅㄱ")
+        plan = " ".join(row[-1] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM Word WHERE choseong >= 'ㅅ' AND choseong < 'ㅅ\uffff'"))
+        self.assertIn("idx_word_choseong", plan)
+
+    def test_word_weakness_backfilled(self):
+        migrate(self.conn, target=7)
+        self.conn.execute("INSERT INTO Word (english, meaning) VALUES ('apple', '사과')")
+        self.conn.executemany(
+            "INSERT INTO WordHistory (user_id, word_id, is_correct, study_type) VALUES (1, 1, ?, 'quiz')",
+            [(0,), (0,), (1,)]
+        )
+        self.conn.commit()
+        migrate(self.conn)
+        score, attempts, wrong = self.conn.execute(
+            "SELECT score, attempts, wrong FROM UserWordWeakness WHERE user_id = 1 AND word_id = 1").fetchone()
+        self.assertEqual((attempts, wrong), (3, 2))
+        self.assertAlmostEqual(score, ((0.5 * 0.7 + 0.3) * 0.7 + 0.3) * 0.7)
+
+    def test_failed_migration_rolls_back(self):
+        migrations = [
+            Migration(1, "ok", ("CREATE TABLE a (x INTEGER)",)),
+            Migration(2, "broken", ("CREATE TABLE b (x INTEGER)", "INSERT INTO missing VALUES (1)")),
+        ]
+        with self.assertRaises(MigrationError):
+            migrate(self.conn, migrations)
+        self.assertEqual(get_schema_version(self.conn), 1)
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertIn("a", tables)
+        self.assertNotIn("b", tables)
+
+    def test_initialize_tables_keeps_quizzes(self):
+        db = QuizDB(self.db_path)
+        quiz_id = db.create_quiz("cloze")
+        db.add_quiz_question(quiz_id, "Q", "A")
+        db.initialize_tables()
+        self.assertEqual(len(db.get_quiz(quiz_id)["questions"]), 1)
+        db.close()
+
+    def test_import_does_not_migrate(self):
+        # 싱글톤 생성만으로 저장소의 DB 나 현재 디렉토리의 DB 를 건드리지 않아야 함
+        src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        repo_db = os.path.join(src, "toeic_vocabulary.db")
+        before = os.stat(repo_db).st_size if os.path.exists(repo_db) else None
+        subprocess.run(
+            [sys.executable, "-c",
+             "import database.category_db, database.game_db, database.quiz_db, database.user_db"],
+            cwd=self.tmpdir.name, env=dict(os.environ, PYTHONPATH=src), check=True,
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "toeic_vocabulary.db")))
+        self.assertEqual(os.stat(repo_db).st_size if os.path.exists(repo_db) else None, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
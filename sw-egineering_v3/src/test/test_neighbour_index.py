@@ -0,0 +1,178 @@
+import os
+import random
+import string
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from quiz_generation.distractors import HardDistractorSampler, make_sampler
+from quiz_generation.four_choice_quiz import FourChoiceQuizModel
+from quiz_generation.neighbour_index import NeighbourIndex, edit_distance, ngrams
+
+
+class TestNeighbourIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "test.db")
+        self.index_path = os.path.join(self.tmpdir.name, "index.db")
+        self.quiz_db = QuizDB(self.db_path)
+        self.word_db = WordDB(self.db_path)
+        for english, pos in [("affect", "verb"), ("effect", "noun"), ("adapt", "verb"), ("adopt", "verb"),
+                             ("adept", "adjective"), ("accept", "verb"), ("except", "preposition"),
+                             ("apple", "noun"), ("expect", "verb")]:
+            self.word_db.add_word(english, "뜻", pos, "")
+        self.index = NeighbourIndex(self.index_path, db=self.quiz_db)
+        self.index.build()
+
+    def tearDown(self):
+        self.index.close()
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_nearest_same_part_of_speech(self):
+        self.assertEqual(self.index.nearest("adapt", 1), ["adopt"])
+        self.assertEqual(self.index.nearest("adapt", 3), ["adopt", "accept", "affect"])
+        self.assertEqual(self.index.nearest("adapt", 2, exclude=["adopt"]), ["accept", "affect"])
+
+    def test_other_parts_of_speech_fill_small_bucket(self):
+        # "apple" is the only other noun, the closest verb comes after it
+        self.assertEqual(self.index.nearest("effect", 2), ["apple", "affect"])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        index = NeighbourIndex(":memory:")
+        words = list(dict.fromkeys("".join(rng.choices("abcde", k=rng.randint(3, 7))) for _ in range(250)))
+        for word_id, word in enumerate(words):
+            index.add(word_id, word, "noun")
+        for query in words[:50]:
+            expected = sorted(edit_distance(query, w) for w in words if w != query)[:3]
+            self.assertEqual([edit_distance(query, w) for w in index.nearest(query, 3)], expected)
+        index.close()
+
+    def assert_lists_exact(self, index):
+        # Every stored list holds the nearest words of its bucket (distance, then trigram overlap)
+        for node, entries in index._neighbours.items():
+            if node in index._deleted:
+                continue
+            word, pos = index._english[node], index._node_pos[node]
+            others = [other for other in index._by_english.values() if other != node and index._node_pos[other] == pos]
+            expected = sorted((edit_distance(word, index._english[other]),
+                               -len(ngrams(word) & ngrams(index._english[other])) /
+                               len(ngrams(word) | ngrams(index._english[other])))
+                              for other in others)[:index.stored]
+            self.assertEqual([entry[:2] for entry in entries], expected, word)
+
+    def test_build_and_changes_keep_exact_lists(self):
+        rng = random.Random(7)
+        words = list(dict.fromkeys("".join(rng.choices("abcdefgh", k=rng.randint(3, 8))) for _ in range(150)))
+        for word in words:
+            self.word_db.add_word(word, "뜻", rng.choice(["noun", "verb"]), "")
+        self.index.build()
+        self.assert_lists_exact(self.index)
+
+        rows = self.quiz_db.fetch_all("SELECT word_id FROM Word")
+        for row in rng.sample(rows, 30):
+            self.index.remove(row["word_id"])
+        for i in range(30):
+            self.index.add(1000 + i, "".join(rng.choices("abcdefgh", k=rng.randint(3, 8))), rng.choice(["noun", "verb"]))
+        self.assert_lists_exact(self.index)
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("abc", ""), 3)
+        self.assertEqual(edit_distance("adapt", "adopt"), 1)
+        rng = random.Random(1)
+        for _ in range(300):
+            a = "".join(rng.choices("abc", k=rng.randint(0, 9)))
+            b = "".join(rng.choices("abc", k=rng.randint(0, 9)))
+            # Plain dynamic programming for comparison
+            previous = list(range(len(b) + 1))
+            for i, ca in enumerate(a, 1):
+                current = [i]
+                for j, cb in enumerate(b, 1):
+                    current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+                previous = current
+            self.assertEqual(edit_distance(a, b), previous[-1], (a, b))
+
+    def test_sampler_never_builds_the_index(self):
+        unbuilt = NeighbourIndex(os.path.join(self.tmpdir.name, "unbuilt.db"), db=self.quiz_db)
+        self.addCleanup(unbuilt.close)
+        with mock.patch("quiz_generation.neighbour_index._index", unbuilt):
+            sampler = make_sampler(["adapt", "apple", "effect", "expect"], db=self.quiz_db, hard=True)
+            self.assertNotIsInstance(sampler, HardDistractorSampler)
+            # The shared index is built in the background instead
+            unbuilt._build_thread.join(5)
+            self.assertTrue(unbuilt.ready.is_set())
+            sampler = make_sampler(["adapt", "apple", "effect", "expect"], db=self.quiz_db, hard=True)
+            self.assertIsInstance(sampler, HardDistractorSampler)
+
+    def test_word_changes_do_not_wait_for_build(self):
+        release = threading.Event()
+        quiz_db = self.quiz_db
+
+        class SlowDB:
+            def fetch_all(self, *args):
+                release.wait(5)
+                return quiz_db.fetch_all(*args)
+
+            def fetch_one(self, *args):
+                return quiz_db.fetch_one(*args)
+
+        index = NeighbourIndex(":memory:", db=SlowDB())
+        self.addCleanup(index.close)
+        thread = index.build_in_background()
+        time.sleep(0.05)
+        word_id = self.word_db.add_word("adaptive", "적응하는", "adjective", "")
+        started = time.perf_counter()
+        index._on_word_change("add", word_id)
+        self.assertLess(time.perf_counter() - started, 0.1)
+        release.set()
+        thread.join(5)
+        self.assertIn("adaptive", index)
+        self.assertEqual(len(index), 10)
+
+    def test_persisted_and_updated_incrementally(self):
+        self.index.attach()
+        word_id = self.word_db.add_word("adoption", "입양", "verb", "")
+        self.assertIn("adoption", self.index)
+        self.word_db.update_word(word_id, "adaption", "적응", "verb", "")
+        self.assertNotIn("adoption", self.index)
+        self.assertEqual(self.index.nearest("adaption", 1), ["adapt"])
+        self.index.close()
+
+        reopened = NeighbourIndex(self.index_path, db=self.quiz_db)
+        self.addCleanup(reopened.close)
+        self.assertIn("adaption", reopened)
+        self.assertNotIn("adoption", reopened)
+        self.assertEqual(len(reopened), 10)
+        self.assertIn("adaption", reopened.nearest("adapt", 2))
+
+    def test_lookup_reads_stored_neighbours(self):
+        rng = random.Random(5)
+        index = NeighbourIndex(":memory:")
+        words = list(dict.fromkeys("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+                                   for _ in range(300)))
+        for word_id, word in enumerate(words):
+            index.add(word_id, word, "noun")
+        started = time.perf_counter()
+        for query in words:
+            index.nearest(query, 3)
+        self.assertLess((time.perf_counter() - started) / len(words), 0.001)
+        index.close()
+
+    def test_four_choice_hard_distractors(self):
+        sampler = HardDistractorSampler(["adapt", "apple", "effect", "expect"], self.index)
+        model = FourChoiceQuizModel([{"english": "adapt", "meaning": "적응하다"}], distractors=sampler)
+        choices = model.get()[0][1].split(",")
+        self.assertEqual(choices[0], "adapt")
+        self.assertEqual(choices[1], "adopt")
+        self.assertEqual(len(set(choices)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+from LLM.prompt_planner import PromptPlanner
+from LLM.response_cache import ResponseCache
+from LLM.tokens import estimate_tokens
+from quiz_generation.cloze_quiz import ClozeQuizModel
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+class TestPromptPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = PromptPlanner("Make quizzes [words]:", token_budget=40, output_tokens_per_item=5)
+
+    def test_prompts_fit_budget(self):
+        words = [f"word{i}" for i in range(30)]
+        plan = self.planner.plan(words)
+        self.assertGreater(len(plan.prompts), 1)
+        self.assertEqual([w for p in plan.prompts for w in p.items], words)
+        for planned in plan.prompts:
+            self.assertLessEqual(planned.tokens + 5 * len(planned.items), 40)
+            self.assertEqual(planned.tokens, estimate_tokens(planned.prompt))
+        self.assertEqual(plan.total_tokens, sum(p.tokens for p in plan.prompts))
+
+    def test_drops_cached_and_duplicate_items(self):
+        plan = self.planner.plan(["a", "b", "a", "c"], is_cached={"b"}.__contains__)
+        self.assertEqual(plan.cached, ["b"])
+        self.assertEqual([w for p in plan.prompts for w in p.items], ["a", "c"])
+
+    def test_oversized_item_gets_own_prompt(self):
+        plan = self.planner.plan(["x" * 400, "y"])
+        self.assertEqual([p.items for p in plan.prompts], [["x" * 400], ["y"]])
+
+    def test_max_items(self):
+        planner = PromptPlanner("p:", token_budget=1000, max_items=2)
+        self.assertEqual([p.items for p in planner.plan(["a", "b", "c"]).prompts], [["a", "b"], ["c"]])
+
+
+class TestClozeQuestionCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(":memory:")
+        self.addCleanup(self.cache.close)
+
+    def test_only_uncached_words_are_sent(self):
+        first = [{"english": w, "meaning": "뜻"} for w in ["apple", "banana"]]
+        second = [{"english": w, "meaning": "뜻"} for w in ["banana", "cherry", "apple"]]
+        ClozeQuizModel(first, model="local", cache=self.cache)
+        with mock.patch("quiz_generation.cloze_quiz.get_response",
+                        side_effect=lambda prompt, *a, **k: "Q:A ______ pie;A:cherry") as llm:
+            model = ClozeQuizModel(second, model="local", cache=self.cache)
+        self.assertEqual(llm.call_count, 1)
+        self.assertNotIn("apple", llm.call_args[0][0])
+        self.assertIn("cherry", llm.call_args[0][0])
+        self.assertEqual([pair[1] for pair in model.get()], ["banana", "cherry", "apple"])
+        self.assertEqual(len(model.token_usage), 1)
+        self.assertEqual(model.token_usage[0]["words"], 1)
+        self.assertGreater(model.token_usage[0]["prompt_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
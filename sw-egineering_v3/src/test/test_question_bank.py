@@ -0,0 +1,107 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from LLM.response_cache import ResponseCache
+from quiz_generation.question_bank import QuestionBank
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+class TestQuestionBank(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db = QuizDB(path)
+        self.word_db = WordDB(path)
+        self.word_ids = [
+            self.word_db.add_word(english, meaning, "noun", f"I bought {english}s today.")
+            for english, meaning in [("apple", "사과"), ("banana", "바나나"), ("cherry", "체리"), ("grape", "포도")]
+        ]
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(":memory:")
+        self.bank = QuestionBank(self.quiz_db, model="local", cache=self.cache)
+
+    def tearDown(self):
+        self.bank.shutdown()
+        self.cache.close()
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_refresh_all_types(self):
+        counts = self.bank.refresh_all()
+        self.assertEqual(set(counts.values()), {4})
+        # Cloze questions are cached in the bank's cache, not the on-disk one
+        self.assertEqual(self.cache.stats()["entries"], 4)
+        for quiz_type in ["cloze", "four_choice", "short_answer_ek", "short_answer_ke"]:
+            self.assertEqual(len(self.bank.get_pairs(quiz_type)), 4)
+        question, choices, _ = self.bank.get_pairs("four_choice")[0]
+        self.assertEqual(len(choices.split(",")), 4)
+        # Nothing to generate once the banks are full
+        self.assertEqual(set(self.bank.refresh_all().values()), {0})
+
+    def test_cloze_rows_keep_their_word(self):
+        # Answers that do not spell the word (irregular forms) still go to the word they were made for
+        generated = lambda words: {word: (f"Yesterday I ___ the {word}.", "ate") for word in words}
+        with mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._cached_pairs", return_value={}), \
+                mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._generate_chunk", side_effect=generated):
+            self.assertEqual(self.bank.refresh("cloze"), 4)
+        rows = self.quiz_db.fetch_all("SELECT question, word_id FROM quiz_question")
+        self.assertEqual({row["word_id"]: row["question"] for row in rows},
+                         {word_id: f"Yesterday I ___ the {english}."
+                          for word_id, english in zip(self.word_ids, ["apple", "banana", "cherry", "grape"])})
+
+    def test_updated_word_is_regenerated(self):
+        self.bank.refresh("short_answer_ke")
+        self.word_db.update_word(self.word_ids[0], "apricot", "살구", "noun", "An apricot is orange.")
+        answers = [answer for _, answer, _ in self.bank.get_pairs("short_answer_ke")]
+        self.assertNotIn("apple", answers)
+        self.assertEqual(len(answers), 3)
+
+        self.assertEqual(self.bank.refresh("short_answer_ke"), 1)
+        answers = [answer for _, answer, _ in self.bank.get_pairs("short_answer_ke")]
+        self.assertEqual(sorted(answers), ["apricot", "banana", "cherry", "grape"])
+        stale = self.quiz_db.fetch_one("SELECT COUNT(*) AS n FROM quiz_question WHERE stale = 1")
+        self.assertEqual(stale["n"], 0)
+
+    def test_pairs_snapshot_is_invalidated(self):
+        self.assertEqual(len(self.bank.get_pairs("short_answer_ke")), 0)
+        self.bank.refresh("short_answer_ke")
+        self.assertEqual(len(self.bank.get_pairs("short_answer_ke", limit=2)), 2)
+        data = self.bank.snapshot("short_answer_ke")
+        self.assertIs(self.bank.snapshot("short_answer_ke"), data)
+
+        self.word_db.delete_word(self.word_ids[1])
+        answers = [answer for _, answer, _ in self.bank.get_pairs("short_answer_ke")]
+        self.assertEqual(sorted(answers), ["apple", "cherry", "grape"])
+
+    def test_background_refresh(self):
+        future = self.bank.start_background(["short_answer_ek"])
+        self.assertEqual(future.result(timeout=10), {("short_answer_ek", None): 4})
+
+    def test_ready_read_uses_index(self):
+        plan = self.quiz_db.fetch_all(
+            "EXPLAIN QUERY PLAN SELECT qq.* FROM quiz q "
+            "JOIN quiz_question qq ON qq.quiz_id = q.quiz_id AND qq.stale = 0 "
+            "WHERE q.quiz_type = ? AND q.category_id IS ?", ("cloze", None))
+        details = " ".join(row["detail"] for row in plan)
+        self.assertIn("idx_quiz_question_bank", details)
+        self.assertNotIn("SCAN qq", details)
+
+
+if __name__ == "__main__":
+    unittest.main()
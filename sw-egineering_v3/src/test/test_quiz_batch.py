@@ -0,0 +1,61 @@
+import unittest
+from quiz_generation.quiz_batch import QuizBatch
+from quiz_generation.rain_quiz import RainQuizModel
+
+
+class TestQuizBatch(unittest.TestCase):
+    def setUp(self):
+        self.pairs = [
+            ("다음의 뜻을 가진 단어는? 뜻: 사과", "apple,banana,cherry,grape", "hint"),
+            ("다음의 뜻을 가진 단어는? 뜻: 바나나", "banana,apple,cherry,grape", "hint"),
+            ("이 단어의 뜻이 무엇인가요: cherry", "체리", None),
+        ]
+        self.batch = QuizBatch.from_pairs(self.pairs)
+
+    def test_sequence_contract(self):
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch[0], self.pairs[0])
+        self.assertEqual(self.batch[-1], self.pairs[-1])
+        self.assertEqual(list(self.batch), self.pairs)
+        self.assertEqual(self.batch, self.pairs)
+        self.assertIn(self.pairs[1], self.batch)
+        with self.assertRaises(IndexError):
+            self.batch[3]
+        question, answer, hint = self.batch[1]
+        self.assertEqual(answer.split(",")[0], "banana")
+
+    def test_slicing(self):
+        self.assertEqual(self.batch[1:], self.pairs[1:])
+        self.assertEqual(self.batch[::2], self.pairs[::2])
+        self.assertEqual(len(self.batch[5:]), 0)
+
+    def test_strings_are_stored_once(self):
+        batch = QuizBatch.from_pairs((f"q{i}", "same answer", "hint") for i in range(1000))
+        self.assertEqual(len(batch._offsets) - 1, 1002)
+        self.assertEqual(len(batch._text), sum(len(f"q{i}") for i in range(1000)) + len("same answer") + 4)
+
+    def test_round_trip(self):
+        for compress in (True, False):
+            data = self.batch.to_bytes(compress)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(QuizBatch.from_bytes(data), self.pairs)
+        self.assertEqual(QuizBatch.from_bytes(QuizBatch().to_bytes()), [])
+
+    def test_rejects_foreign_or_broken_data(self):
+        data = self.batch.to_bytes(compress=False)
+        for bad in (b"", b"junk" * 10, data[:-3], data[:20]):
+            with self.assertRaises(ValueError):
+                QuizBatch.from_bytes(bad)
+
+    def test_rejects_bad_pairs(self):
+        with self.assertRaises(ValueError):
+            QuizBatch.from_pairs([("question", "answer")])
+
+    def test_quiz_model_get(self):
+        model = RainQuizModel([{"english": "apple", "meaning": "사과"}])
+        self.assertIsInstance(model.get(), QuizBatch)
+        self.assertEqual(model.get()[0], ("apple", "사과", "hint"))
+
+
+if __name__ == "__main__":
+    unittest.main()
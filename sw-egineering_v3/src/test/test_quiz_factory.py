@@ -0,0 +1,129 @@
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+from quiz_generation.base_quiz_gen_class import BaseQuizModel
+from quiz_generation.factory import (QUIZ_TYPES, QuizJob, QuizRecipe, create_quiz, generate_many, load_recipe,
+                                     make_recipe, pack_words, quiz_from_recipe, register_quiz, save_recipe,
+                                     unpack_words)
+from quiz_generation.four_choice_quiz import FourChoiceQuizModel
+from quiz_generation.quiz_batch import QuizBatch
+
+
+WORDS = [{"word_id": i, "english": english, "meaning": meaning}
+         for i, (english, meaning) in enumerate([("apple", "사과"), ("banana", "바나나"), ("cherry", "체리"),
+                                                 ("grape", "포도"), ("lemon", "레몬"), ("melon", "멜론")])]
+
+
+class ThreadNameQuiz(BaseQuizModel):
+    # Records where it was generated
+    def _iter_pairs(self, rows):
+        for row in rows:
+            yield (row["english"], threading.current_thread().name, "hint")
+
+
+class TestQuizFactory(unittest.TestCase):
+    def test_registry(self):
+        self.assertTrue({"cloze", "four_choice", "short_answer_ek", "short_answer_ke", "rain"} <= set(QUIZ_TYPES))
+        self.assertTrue(QUIZ_TYPES["cloze"].io_bound)
+        self.assertIsInstance(create_quiz("four_choice", WORDS), FourChoiceQuizModel)
+        with self.assertRaises(ValueError):
+            create_quiz("crossword", WORDS)
+
+    def test_seed_makes_choices_repeatable(self):
+        first = create_quiz("four_choice", WORDS, seed=7).get()
+        self.assertEqual(create_quiz("four_choice", WORDS, seed=7).get(), first)
+
+    def test_word_pack(self):
+        pack = pack_words(WORDS)
+        self.assertIsInstance(pack[0], tuple)
+        self.assertEqual(unpack_words(pickle.loads(pickle.dumps(pack)))[1]["english"], "banana")
+        self.assertIsNone(unpack_words(pack)[0]["choseong"])
+
+    def test_generate_many_in_processes(self):
+        pack = pack_words(WORDS)
+        jobs = [QuizJob((quiz_type, 1), quiz_type, pack, seed=3)
+                for quiz_type in ("four_choice", "short_answer_ek", "short_answer_ke", "rain")]
+        results = generate_many(jobs, processes=2)
+        self.assertEqual(set(results), {job.key for job in jobs})
+        for job in jobs:
+            self.assertIsInstance(results[job.key], QuizBatch)
+            expected = create_quiz(job.quiz_type, WORDS, seed=3).get()
+            self.assertEqual(results[job.key], expected)
+
+    def test_io_bound_jobs_run_on_threads(self):
+        register_quiz("thread_name", ThreadNameQuiz, io_bound=True)
+        self.addCleanup(QUIZ_TYPES.pop, "thread_name")
+        jobs = [QuizJob("io", "thread_name", pack_words(WORDS[:1])),
+                QuizJob("bad", "four_choice", ((1, None, None, None, None, None),))]
+        results = generate_many(jobs, processes=0)
+        self.assertTrue(results["io"][0][1].startswith("quiz-factory"))
+        # A failed job is left out
+        self.assertNotIn("bad", results)
+
+    def test_unknown_type_is_rejected_before_running(self):
+        with self.assertRaises(ValueError):
+            generate_many([QuizJob("x", "crossword", ())])
+
+
+class TestQuizRecipe(unittest.TestCase):
+    def setUp(self):
+        from database.quiz_db import QuizDB
+        from database.word_db import WordDB
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db, self.word_db = QuizDB(path), WordDB(path)
+        self.word_ids = [self.word_db.add_word(word["english"], word["meaning"], "noun", "") for word in WORDS]
+
+    def tearDown(self):
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_quiz_is_rebuilt_from_recipe(self):
+        words = self.quiz_db.get_words_by_ids(self.word_ids[::-1])
+        self.assertEqual([word["english"] for word in words], [word["english"] for word in WORDS[::-1]])
+        recipe = make_recipe("four_choice", words)
+        pairs = create_quiz("four_choice", words, recipe.seed).get()
+
+        quiz_id = save_recipe(recipe, self.quiz_db)
+        loaded = load_recipe(quiz_id, self.quiz_db)
+        self.assertEqual(loaded, recipe)
+        self.assertEqual(quiz_from_recipe(loaded, self.quiz_db).get(), pairs)
+        # Nothing but the recipe is stored
+        stored = self.quiz_db.fetch_one("SELECT COUNT(*) AS n FROM quiz_question WHERE quiz_id = ?", (quiz_id,))
+        self.assertEqual(stored["n"], 0)
+
+    def test_deleted_word_cannot_be_rebuilt(self):
+        recipe = QuizRecipe("short_answer_ek", tuple(self.word_ids[:2]), 1)
+        self.word_db.delete_word(self.word_ids[0])
+        with self.assertRaises(ValueError):
+            quiz_from_recipe(recipe, self.quiz_db)
+
+    def test_quiz_without_recipe(self):
+        quiz_id = self.quiz_db.create_quiz("cloze")
+        self.assertIsNone(load_recipe(quiz_id, self.quiz_db))
+
+
+class TestQuestionBankProcesses(unittest.TestCase):
+    def test_refresh_all_in_processes(self):
+        from database.quiz_db import QuizDB
+        from database.word_db import WordDB
+        from quiz_generation.question_bank import QuestionBank
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "test.db")
+            quiz_db, word_db = QuizDB(path), WordDB(path)
+            for word in WORDS:
+                word_db.add_word(word["english"], word["meaning"], "noun", "")
+            bank = QuestionBank(quiz_db, processes=2)
+            counts = bank.refresh_all(["four_choice", "short_answer_ek", "short_answer_ke"])
+            self.assertEqual(set(counts.values()), {len(WORDS)})
+            self.assertEqual(bank.get_pairs("short_answer_ek")[0][2], "ㅅㄱ")
+            bank.shutdown()
+            word_db.close()
+            quiz_db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
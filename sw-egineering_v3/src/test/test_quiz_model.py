@@ -1,43 +1,26 @@
 import unittest
+import itertools
 import pandas as pd
 from quiz_generation.base_quiz_gen_class import BaseQuizModel
+from quiz_generation.rain_quiz import RainQuizModel
 
 class TestQuizModel(BaseQuizModel):
     def __init__(self, db, APIKEY):
-        self.__parsed_db: pd.DataFrame = self._parse_db(db)
-        self.__pairs = self._create_pairs(self.__parsed_db, APIKEY)
+        super().__init__(self._parse_db(db), APIKEY)
+        self.generated = 0
 
     def _parse_db(self, db):
         # 실제로는 db 를 parsing 하지만, demo 이므로 간단히 구현
         data = [{"Word": "hello", "Meaning": "안녕", "Multiplicity":1},
                 {"Word": "world", "Meaning": "세계", "Multiplicity":5}]
-        return pd.DataFrame(data)
+        return pd.DataFrame(data).to_dict("records")
 
-    def _create_pairs(self, parsed_db: pd.DataFrame, APIKEY):
+    def _iter_pairs(self, rows):
         question_template = "다음 의미를 가지는 단어의 뜻은?: {0}"
         default_hint = "Hint"
-        return [(question_template.format(row[0]), row[1], default_hint) for row in parsed_db.itertuples(index=False, name=None)]
-
-    def get(self):
-        """
-        Returns every (Question, Answer, Hint) pairs
-
-        Returns:
-            List[Tuple[str,str,str]]: List of (Question, Answer, Hint)
-        """
-        return self.__pairs
-    
-    def __iter__(self):
-        self.__index = 0
-        return self
-
-    def __next__(self):
-        if self.__index >= len(self.__pairs):
-            raise StopIteration
-        
-        result = self.__pairs[self.__index]
-        self.__index += 1
-        return result
+        for row in rows:
+            self.generated += 1
+            yield (question_template.format(row["Word"]), row["Meaning"], default_hint)
 
 class TestQuizModelFunctionality(unittest.TestCase):
     def setUp(self):
@@ -50,6 +33,9 @@ class TestQuizModelFunctionality(unittest.TestCase):
         self.assertEqual(pairs[0][0], "다음 의미를 가지는 단어의 뜻은?: hello")
         self.assertEqual(pairs[0][1], "안녕")
         self.assertEqual(pairs[0][2], "Hint")
+        # Pairs are built once
+        self.assertIs(self.quiz_model.get(), pairs)
+        self.assertEqual(self.quiz_model.generated, 2)
 
     def test_iteration(self):
         expected_pairs = [
@@ -58,19 +44,37 @@ class TestQuizModelFunctionality(unittest.TestCase):
         ]
         
         # Test iteration
-        for i, pair in enumerate(self.quiz_model):
+        iterator = iter(self.quiz_model)
+        for i, pair in enumerate(iterator):
             self.assertEqual(pair, expected_pairs[i])
         
         # Test that iteration is exhausted
         with self.assertRaises(StopIteration):
-            next(self.quiz_model)
+            next(iterator)
+
+    def test_independent_iterators(self):
+        first, second = iter(self.quiz_model), iter(self.quiz_model)
+        self.assertEqual(next(first)[1], "안녕")
+        self.assertEqual([pair[1] for pair in second], ["안녕", "세계"])
+        self.assertEqual(next(first)[1], "세계")
+
+    def test_lazy_generation(self):
+        iterator = iter(self.quiz_model)
+        self.assertEqual(self.quiz_model.generated, 0)
+        next(iterator)
+        self.assertEqual(self.quiz_model.generated, 1)
+
+    def test_endless_word_stream(self):
+        words = ({"english": f"word{i}", "meaning": f"뜻{i}"} for i in itertools.count())
+        model = RainQuizModel(words)
+        self.assertEqual([q for q, _, _ in itertools.islice(model, 3)], ["word0", "word1", "word2"])
 
     def test_parsed_db(self):
-        parsed_db = self.quiz_model._parse_db(self.db)
+        parsed_db = pd.DataFrame(self.quiz_model._parse_db(self.db))
         self.assertIsInstance(parsed_db, pd.DataFrame)
         self.assertEqual(len(parsed_db), 2)
         self.assertEqual(parsed_db.iloc[0]["Word"], "hello")
         self.assertEqual(parsed_db.iloc[0]["Meaning"], "안녕")
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from database.category_db import CategoryDB
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from quiz_generation.rain_feed import RainWordFeed, rain_level
+from quiz_generation.word_sampler import word_sampler_cache
+
+
+class TestRainLevel(unittest.TestCase):
+    def test_ramps_up_and_stops(self):
+        levels = [rain_level(score) for score in range(0, 80, 5)]
+        for easier, harder in zip(levels, levels[1:]):
+            self.assertLessEqual(harder.spawn_ms, easier.spawn_ms)
+            self.assertGreaterEqual(harder.fall_step, easier.fall_step)
+            self.assertGreaterEqual(harder.rarity, easier.rarity)
+        self.assertEqual(rain_level(0).rarity, 0.0)
+        self.assertEqual(rain_level(50), rain_level(500))
+        self.assertEqual(rain_level(500).rarity, 1.0)
+
+
+class TestRainWordFeed(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db = QuizDB(path)
+        self.word_db = WordDB(path)
+        self.category_db = CategoryDB(path)
+        self.word_ids = [self.word_db.add_word(f"word{i}", f"뜻{i}", "noun", "") for i in range(6)]
+        self.category_id = self.category_db.create_category(1, "rain")
+        for word_id in self.word_ids[:3]:
+            self.category_db.add_word_to_category(self.category_id, word_id)
+        word_sampler_cache.clear()
+        self.feeds = []
+
+    def tearDown(self):
+        for feed in self.feeds:
+            feed.close()
+        word_sampler_cache.clear()
+        self.category_db.close()
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def feed(self, **options):
+        feed = RainWordFeed(db=self.quiz_db, rng=random.Random(3), **options)
+        self.feeds.append(feed)
+        return feed
+
+    def take(self, feed, count):
+        return [feed.next_word(timeout=5) for _ in range(count)]
+
+    def test_endless_words_of_the_category(self):
+        feed = self.feed(category_id=self.category_id, batch_size=2)
+        pairs = self.take(feed, 20)
+        self.assertEqual({pair[0] for pair in pairs}, {"word0", "word1", "word2"})
+        self.assertEqual(pairs[0][1], "뜻" + pairs[0][0][4:])
+
+    def test_fallback_when_no_words(self):
+        empty = self.category_db.create_category(1, "empty")
+        feed = self.feed(category_id=empty, fallback=[{"english": "rain", "meaning": "비"}])
+        self.assertEqual(self.take(feed, 3), [("rain", "비", "hint")] * 3)
+
+    def test_rarer_words_at_full_rarity(self):
+        for _ in range(20):
+            self.quiz_db.record_quiz_result(1, self.word_ids[4], False)
+        feed = self.feed(batch_size=1, prefetch=1)
+        feed.set_rarity(1.0)
+        # Words drawn before the change are still queued
+        pairs = self.take(feed, 40)[5:]
+        # Recently drawn words wait two draws, so at most every third word
+        self.assertGreater(sum(pair[0] == "word4" for pair in pairs), len(pairs) // 4)
+
+    def test_next_word_does_not_wait_on_the_database(self):
+        release = threading.Event()
+
+        class SlowDB:
+            db_path = db_key = "slow"
+
+            def get_sampling_words(self, user_id, category_id):
+                release.wait(5)
+                return [{"word_id": 1, "english": "slow", "meaning": "느린", "wrong_count": 0, "weakness": None}]
+
+        feed = RainWordFeed(db=SlowDB())
+        self.feeds.append(feed)
+        start = time.perf_counter()
+        self.assertIsNone(feed.next_word())
+        self.assertLess(time.perf_counter() - start, 0.1)
+        release.set()
+        self.assertEqual(feed.next_word(timeout=5), ("slow", "느린", "hint"))
+
+
+if __name__ == "__main__":
+    unittest.main()
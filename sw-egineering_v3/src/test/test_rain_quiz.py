@@ -6,10 +6,10 @@ class TestRainQuizModel(unittest.TestCase):
     def setUp(self):
         # Sample data for testing
         data = {
-            "word": ["apple", "banana"],
+            "english": ["apple", "banana"],
             "meaning": ["사과", "바나나"]
         }
-        self.db = pd.DataFrame(data)
+        self.db = pd.DataFrame(data).to_dict("records")
         self.model = RainQuizModel(self.db)
 
     def test_pairs_creation(self):
@@ -23,11 +23,12 @@ class TestRainQuizModel(unittest.TestCase):
             ("banana", "바나나", "hint")
         ]
         
-        for i, pair in enumerate(self.model):
+        iterator = iter(self.model)
+        for i, pair in enumerate(iterator):
             self.assertEqual(pair, expected_pairs[i])
         
         with self.assertRaises(StopIteration):
-            next(self.model)
+            next(iterator)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+from concurrent.futures import Future
+import unittest
+from unittest import mock
+from LLM.providers import OpenAICompatibleProvider, get_provider
+from LLM.structured import JsonItemParser, iter_json_items, parse_stats
+from quiz_generation.cloze_quiz import CLOZE_SCHEMA, ClozeQuizModel
+from fake_llm_server import FakeLLMServer
+from LLM.instrumentation import MetricsStore, set_metrics_store
+
+
+def setUpModule():
+    # LLM calls made here are recorded to memory, never to the real llm_metrics.db
+    set_metrics_store(MetricsStore(":memory:"))
+
+
+def tearDownModule():
+    set_metrics_store(None)
+
+
+def translated(examples):
+    # Streamed hints are submitted to the translator, answer with a finished Future
+    future = Future()
+    future.set_result(["번역"] * len(examples))
+    return future
+
+
+class TestJsonItemParser(unittest.TestCase):
+    def test_items_complete_while_streaming(self):
+        parser = JsonItemParser()
+        self.assertEqual(parser.feed('```json\n[{"word": "a", "question": "x ] } \\" y"'), [])
+        self.assertEqual(parser.feed('}, {"word": '), ['{"word": "a", "question": "x ] } \\" y"}'])
+        self.assertEqual(parser.feed('"b"}]\n```'), ['{"word": "b"}'])
+
+    def test_bad_item_does_not_break_others(self):
+        items = list(iter_json_items(['{"items": [{"word": "a"}, {"word": }, {"word": "c", "tags": [1, {"k": 2}]}]}']))
+        self.assertEqual([item for item, _ in items], [{"word": "a"}, None, {"word": "c", "tags": [1, {"k": 2}]}])
+
+    def test_truncated_item_is_not_emitted(self):
+        self.assertEqual(len(list(iter_json_items(['[{"word": "a"}, {"word": "b", "quest']))), 1)
+
+
+class TestStructuredCloze(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__translate_examples",
+                             side_effect=lambda examples: ["번역"] * len(examples))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("quiz_generation.cloze_quiz.ClozeQuizModel._ClozeQuizModel__submit_examples",
+                             side_effect=translated)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.words = [{"english": w, "meaning": "뜻"} for w in ["apple", "banana", "cherry"]]
+        parse_stats.reset()
+
+    def test_local_provider_json_mode(self):
+        for stream in (False, True):
+            model = ClozeQuizModel(self.words, model="local", use_cache=False, structured=True, stream=stream)
+            self.assertEqual(sorted(pair[1] for pair in model.get()), ["apple", "banana", "cherry"])
+        self.assertEqual(parse_stats.failure_rate("local"), 0.0)
+
+    def test_only_bad_items_are_retried(self):
+        prompts = []
+        def llm(prompt, *args, **kwargs):
+            prompts.append(prompt)
+            self.assertEqual(kwargs["response_schema"], CLOZE_SCHEMA)
+            if len(prompts) == 1:
+                return json.dumps([
+                    {"word": "apple", "question": "An ______ a day", "answer": "apple"},
+                    {"word": "banana", "question": "no blank here", "answer": "banana"},
+                    {"word": "cherry", "question": "A ______ pie", "answer": "cherry"},
+                ])
+            return '[{"word": "banana", "question": "A ______ split", "answer": "banana"}]'
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=llm):
+            model = ClozeQuizModel(self.words, model="json-test", use_cache=False, structured=True)
+        self.assertEqual([pair[1] for pair in model.get()], ["apple", "banana", "cherry"])
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("banana", prompts[1].split("[words]:")[1])
+        self.assertNotIn("apple", prompts[1].split("[words]:")[1])
+        self.assertAlmostEqual(parse_stats.failure_rate("json-test"), 0.25)
+
+    def test_tolerant_line_format(self):
+        reply = "1. Q: An ______ a day ; A: apple\nQ:A ______ split;A:banana\nQ:A ______ pie;A:cherry"
+        with mock.patch("quiz_generation.cloze_quiz.get_response", return_value=reply) as llm:
+            model = ClozeQuizModel(self.words, model="line-test", use_cache=False)
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(model.get()[0][:2], ("An ______ a day", "apple"))
+        self.assertEqual(parse_stats.snapshot()["line-test"]["failed"], 0)
+
+
+class TestProviderStructuredConfig(unittest.TestCase):
+    def test_gemini_and_openai_configs(self):
+        self.assertEqual(get_provider("gemini").structured_config(CLOZE_SCHEMA)["response_json_schema"], CLOZE_SCHEMA)
+        config = OpenAICompatibleProvider().structured_config(CLOZE_SCHEMA)
+        self.assertEqual(config["response_format"]["json_schema"]["schema"], CLOZE_SCHEMA)
+
+    def test_openai_request_carries_schema(self):
+        bodies = []
+        def responder(prompt):
+            return '[{"word": "a", "question": "______", "answer": "a"}]'
+        with FakeLLMServer(responder) as server:
+            provider = OpenAICompatibleProvider(server.url + "/v1")
+            original = provider._body
+            def recording_body(*args):
+                bodies.append(original(*args))
+                return bodies[-1]
+            provider._body = recording_body
+            text = provider.generate("p", "llama3", None, provider.structured_config(CLOZE_SCHEMA))
+        self.assertEqual(json.loads(text)[0]["word"], "a")
+        self.assertEqual(bodies[0]["response_format"]["type"], "json_schema")
+
+
+if __name__ == "__main__":
+    unittest.main()
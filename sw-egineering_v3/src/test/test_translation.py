@@ -0,0 +1,118 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from quiz_generation.cloze_quiz import ClozeQuizModel
+from translation.backends import OfflineBackend
+from translation.cache import TranslationCache
+from translation.translator import BatchTranslator
+
+
+class SlowBackend(OfflineBackend):
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.started_at = []
+
+    async def translate(self, texts, src, dest):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.started_at.append(time.perf_counter())
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return await super().translate(texts, src, dest)
+
+
+class TestBatchTranslator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = TranslationCache(os.path.join(self.tmpdir.name, "translation.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_dedup_and_persistent_cache(self):
+        backend = OfflineBackend({"hello": "안녕", "bye": "잘가"})
+        translator = BatchTranslator(backend, self.cache)
+        self.assertEqual(translator.translate(["hello", "bye", "hello"]), ["안녕", "잘가", "안녕"])
+        self.assertEqual(backend.calls, [["hello", "bye"]])
+        translator.close()
+
+        # A new translator over the same cache file sends nothing
+        reopened = TranslationCache(self.cache.path)
+        other = OfflineBackend()
+        self.assertEqual(BatchTranslator(other, reopened).translate(["bye"]), ["잘가"])
+        self.assertEqual(other.calls, [])
+        reopened.close()
+
+    def test_batches_respect_concurrency_cap(self):
+        backend = SlowBackend()
+        translator = BatchTranslator(backend, batch_size=2, max_concurrency=3)
+        texts = [f"sentence {i}" for i in range(20)]
+        self.assertEqual(translator.translate(texts), texts)
+        self.assertEqual(len(backend.calls), 10)
+        self.assertEqual(backend.peak, 3)
+        translator.close()
+
+    def test_works_inside_running_loop(self):
+        translator = BatchTranslator(OfflineBackend({"a": "가"}))
+        async def caller():
+            return translator.translate(["a"])
+        self.assertEqual(asyncio.run(caller()), ["가"])
+        translator.close()
+
+
+class TestClozeTranslationOverlap(unittest.TestCase):
+    def test_first_chunk_translated_while_others_generate(self):
+        words = [{"english": f"word{i}", "meaning": "뜻"} for i in range(40)]
+        backend = SlowBackend(delay=0)
+        last_generated = []
+        lock = threading.Lock()
+
+        def slow_llm(prompt, *args, **kwargs):
+            chunk = [w.strip() for w in prompt.split("[words]:")[1].split(";") if w.strip()]
+            time.sleep(0.1 * (1 + int(chunk[0][4:]) // 10))
+            with lock:
+                last_generated.append(time.perf_counter())
+            return "\n".join(f"Q:I like the ______;A:{w}" for w in chunk)
+
+        translator = BatchTranslator(backend)
+        with mock.patch("quiz_generation.cloze_quiz.get_response", side_effect=slow_llm):
+            model = ClozeQuizModel(words, use_cache=False, chunk_token_budget=450, max_concurrency=8,
+                                   translator=translator)
+        self.assertEqual(len(model.get()), 40)
+        self.assertGreater(len(backend.calls), 1)
+        self.assertLess(min(backend.started_at), max(last_generated))
+        translator.close()
+
+    def test_streamed_questions_are_translated_in_batches(self):
+        words = [{"english": f"word{i}", "meaning": "뜻"} for i in range(12)]
+        backend = SlowBackend(delay=0.05)
+
+        def slow_stream(prompt, *args, **kwargs):
+            chunk = [w.strip() for w in prompt.split("[words]:")[1].split(";") if w.strip()]
+            for w in chunk:
+                time.sleep(0.01)
+                yield f"Q:I like the ______ {w};A:{w}\n"
+
+        translator = BatchTranslator(backend)
+        with mock.patch("quiz_generation.cloze_quiz.get_response_stream", side_effect=slow_stream):
+            model = ClozeQuizModel(words, use_cache=False, stream=True, translator=translator)
+            pairs = model.get()
+        self.assertEqual(sorted(pair[1] for pair in pairs), sorted(w["english"] for w in words))
+        # OfflineBackend returns the question itself as its hint
+        self.assertTrue(all(hint == question for question, _, hint in pairs))
+        # Not one round trip per question: questions parsed during a translation go out together
+        self.assertLess(len(backend.calls), len(words))
+        self.assertEqual(sum(len(call) for call in backend.calls), len(words))
+        translator.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from database.category_db import CategoryDB
+from database.quiz_db import QuizDB
+from database.word_db import WordDB
+from quiz_generation.word_sampler import AliasTable, FenwickTree, WeightedSampler, sample_words, word_sampler_cache
+
+
+class TestAliasTable(unittest.TestCase):
+    def test_draws_follow_weights(self):
+        weights = [1, 0, 3, 6]
+        table = AliasTable(weights)
+        rng = random.Random(5)
+        counts = Counter(table.draw(rng) for _ in range(20000))
+        self.assertEqual(counts[1], 0)
+        for index in (0, 2, 3):
+            self.assertAlmostEqual(counts[index] / 20000, weights[index] / 10, delta=0.02)
+
+
+class TestFenwickTree(unittest.TestCase):
+    def test_find_matches_prefix_sums(self):
+        rng = random.Random(2)
+        weights = [rng.choice([0, 0.5, 1, 2, 7]) for _ in range(37)]
+        tree = FenwickTree(weights)
+        for _ in range(5):
+            index = rng.randrange(len(weights))
+            weights[index] = rng.random() * 3
+            tree.set(index, weights[index])
+        self.assertAlmostEqual(tree.total, sum(weights))
+        for _ in range(500):
+            value = rng.random() * sum(weights)
+            prefix, expected = 0.0, None
+            for i, weight in enumerate(weights):
+                prefix += weight
+                if prefix > value:
+                    expected = i
+                    break
+            self.assertEqual(tree.find(value), expected)
+
+
+class TestWeightedSampler(unittest.TestCase):
+    def setUp(self):
+        self.items = [{"word_id": i} for i in range(10)]
+
+    def test_distinct_sample_with_exclude(self):
+        sampler = WeightedSampler(self.items, [1] * 10, rng=random.Random(1))
+        picks = [item["word_id"] for item in sampler.sample(5, exclude=[0, 1])]
+        self.assertEqual(len(set(picks)), 5)
+        self.assertFalse({0, 1} & set(picks))
+        # Returned rows are copies
+        sampler.sample(1)[0]["word_id"] = -1
+        self.assertNotIn(-1, [item["word_id"] for item in sampler.items])
+
+    def test_only_positive_weights_are_drawn(self):
+        sampler = WeightedSampler(self.items, [0] * 8 + [1, 100], rng=random.Random(1))
+        self.assertEqual(sorted(item["word_id"] for item in sampler.sample(5)), [8, 9])
+        self.assertEqual(WeightedSampler(self.items, [0] * 10).sample(3), [])
+
+    def test_update_changes_draws(self):
+        sampler = WeightedSampler(self.items, [1] * 10, rng=random.Random(4))
+        for i in range(9):
+            sampler.update(i, 0)
+        self.assertEqual({sampler.sample()[0]["word_id"] for _ in range(200)}, {9})
+        sampler.update(3, 1e6)
+        self.assertEqual(sampler.sample()[0]["word_id"], 3)
+
+    def test_seeded_draws_repeat(self):
+        weights = [i + 1 for i in range(10)]
+        first = WeightedSampler(self.items, weights).sample(4, rng=random.Random(9))
+        self.assertEqual(WeightedSampler(self.items, weights).sample(4, rng=random.Random(9)), first)
+
+
+class TestWordSamplerCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "test.db")
+        self.quiz_db = QuizDB(path)
+        self.word_db = WordDB(path)
+        self.category_db = CategoryDB(path)
+        self.word_ids = [self.word_db.add_word(f"word{i}", f"뜻{i}", "noun", "") for i in range(12)]
+        word_sampler_cache.clear()
+
+    def tearDown(self):
+        word_sampler_cache.clear()
+        self.category_db.close()
+        self.word_db.close()
+        self.quiz_db.close()
+        self.tmpdir.cleanup()
+
+    def test_results_update_weights_in_place(self):
+        self.quiz_db.record_quiz_result(1, self.word_ids[0], False)
+        hard = sample_words(5, min_wrong=1, db=self.quiz_db)
+        self.assertEqual([word["word_id"] for word in hard], [self.word_ids[0]])
+        sampler = word_sampler_cache.get(min_wrong=1, db=self.quiz_db)
+
+        self.quiz_db.record_quiz_result(1, self.word_ids[1], False)
+        self.assertIs(word_sampler_cache.get(min_wrong=1, db=self.quiz_db), sampler)
+        self.assertEqual(sampler.weight(self.word_ids[0]), 2.0)
+        hard = sample_words(5, min_wrong=1, db=self.quiz_db)
+        self.assertEqual(sorted(word["word_id"] for word in hard), self.word_ids[:2])
+
+    def test_weakness_weights_are_per_user(self):
+        self.quiz_db.record_quiz_result(1, self.word_ids[2], False)
+        mine = word_sampler_cache.get("weakness", user_id=1, db=self.quiz_db)
+        theirs = word_sampler_cache.get("weakness", user_id=2, db=self.quiz_db)
+        self.assertAlmostEqual(mine.weight(self.word_ids[2]), 0.65)
+        self.assertAlmostEqual(theirs.weight(self.word_ids[2]), 0.5)
+        self.quiz_db.record_quiz_result(2, self.word_ids[2], True)
+        self.assertAlmostEqual(mine.weight(self.word_ids[2]), 0.65)
+        self.assertAlmostEqual(theirs.weight(self.word_ids[2]), 0.35)
+
+    def test_word_and_category_changes_invalidate(self):
+        sampler = word_sampler_cache.get(db=self.quiz_db)
+        self.word_db.add_word("extra", "추가", "noun", "")
+        self.assertIsNot(word_sampler_cache.get(db=self.quiz_db), sampler)
+
+        category_id = self.category_db.create_category(1, "fruit")
+        self.assertEqual(sample_words(3, category_id=category_id, db=self.quiz_db), [])
+        self.category_db.add_word_to_category(category_id, self.word_ids[4])
+        words = sample_words(3, category_id=category_id, db=self.quiz_db)
+        self.assertEqual([word["word_id"] for word in words], [self.word_ids[4]])
+
+    def test_in_memory_databases_are_kept_apart(self):
+        # Every ':memory:' QuizDB opens its own database under the same db_path
+        first, second = QuizDB(":memory:"), QuizDB(":memory:")
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        for db, words in [(first, ["apple", "banana"]), (second, ["cat", "dog"])]:
+            for english in words:
+                db.execute("INSERT INTO Word (english, meaning) VALUES (?, ?)", (english, "뜻"))
+        self.assertEqual(sorted(w["english"] for w in sample_words(5, "uniform", db=first)), ["apple", "banana"])
+        self.assertEqual(sorted(w["english"] for w in sample_words(5, "uniform", db=second)), ["cat", "dog"])
+
+        sampler = word_sampler_cache.get(db=second)
+        first.record_quiz_result(1, 1, False)
+        self.assertEqual(sampler.weight(1), 1.0)
+        self.assertEqual(word_sampler_cache.get(db=first).weight(1), 2.0)
+
+    def test_unknown_weighting(self):
+        with self.assertRaises(ValueError):
+            sample_words(1, weighting="srs", db=self.quiz_db)
+
+
+if __name__ == "__main__":
+    unittest.main()
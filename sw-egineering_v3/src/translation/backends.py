@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional
+
+
+class GoogleTransBackend:
+    """
+    Translation through googletrans
+
+    One Translator (and its HTTP connections) is opened per batch on the
+    translator's event loop.
+    """
+    name = "googletrans"
+
+    async def translate(self, texts: List[str], src: str, dest: str) -> List[str]:
+        from googletrans import Translator
+
+        async with Translator() as translator:
+            result = await translator.translate(texts, src=src, dest=dest)
+        return [item.text for item in result]
+
+
+class OfflineBackend:
+    """
+    Deterministic backend for tests and offline runs
+
+    Texts found in entries are translated, anything else comes back unchanged.
+    """
+    name = "offline"
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None):
+        self.entries = dict(entries or {})
+        self.calls = []
+
+    async def translate(self, texts: List[str], src: str, dest: str) -> List[str]:
+        self.calls.append(list(texts))
+        return [self.entries.get(text, text) for text in texts]
+
+
+BACKENDS = {
+    GoogleTransBackend.name: GoogleTransBackend,
+    OfflineBackend.name: OfflineBackend,
+}
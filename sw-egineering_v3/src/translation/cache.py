@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+
+DEFAULT_TRANSLATION_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'translation_cache.db')
+
+
+class TranslationCache:
+    """
+    Persistent (source text, language pair) -> translation cache
+
+    Translations of the same sentence do not change, so entries never
+    expire.
+
+    Input:
+        path: SQLite file path (":memory:" for a process-local cache)
+    """
+    def __init__(self, path: str = DEFAULT_TRANSLATION_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                source TEXT NOT NULL,
+                src TEXT NOT NULL,
+                dest TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                PRIMARY KEY (source, src, dest)
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, texts: Iterable[str], src: str, dest: str) -> Dict[str, str]:
+        """
+        Look up several texts at once
+
+        Returns:
+            source text -> translation for the texts that are cached
+        """
+        texts = list(dict.fromkeys(texts))
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(texts), 500):
+                part = texts[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT source, translated FROM translation_cache "
+                    f"WHERE src = ? AND dest = ? AND source IN ({','.join('?' * len(part))})",
+                    (src, dest, *part)
+                ).fetchall()
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, translations: Dict[str, str], src: str, dest: str):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translation_cache (source, src, dest, translated) VALUES (?, ?, ?, ?)",
+                [(source, src, dest, translated) for source, translated in translations.items()]
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translation_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
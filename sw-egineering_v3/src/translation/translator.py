@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+
+from translation.backends import BACKENDS
+from translation.cache import TranslationCache
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class BatchTranslator:
+    """
+    Cached, deduplicated and batched translation
+
+    Each call only sends texts that are neither cached nor repeated within
+    the call. The missing texts are split into batches that are translated
+    concurrently, at most max_concurrency at a time over all callers.
+
+    Coroutines run on the translator's own event loop thread, so translate()
+    works from plain threads as well as from code that already runs an
+    event loop, and submit() lets callers keep working (e.g. generating the
+    next LLM chunk) while a translation is in flight.
+
+    Input:
+        backend: object with async translate(texts, src, dest) -> List[str]
+        cache: TranslationCache, None for no caching
+        batch_size: texts per backend request
+        max_concurrency: backend requests in flight at once
+        src, dest: language pair
+    """
+    def __init__(self, backend=None, cache: Optional[TranslationCache] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 src: str = "en", dest: str = "ko"):
+        self.backend = backend or BACKENDS[os.environ.get("TRANSLATION_BACKEND", "googletrans")]()
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.src = src
+        self.dest = dest
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                                name="translator-loop")
+                self._thread.start()
+            return self._loop
+
+    async def translate_async(self, texts: List[str]) -> List[str]:
+        """
+        Coroutine behind submit(), runs on the translator's event loop
+
+        Returns:
+            translations in the order of texts
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique = list(dict.fromkeys(texts))
+        translated = self.cache.get_many(unique, self.src, self.dest) if self.cache else {}
+        missing = [text for text in unique if text not in translated]
+
+        async def run_batch(batch):
+            async with self._semaphore:
+                return await self.backend.translate(batch, self.src, self.dest)
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        fresh = {text: result for batch, batch_results in zip(batches, results)
+                 for text, result in zip(batch, batch_results)}
+        if self.cache and fresh:
+            self.cache.put_many(fresh, self.src, self.dest)
+        translated.update(fresh)
+        return [translated[text] for text in texts]
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Start translating texts in the background
+
+        Returns:
+            future resolving to the translations in order
+        """
+        return asyncio.run_coroutine_threadsafe(self.translate_async(list(texts)), self._ensure_loop())
+
+    def translate(self, texts: List[str]) -> List[str]:
+        """
+        Translate texts and wait for the result
+        """
+        if not texts:
+            return []
+        return self.submit(texts).result()
+
+    def close(self):
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._semaphore = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+_default_translator = None
+_default_lock = threading.Lock()
+
+
+def get_default_translator() -> BatchTranslator:
+    """
+    Process-wide translator backed by the on-disk translation cache
+    """
+    global _default_translator
+    with _default_lock:
+        if _default_translator is None:
+            _default_translator = BatchTranslator(cache=TranslationCache())
+        return _default_translator